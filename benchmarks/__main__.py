@@ -0,0 +1,43 @@
+"""
+Runs benchmarks: `python -m benchmarks [--filter parser] [--save baseline.json] [--compare baseline.json]`.
+Exits with 1 when a benchmark is slower than the compared baseline by more than the threshold. With `--memory`
+peak allocated memory of each benchmark is printed instead of timings.
+"""
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+from benchmarks import bench_parser, bench_registry, bench_wse  # noqa: F401, registers benchmarks
+from benchmarks.harness import BENCHMARKS, REGRESSION_THRESHOLD, compare, measure_memory, run, save
+
+
+def main() -> int:
+    arg_parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    arg_parser.add_argument("--filter", default="", help="run only benchmarks with names containing this text")
+    arg_parser.add_argument("--repeat", type=int, default=5, help="timing runs per benchmark, best one is kept")
+    arg_parser.add_argument("--save", type=Path, help="write results as a baseline json file")
+    arg_parser.add_argument("--compare", type=Path, help="compare results with a baseline json file")
+    arg_parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD, help="allowed slowdown ratio")
+    arg_parser.add_argument("--memory", action="store_true", help="print peak allocated memory instead of timings")
+    args = arg_parser.parse_args()
+
+    # NOTE: parsers log every malformed row, which would be timed too.
+    logging.disable(logging.CRITICAL)
+    benchmarks = [bench for name, bench in BENCHMARKS.items() if args.filter in name]
+    if args.memory:
+        measure_memory(benchmarks)
+        return 0
+    results = run(benchmarks, repeat=args.repeat)
+    if args.save:
+        save(results, args.save)
+    if args.compare:
+        regressions = compare(results, args.compare, threshold=args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} benchmark(s) slower than {args.threshold}x baseline.")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
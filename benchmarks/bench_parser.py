@@ -0,0 +1,134 @@
+import importlib.util
+from datetime import datetime
+
+from benchmarks.harness import benchmark
+from benchmarks.pages import scaled_companies_page, scaled_reports_page, stock_quotes_xls_file
+from wse_data.data_scrappers.gpw.company_model import MarketEnum
+from wse_data.data_scrappers.gpw.gpw_parser import GPWParser, ParserBackend, build_model
+from wse_data.data_scrappers.gpw.report_model import ReportCategory, ReportModel, ReportType
+from wse_data.tests.data.gpw_responses import (
+    GPW_COMPANIES_LIST_PAGE,
+    GPW_STOCK_QUOTATIONS_XLS,
+    NEW_CONNECT_COMPANIES_LIST_PAGE,
+    REPORTS_PAGE,
+)
+
+BACKENDS = [ParserBackend.BS4, ParserBackend.BS4_SINGLE_PASS]
+if importlib.util.find_spec("lxml") is not None:
+    BACKENDS.append(ParserBackend.LXML)
+# NOTE: single pass extraction is for report rows only, companies pages take the bs4 path with it.
+COMPANIES_BACKENDS = [backend for backend in BACKENDS if backend != ParserBackend.BS4_SINGLE_PASS]
+
+
+def _register_companies_page_benchmarks(backend: ParserBackend) -> None:
+    gpw_parser = GPWParser(market=MarketEnum.GPW, backend=backend)
+    trusted_gpw_parser = GPWParser(market=MarketEnum.GPW, backend=backend, trusted=True)
+    new_connect_parser = GPWParser(market=MarketEnum.NEW_CONNECT, backend=backend)
+
+    @benchmark(f"parser.{backend.value}.companies_page.gpw", number=20)
+    def gpw_companies_page() -> None:
+        for _ in gpw_parser.parse_companies_page(GPW_COMPANIES_LIST_PAGE):
+            pass
+
+    @benchmark(f"parser.{backend.value}.companies_page.new_connect", number=20)
+    def new_connect_companies_page() -> None:
+        for _ in new_connect_parser.parse_companies_page(NEW_CONNECT_COMPANIES_LIST_PAGE):
+            pass
+
+    @benchmark(f"parser.{backend.value}.companies_page.10k", repeat=3)
+    def scaled_companies() -> None:
+        for _ in gpw_parser.parse_companies_page(scaled_companies_page()):
+            pass
+
+    @benchmark(f"parser.{backend.value}.companies_page.10k.trusted", repeat=3)
+    def trusted_scaled_companies() -> None:
+        for _ in trusted_gpw_parser.parse_companies_page(scaled_companies_page()):
+            pass
+
+
+def _register_reports_page_benchmarks(backend: ParserBackend) -> None:
+    gpw_parser = GPWParser(market=MarketEnum.GPW, backend=backend)
+    trusted_gpw_parser = GPWParser(market=MarketEnum.GPW, backend=backend, trusted=True)
+
+    @benchmark(f"parser.{backend.value}.reports_page", number=20)
+    def reports_page() -> None:
+        for _ in gpw_parser.parse_reports_page(REPORTS_PAGE):
+            pass
+
+    @benchmark(f"parser.{backend.value}.reports_page.10k", repeat=3)
+    def scaled_reports() -> None:
+        for _ in gpw_parser.parse_reports_page(scaled_reports_page()):
+            pass
+
+    @benchmark(f"parser.{backend.value}.reports_page.10k.trusted", repeat=3)
+    def trusted_scaled_reports() -> None:
+        for _ in trusted_gpw_parser.parse_reports_page(scaled_reports_page()):
+            pass
+
+
+for _backend in COMPANIES_BACKENDS:
+    _register_companies_page_benchmarks(_backend)
+for _backend in BACKENDS:
+    _register_reports_page_benchmarks(_backend)
+
+_gpw_parser = GPWParser(market=MarketEnum.GPW)
+_trusted_gpw_parser = GPWParser(market=MarketEnum.GPW, trusted=True)
+
+
+@benchmark("parser.stream.reports_page", number=20)
+def stream_reports_page() -> None:
+    for _ in _gpw_parser.parse_reports_stream([REPORTS_PAGE]):
+        pass
+
+
+@benchmark("parser.stream.reports_page.10k", repeat=3)
+def stream_scaled_reports() -> None:
+    for _ in _gpw_parser.parse_reports_stream([scaled_reports_page()]):
+        pass
+
+
+@benchmark("parser.stock_quotes_xls", number=5)
+def stock_quotes_xls() -> None:
+    for _ in _gpw_parser.parse_stock_quotes_xls(GPW_STOCK_QUOTATIONS_XLS):
+        pass
+
+
+@benchmark("parser.stock_quotes_xls.trusted", number=5)
+def trusted_stock_quotes_xls() -> None:
+    for _ in _trusted_gpw_parser.parse_stock_quotes_xls(GPW_STOCK_QUOTATIONS_XLS):
+        pass
+
+
+@benchmark("parser.stock_quotes_xls_file", number=5)
+def stock_quotes_xls_from_file() -> None:
+    for _ in _gpw_parser.parse_stock_quotes_xls_file(stock_quotes_xls_file()):
+        pass
+
+
+if importlib.util.find_spec("numpy") is not None:
+
+    @benchmark("parser.stock_quotes_columns", number=5)
+    def stock_quotes_columns() -> None:
+        _gpw_parser.parse_stock_quotes_columns(GPW_STOCK_QUOTATIONS_XLS)
+
+
+# NOTE: values as parsed from a reports page, so the difference is pydantic validation alone.
+_REPORT_VALUES = dict(
+    gpw_id="404679",
+    company_isin="PL11BTS00015",
+    name="11 BIT STUDIOS SPÓŁKA AKCYJNA (PL11BTS00015)",
+    summary="Przekroczenie progu 5 proc. w ogólnej liczbie akcji i głosów w Spółce",
+    datetime=datetime(2022, 9, 23, 17, 1, 26),
+    category=ReportCategory.ESPI,
+    type=ReportType.CURRENT,
+)
+
+
+@benchmark("parser.build_model.reports.10k", repeat=3)
+def build_reports() -> list[ReportModel]:
+    return [build_model(ReportModel, False, **_REPORT_VALUES) for _ in range(10_000)]
+
+
+@benchmark("parser.build_model.reports.10k.trusted", repeat=3)
+def build_trusted_reports() -> list[ReportModel]:
+    return [build_model(ReportModel, True, **_REPORT_VALUES) for _ in range(10_000)]
@@ -0,0 +1,69 @@
+import atexit
+import shutil
+import tempfile
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+
+from benchmarks.harness import benchmark
+from wse_data.company_registry import CompanyRegistry, CompanyRegistryModel
+from wse_data.data_scrappers.gpw.company_model import CompanyModel, MarketEnum
+from wse_data.data_scrappers.gpw.gpw_parser import GPWParser
+from wse_data.tests.data.gpw_responses import GPW_COMPANIES_LIST_PAGE
+
+# About the number of companies listed on GPW and NewConnect together.
+REGISTRY_COMPANIES = 1200
+
+
+@lru_cache(maxsize=None)
+def _company_registry_path() -> Path:
+    """
+    Registry file of companies from the recorded GPW page, copied with numbered names, tickers and ISINs up to
+    `REGISTRY_COMPANIES`. Removed at exit.
+    """
+    page_companies = [
+        company
+        for company in GPWParser(market=MarketEnum.GPW).parse_companies_page(GPW_COMPANIES_LIST_PAGE)
+        if isinstance(company, CompanyModel)
+    ]
+    companies = [
+        company.copy(
+            update={
+                "name": f"{company.name} {copy}",
+                "ticker": f"{company.ticker}{copy}",
+                "isin": f"{company.isin}{copy}",
+            }
+        )
+        for copy in range(REGISTRY_COMPANIES // len(page_companies))
+        for company in page_companies
+    ]
+    directory = tempfile.mkdtemp(prefix="wse-data-benchmarks-")
+    atexit.register(shutil.rmtree, directory, ignore_errors=True)
+    path = Path(directory) / "companies.json"
+    path.write_text(CompanyRegistryModel(refreshed_at=datetime.now(), companies=companies).json())
+    return path
+
+
+@lru_cache(maxsize=None)
+def _company_registry() -> CompanyRegistry:
+    return CompanyRegistry(_company_registry_path())
+
+
+@benchmark("registry.load", repeat=3)
+def load_company_registry() -> None:
+    CompanyRegistry(_company_registry_path())
+
+
+@benchmark("registry.search", number=1000)
+def search_company_registry() -> None:
+    _company_registry().search("games")
+
+
+@benchmark("registry.search.short", number=1000)
+def search_company_registry_short() -> None:
+    _company_registry().search("al")
+
+
+@benchmark("registry.by_ticker", number=1000)
+def company_registry_by_ticker() -> None:
+    _company_registry().by_ticker("AMB7")
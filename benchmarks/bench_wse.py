@@ -0,0 +1,98 @@
+import re
+from datetime import date
+
+import httpx
+import respx
+
+from benchmarks.harness import benchmark
+from wse_data.data_scrappers.gpw.company_model import MarketEnum
+from wse_data.data_scrappers.gpw.gpw_client import STOCK_QUOTES_CONTENT_TYPE, STOCK_QUOTES_URL
+from wse_data.data_scrappers.gpw.request_scheduler import RequestScheduler, SchedulerPolicy
+from wse_data.tests.data.gpw_responses import (
+    GPW_COMPANIES_LIST_PAGE,
+    GPW_STOCK_QUOTATIONS_XLS,
+    REPORTS_EMPTY_PAGE,
+    REPORTS_PAGE,
+)
+from wse_data.wse import WSE
+
+# Number of full pages served by the reports stand-in, followed by an empty one.
+REPORTS_PAGES = 10
+OFFSET_RE = re.compile(rb"(?:^|&)offset=(\d+)(?:&|$)")
+QUOTES_DAYS = (date(2022, 10, 3), date(2022, 10, 7))
+
+
+def _reports_response(request: httpx.Request) -> httpx.Response:
+    match = OFFSET_RE.search(request.content)
+    offset = int(match.group(1)) if match else 0
+    if offset < REPORTS_PAGES * 20:
+        return httpx.Response(200, content=REPORTS_PAGE)
+    return httpx.Response(200, content=REPORTS_EMPTY_PAGE)
+
+
+def _gpw_stand_in(wse: WSE) -> respx.MockRouter:
+    """Local stand-in for GPW endpoints: requests are served by respx without touching the network."""
+    router = respx.mock(assert_all_called=False)
+    for url, _ in wse._gpw_client.config.companies_requests:
+        router.post(url).mock(return_value=httpx.Response(200, content=GPW_COMPANIES_LIST_PAGE))
+    router.post(wse._gpw_client.config.reports_url).mock(side_effect=_reports_response)
+    router.get(STOCK_QUOTES_URL).mock(
+        return_value=httpx.Response(
+            200, content=GPW_STOCK_QUOTATIONS_XLS, headers={"content-type": STOCK_QUOTES_CONTENT_TYPE}
+        )
+    )
+    return router
+
+
+# NOTE: no rate limiting, the stand-in answers immediately.
+_wse = WSE(scheduler=RequestScheduler(SchedulerPolicy(rate=None)))
+_stand_in = _gpw_stand_in(_wse)
+
+
+@benchmark("wse.get_companies", number=5)
+def get_companies() -> None:
+    with _stand_in:
+        for _ in _wse.get_companies(market=MarketEnum.GPW):
+            pass
+
+
+@benchmark("wse.get_reports", number=3)
+def get_reports() -> None:
+    with _stand_in:
+        for _ in _wse.get_reports(market=MarketEnum.GPW):
+            pass
+
+
+@benchmark("wse.get_reports.prefetch", number=3)
+def get_reports_prefetch() -> None:
+    with _stand_in:
+        for _ in _wse.get_reports(market=MarketEnum.GPW, prefetch=2):
+            pass
+
+
+@benchmark("wse.get_reports.stream", number=3)
+def get_reports_stream() -> None:
+    with _stand_in:
+        for _ in _wse.get_reports(market=MarketEnum.GPW, stream=True):
+            pass
+
+
+@benchmark("wse.get_reports.parse_workers", number=3)
+def get_reports_parse_workers() -> None:
+    with _stand_in:
+        for _ in _wse.get_reports(market=MarketEnum.GPW, parse_workers=2):
+            pass
+
+
+@benchmark("wse.get_stock_quotes", number=3)
+def get_stock_quotes() -> None:
+    with _stand_in:
+        for _ in _wse.get_stock_quotes(QUOTES_DAYS[0]):
+            pass
+
+
+@benchmark("wse.get_stock_quotes_range", number=1)
+def get_stock_quotes_range() -> None:
+    with _stand_in:
+        for _ in _wse.get_stock_quotes_range(*QUOTES_DAYS, parse_workers=0):
+            pass
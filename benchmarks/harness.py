@@ -0,0 +1,120 @@
+import json
+import platform
+import statistics
+import timeit
+import tracemalloc
+from pathlib import Path
+from typing import Callable, NamedTuple, Optional
+
+# Ratio of current to baseline time above which a benchmark is reported as a regression.
+REGRESSION_THRESHOLD = 1.25
+
+
+class Benchmark(NamedTuple):
+    name: str
+    func: Callable[[], object]
+    number: int
+    repeat: Optional[int]
+
+
+class Result(NamedTuple):
+    name: str
+    best: float
+    median: float
+    number: int
+    repeat: int
+
+
+BENCHMARKS: dict[str, Benchmark] = {}
+
+
+def benchmark(
+    name: str, number: int = 1, repeat: Optional[int] = None
+) -> Callable[[Callable[[], object]], Callable[[], object]]:
+    """
+    Registers a no-argument function; its time is the best of `repeat` runs of `number` calls. Slow benchmarks can
+    lower the `repeat` given to `run`.
+    """
+
+    def register(func: Callable[[], object]) -> Callable[[], object]:
+        if name in BENCHMARKS:
+            raise ValueError(f"Benchmark {name} is already registered.")
+        BENCHMARKS[name] = Benchmark(name=name, func=func, number=number, repeat=repeat)
+        return func
+
+    return register
+
+
+def run(benchmarks: list[Benchmark], repeat: int, echo: Callable[[str], None] = print) -> list[Result]:
+    results = []
+    for bench in benchmarks:
+        bench_repeat = min(repeat, bench.repeat) if bench.repeat is not None else repeat
+        timings = timeit.repeat(bench.func, number=bench.number, repeat=bench_repeat)
+        timings = [timing / bench.number for timing in timings]
+        result = Result(
+            name=bench.name,
+            best=min(timings),
+            median=statistics.median(timings),
+            number=bench.number,
+            repeat=bench_repeat,
+        )
+        echo(f"{result.name:<50} best {_format_time(result.best):>10}   median {_format_time(result.median):>10}")
+        results.append(result)
+    return results
+
+
+def measure_memory(benchmarks: list[Benchmark], echo: Callable[[str], None] = print) -> dict[str, int]:
+    """Peak of memory allocated by Python during a single call of each benchmark, in bytes."""
+    peaks = {}
+    for bench in benchmarks:
+        tracemalloc.start()
+        try:
+            bench.func()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        echo(f"{bench.name:<50} peak {peak / 1024:>10.0f} KiB")
+        peaks[bench.name] = peak
+    return peaks
+
+
+def save(results: list[Result], path: Path) -> None:
+    data = {
+        "machine": {"python": platform.python_version(), "platform": platform.platform()},
+        "results": {result.name: {"best": result.best, "median": result.median} for result in results},
+    }
+    path.write_text(json.dumps(data, indent=2, sort_keys=True) + "\n")
+
+
+def compare(
+    results: list[Result],
+    baseline_path: Path,
+    threshold: float = REGRESSION_THRESHOLD,
+    echo: Callable[[str], None] = print,
+) -> list[str]:
+    """Prints best times against the baseline and returns names of benchmarks slower than `threshold` times."""
+    baseline = json.loads(baseline_path.read_text())
+    baseline_results = baseline["results"]
+    echo(f"\nCompared to {baseline_path} (python {baseline['machine']['python']}, {baseline['machine']['platform']}):")
+    regressions = []
+    for result in results:
+        baseline_result: Optional[dict[str, float]] = baseline_results.get(result.name)
+        if baseline_result is None:
+            echo(f"{result.name:<50} {'new':>10}")
+            continue
+        ratio = result.best / baseline_result["best"]
+        mark = ""
+        if ratio > threshold:
+            mark = "  REGRESSION"
+            regressions.append(result.name)
+        elif ratio < 1 / threshold:
+            mark = "  faster"
+        echo(f"{result.name:<50} {ratio:>9.2f}x{mark}")
+    return regressions
+
+
+def _format_time(seconds: float) -> str:
+    for unit, scale in (("s", 1.0), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.3f} {unit}"
+    return f"{seconds / 1e-9:.0f} ns"
@@ -0,0 +1,38 @@
+import atexit
+import shutil
+import tempfile
+from functools import lru_cache
+from pathlib import Path
+
+from wse_data.tests.data.gpw_responses import GPW_COMPANIES_LIST_PAGE, GPW_STOCK_QUOTATIONS_XLS, REPORTS_PAGE
+
+SCALED_ROWS = 10_000
+
+COMPANY_ROW_START = b'<tr class="trclass'
+COMPANY_ROWS_END = b"</tbody>"
+FIXTURE_PAGE_ROWS = 20
+
+
+@lru_cache(maxsize=None)
+def scaled_companies_page(rows: int = SCALED_ROWS) -> bytes:
+    """Recorded GPW companies page with its table rows repeated up to `rows` rows."""
+    start = GPW_COMPANIES_LIST_PAGE.index(COMPANY_ROW_START)
+    end = GPW_COMPANIES_LIST_PAGE.index(COMPANY_ROWS_END, start)
+    table_rows = GPW_COMPANIES_LIST_PAGE[start:end]
+    return GPW_COMPANIES_LIST_PAGE[:start] + table_rows * (rows // FIXTURE_PAGE_ROWS) + GPW_COMPANIES_LIST_PAGE[end:]
+
+
+@lru_cache(maxsize=None)
+def scaled_reports_page(rows: int = SCALED_ROWS) -> bytes:
+    """Recorded reports page, which is a bare list of entries, repeated up to `rows` entries."""
+    return REPORTS_PAGE * (rows // FIXTURE_PAGE_ROWS)
+
+
+@lru_cache(maxsize=None)
+def stock_quotes_xls_file() -> Path:
+    """Recorded stock quotes sheet saved to a temporary file, removed at exit."""
+    directory = tempfile.mkdtemp(prefix="wse-data-benchmarks-")
+    atexit.register(shutil.rmtree, directory, ignore_errors=True)
+    path = Path(directory) / "stock_quotes.xls"
+    path.write_bytes(GPW_STOCK_QUOTATIONS_XLS)
+    return path
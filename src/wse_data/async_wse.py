@@ -0,0 +1,130 @@
+import logging
+from datetime import date
+from types import TracebackType
+from typing import Any, AsyncIterator, Generator, Iterable, Optional, Type, TypeVar, Union
+
+from wse_data.data_scrappers.gpw.async_gpw_client import AsyncGPWClient
+from wse_data.data_scrappers.gpw.company_model import CompanyModel, MarketEnum
+from wse_data.data_scrappers.gpw.failed_parsing_element_model import (
+    FailedParsingElementModel,
+)
+from wse_data.data_scrappers.gpw.gpw_client import REPORTS_PAGE_SIZE
+from wse_data.data_scrappers.gpw.gpw_parser import GPWParser, EmptyPageException, ParserBackend
+from wse_data.data_scrappers.gpw.report_model import ReportModel
+from wse_data.data_scrappers.gpw.request_scheduler import RequestScheduler
+from wse_data.data_scrappers.gpw.response_cache import CachePolicy, ResponseCache
+from wse_data.data_scrappers.gpw.stock_quotes_model import StockQuotesModel
+from wse_data.metrics import DataKindEnum, MetricsSink, metered_page
+from wse_data.report_watch import AsyncReportWatcher, PollScheduleModel
+from wse_data.wse import UnknownMarketException
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class AsyncWSE:
+    """Asyncio version of WSE. Use as `async with AsyncWSE() as wse:` to release pooled connections."""
+
+    _gpw_client: AsyncGPWClient
+    _new_connect_client: AsyncGPWClient
+    _gpw_parser: GPWParser
+    _new_connect_parser: GPWParser
+    _metrics: Optional[MetricsSink]
+
+    def __init__(
+        self,
+        cache: Optional[ResponseCache] = None,
+        cache_policy: Optional[CachePolicy] = None,
+        parser_backend: ParserBackend = ParserBackend.BS4,
+        scheduler: Optional[RequestScheduler] = None,
+        metrics: Optional[MetricsSink] = None,
+        trusted: bool = False,
+    ) -> None:
+        self._gpw_client = AsyncGPWClient(
+            market=MarketEnum.GPW, cache=cache, cache_policy=cache_policy, scheduler=scheduler, metrics=metrics
+        )
+        self._new_connect_client = AsyncGPWClient(
+            market=MarketEnum.NEW_CONNECT, cache=cache, cache_policy=cache_policy, scheduler=scheduler, metrics=metrics
+        )
+        self._metrics = metrics
+        self._gpw_parser = GPWParser(market=MarketEnum.GPW, backend=parser_backend, trusted=trusted)
+        self._new_connect_parser = GPWParser(market=MarketEnum.NEW_CONNECT, backend=parser_backend, trusted=trusted)
+
+    async def __aenter__(self) -> "AsyncWSE":
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        await self._gpw_client.aclose()
+        await self._new_connect_client.aclose()
+
+    async def get_companies(
+        self, market: MarketEnum, search: str = "", concurrency: int = 1
+    ) -> AsyncIterator[Union[CompanyModel, FailedParsingElementModel]]:
+        client, parser = self._get_client_and_parser(market)
+        async for response_page in client.companies_list(search=search, concurrency=concurrency):
+            try:
+                companies = parser.parse_companies_page(response_page.content)
+                for company in self._metered_page(companies, DataKindEnum.COMPANIES, market):
+                    yield company
+            except EmptyPageException:
+                break
+
+    async def get_reports(
+        self,
+        market: MarketEnum,
+        search: str = "",
+        date_: Optional[date] = None,
+        page_size: int = REPORTS_PAGE_SIZE,
+        prefetch: int = 0,
+        offset: int = 0,
+    ) -> AsyncIterator[Union[ReportModel, FailedParsingElementModel]]:
+        client, parser = self._get_client_and_parser(market)
+        async for report_page in client.reports_list(
+            search=search, for_date=date_, page_size=page_size, prefetch=prefetch, offset=offset
+        ):
+            try:
+                reports = parser.parse_reports_page(report_page.content)
+                for report in self._metered_page(reports, DataKindEnum.REPORTS, market):
+                    yield report
+            except EmptyPageException:
+                break
+
+    def watch_reports(
+        self,
+        market: MarketEnum,
+        search: str = "",
+        schedule: Optional[PollScheduleModel] = None,
+        page_size: int = REPORTS_PAGE_SIZE,
+    ) -> AsyncReportWatcher:
+        """Watcher of newly published reports, use as `async for report in wse.watch_reports(market):`."""
+        client, parser = self._get_client_and_parser(market)
+        return AsyncReportWatcher(client, parser, search=search, schedule=schedule, page_size=page_size)
+
+    async def get_stock_quotes(self, date_: date) -> AsyncIterator[StockQuotesModel]:
+        gpw_response = await self._gpw_client.stock_quotes(date_)
+        if not gpw_response:
+            return
+        stock_quotes = self._gpw_parser.parse_stock_quotes_xls(gpw_response.content)
+        for company_quotes in self._metered_page(stock_quotes, DataKindEnum.STOCK_QUOTES, MarketEnum.GPW):
+            yield company_quotes
+
+    def _metered_page(self, items: Iterable[T], kind: DataKindEnum, market: MarketEnum) -> Generator[T, None, Any]:
+        if self._metrics is None:
+            return (yield from items)
+        return (yield from metered_page(self._metrics, items, kind, market.value))
+
+    def _get_client_and_parser(self, market: MarketEnum) -> tuple[AsyncGPWClient, GPWParser]:
+        if market == MarketEnum.GPW:
+            return self._gpw_client, self._gpw_parser
+        elif market == MarketEnum.NEW_CONNECT:
+            return self._new_connect_client, self._new_connect_parser
+        raise UnknownMarketException(f"Unknown market: {market}.")
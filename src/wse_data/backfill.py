@@ -0,0 +1,173 @@
+import hashlib
+import json
+import logging
+import time
+from contextlib import closing
+from datetime import date
+from pathlib import Path
+from typing import Callable, Iterator, Optional, Union
+
+from pydantic import BaseModel
+
+from wse_data.data_scrappers.gpw.company_model import MarketEnum
+from wse_data.data_scrappers.gpw.failed_parsing_element_model import FailedParsingElementModel
+from wse_data.data_scrappers.gpw.gpw_client import REPORTS_PAGE_SIZE
+from wse_data.data_scrappers.gpw.report_model import ReportModel
+from wse_data.data_scrappers.gpw.stock_quotes_model import StockQuotesModel
+from wse_data.defaults import STOCK_QUOTES_WORKERS
+from wse_data.paths import default_cache_dir, write_text_atomically
+from wse_data.wse import WSE, calendar_days, weekdays
+
+logger = logging.getLogger(__name__)
+
+
+class BackfillCheckpointModel(BaseModel):
+    """Completed days of a backfill, offset of the first not fully consumed page of started days."""
+
+    completed_days: set[date] = set()
+    offsets: dict[date, int] = {}
+    items_done: int = 0
+
+    def to_json(self) -> str:
+        # NOTE: json keys must be strings, pydantic would keep dates.
+        return json.dumps(
+            {
+                "completed_days": sorted(day.isoformat() for day in self.completed_days),
+                "offsets": {day.isoformat(): offset for day, offset in sorted(self.offsets.items())},
+                "items_done": self.items_done,
+            },
+            indent=2,
+        )
+
+
+class BackfillProgressModel(BaseModel):
+    days_done: int
+    days_remaining: int
+    items_done: int
+    elapsed: float
+    items_per_second: Optional[float]
+
+
+class _BackfillJob:
+    def __init__(
+        self,
+        days: list[date],
+        checkpoint_path: Path,
+        on_day_done: Optional[Callable[[BackfillProgressModel], object]],
+    ) -> None:
+        self.days = days
+        self.checkpoint_path = checkpoint_path
+        self.on_day_done = on_day_done
+        self.checkpoint = self._load()
+        self._started_at = time.monotonic()
+        self._items_at_start = self.checkpoint.items_done
+
+    def pending_days(self) -> list[date]:
+        return [day for day in self.days if day not in self.checkpoint.completed_days]
+
+    def progress(self) -> BackfillProgressModel:
+        """Progress of the whole backfill; throughput counts only items done since this job was created."""
+        elapsed = time.monotonic() - self._started_at
+        items_done_now = self.checkpoint.items_done - self._items_at_start
+        days_remaining = len(self.pending_days())
+        return BackfillProgressModel(
+            days_done=len(self.days) - days_remaining,
+            days_remaining=days_remaining,
+            items_done=self.checkpoint.items_done,
+            elapsed=elapsed,
+            items_per_second=items_done_now / elapsed if elapsed > 0 else None,
+        )
+
+    def _complete_day(self, day: date) -> None:
+        self.checkpoint.offsets.pop(day, None)
+        # NOTE: today's data may still change, it is fetched again on the next run.
+        if day < date.today():
+            self.checkpoint.completed_days.add(day)
+        self._save()
+        if self.on_day_done is not None:
+            self.on_day_done(self.progress())
+
+    def _load(self) -> BackfillCheckpointModel:
+        try:
+            return BackfillCheckpointModel.parse_raw(self.checkpoint_path.read_text())
+        except FileNotFoundError:
+            return BackfillCheckpointModel()
+
+    def _save(self) -> None:
+        write_text_atomically(self.checkpoint_path, self.checkpoint.to_json())
+
+
+class ReportsBackfill(_BackfillJob):
+    """
+    Reports of every day from `start` to `end`, oldest day first. Progress is checkpointed after every consumed
+    page and completed day, so an interrupted backfill resumes where it stopped: reports of a partially consumed
+    page are yielded again, completed days are skipped. Iterate over it; `progress()` reports done and remaining.
+    """
+
+    def __init__(
+        self,
+        wse: WSE,
+        market: MarketEnum,
+        start: date,
+        end: date,
+        search: str = "",
+        checkpoint_path: Optional[Union[str, Path]] = None,
+        page_size: int = REPORTS_PAGE_SIZE,
+        on_day_done: Optional[Callable[[BackfillProgressModel], object]] = None,
+    ) -> None:
+        self.wse = wse
+        self.market = market
+        self.search = search
+        self.page_size = page_size
+        if checkpoint_path is None:
+            search_hash = hashlib.sha1(search.encode()).hexdigest()[:12]
+            checkpoint_path = default_cache_dir() / "backfill" / f"reports-{market.value}-{search_hash}.json"
+        super().__init__(calendar_days(start, end), Path(checkpoint_path), on_day_done)
+
+    def __iter__(self) -> Iterator[Union[ReportModel, FailedParsingElementModel]]:
+        for day in self.pending_days():
+            offset = self.checkpoint.offsets.get(day, 0)
+            consumed = 0
+            reports = self.wse.get_reports(
+                market=self.market, search=self.search, date_=day, page_size=self.page_size, offset=offset
+            )
+            with closing(reports):
+                for report in reports:
+                    yield report
+                    consumed += 1
+                    self.checkpoint.items_done += 1
+                    if consumed % self.page_size == 0:
+                        self.checkpoint.offsets[day] = offset + consumed
+                        self._save()
+            self._complete_day(day)
+
+
+class StockQuotesBackfill(_BackfillJob):
+    """
+    Stock quotes of every weekday from `start` to `end`, oldest first. A day is checkpointed as completed once all
+    its quotes are consumed, so an interrupted backfill downloads only days it did not finish.
+    """
+
+    def __init__(
+        self,
+        wse: WSE,
+        start: date,
+        end: date,
+        checkpoint_path: Optional[Union[str, Path]] = None,
+        workers: int = STOCK_QUOTES_WORKERS,
+        on_day_done: Optional[Callable[[BackfillProgressModel], object]] = None,
+    ) -> None:
+        self.wse = wse
+        self.workers = workers
+        if checkpoint_path is None:
+            checkpoint_path = default_cache_dir() / "backfill" / "stock-quotes.json"
+        super().__init__(weekdays(start, end), Path(checkpoint_path), on_day_done)
+
+    def __iter__(self) -> Iterator[StockQuotesModel]:
+        days_quotes = self.wse.get_stock_quotes_days(self.pending_days(), workers=self.workers)
+        with closing(days_quotes):
+            for day, day_quotes in days_quotes:
+                for quotes in day_quotes or ():
+                    yield quotes
+                    self.checkpoint.items_done += 1
+                self._complete_day(day)
@@ -1,16 +1,31 @@
 """Console script for wse-data."""
+import functools
 import logging
-from datetime import datetime
+from collections import Counter
+from datetime import date, datetime
+from enum import Enum
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Iterable, Optional, Sequence, Union
 
+import click
 import typer
 
 from rich import print
 
-from wse_data.data_scrappers.gpw.company_model import MarketEnum
-from wse_data.data_scrappers.gpw.failed_parsing_element_model import (
-    FailedParsingElementModel,
-)
-from wse_data.wse import WSE
+from wse_data.data_scrappers.gpw.market import MarketEnum
+from wse_data.defaults import SESSION_POLL_INTERVAL, STOCK_QUOTES_WORKERS
+from wse_data.output import OutputFormatEnum
+
+# NOTE: the CLI runs from cron and shell pipelines, so modules loading pydantic, httpx, bs4 or xlrd are imported
+# only by the commands which need them.
+if TYPE_CHECKING:
+    from pydantic import BaseModel
+
+    from wse_data.backfill import BackfillProgressModel
+    from wse_data.company_registry import CompanyRegistry
+    from wse_data.metrics import InMemoryMetricsSink
+    from wse_data.output import RowsWriter
+    from wse_data.wse import WSE
 
 
 app = typer.Typer()
@@ -20,54 +35,366 @@ reports_app = typer.Typer()
 app.add_typer(reports_app, name="reports")
 quotes_app = typer.Typer()
 app.add_typer(quotes_app, name="quotes")
+sync_app = typer.Typer()
+app.add_typer(sync_app, name="sync")
+backfill_app = typer.Typer()
+app.add_typer(backfill_app, name="backfill")
+
+
+class MarketOption(str, Enum):
+    GPW = MarketEnum.GPW.value
+    NEW_CONNECT = MarketEnum.NEW_CONNECT.value
+    ALL = "ALL"
+
+    def markets(self) -> list[MarketEnum]:
+        if self == MarketOption.ALL:
+            return list(MarketEnum)
+        return [MarketEnum(self.value)]
+
+
+def __getattr__(name: str) -> Any:
+    # NOTE: `from wse_data.cli import WSE` keeps working without importing it up front.
+    if name == "WSE":
+        from wse_data.wse import WSE
+
+        return WSE
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _open_rows_writer(
+    output_format: OutputFormatEnum,
+    model_type: "type[BaseModel]",
+    output: Optional[Path],
+    extra_columns: Sequence[str] = (),
+) -> "RowsWriter":
+    from wse_data.output import OutputException, open_rows_writer
+
+    try:
+        return open_rows_writer(output_format, model_type, output, extra_columns)
+    except OutputException as exc:
+        raise typer.BadParameter(str(exc)) from exc
+
+
+FORMAT_OPTION_HELP = "Output format. Rows are written as they are fetched."
+OUTPUT_OPTION_HELP = "Output file. Defaults to standard output."
+
+
+def _new_wse() -> "WSE":
+    from wse_data.wse import WSE
+
+    ctx = click.get_current_context(silent=True)
+    return WSE(metrics=ctx.find_root().obj if ctx is not None else None)
+
+
+def _print_stats(metrics: "InMemoryMetricsSink") -> None:
+    from rich.console import Console
+
+    from wse_data.metrics import timing_summary
+
+    Console(stderr=True).print(timing_summary(metrics), highlight=False)
 
 
 @app.callback()
-def main() -> None:
+def main(
+    ctx: typer.Context,
+    stats: bool = typer.Option(False, "--stats", help="Print timing summary to standard error at exit."),
+) -> None:
     """
     Welcome to WSE Data CLI.
     """
     # NOTE: logging only for WSE usage as library. We don't want to clutter console output.
     logging.disable(logging.CRITICAL)
+    if stats:
+        from wse_data.metrics import InMemoryMetricsSink
+
+        metrics = InMemoryMetricsSink()
+        ctx.obj = metrics
+        ctx.call_on_close(functools.partial(_print_stats, metrics))
 
 
 @companies_app.command(name="list")
 def companies_list(
-    market: MarketEnum = typer.Option(MarketEnum.GPW, case_sensitive=False),
+    market: MarketOption = typer.Option(MarketOption.GPW, case_sensitive=False),
     search: str = typer.Option("", help="Search phrase."),
+    local: bool = typer.Option(False, help="Search the local company registry, refreshed once a day."),
+    registry_path: Path = typer.Option(None, "--registry", help="Local company registry file."),
+    output_format: OutputFormatEnum = typer.Option(OutputFormatEnum.TEXT, "--format", help=FORMAT_OPTION_HELP),
+    output: Path = typer.Option(None, "--output", help=OUTPUT_OPTION_HELP),
 ) -> None:
-    wse = WSE()
-    companies = wse.get_companies(market=market, search=search)
-    failed_companies = []
-    for company in companies:
-        if isinstance(company, FailedParsingElementModel):
-            failed_companies.append(company)
-            continue
-        print(company)
-    if failed_companies:
-        print(f"There were {len(failed_companies)} companies that failed parsing.")
+    from wse_data.data_scrappers.gpw.company_model import CompanyModel
+    from wse_data.data_scrappers.gpw.failed_parsing_element_model import FailedParsingElementModel
+
+    wse = _new_wse()
+    if local:
+        from wse_data.company_registry import CompanyRegistry
+
+        registry = CompanyRegistry(registry_path)
+        _refresh_registry_if_stale(registry, wse)
+        with _open_rows_writer(output_format, CompanyModel, output) as writer:
+            for registry_company in registry.search(search, market.markets()):
+                writer.write(registry_company)
+        return
+
+    if market == MarketOption.ALL:
+        companies: Iterable[Union[CompanyModel, FailedParsingElementModel]] = (
+            company for _, company in wse.get_companies_by_market(market.markets(), search=search)
+        )
+    else:
+        companies = wse.get_companies(market=market.markets()[0], search=search)
+    failures: Counter[str] = Counter()
+    with _open_rows_writer(output_format, CompanyModel, output) as writer:
+        for company in companies:
+            if isinstance(company, FailedParsingElementModel):
+                failures[company.error] += 1
+                continue
+            writer.write(company)
+    _print_failures(failures, "companies", output_format)
+
+
+def _refresh_registry_if_stale(registry: "CompanyRegistry", wse: "WSE") -> None:
+    import httpx
+    from rich.console import Console
+
+    from wse_data.company_registry import CompanyRegistryException
+    from wse_data.data_scrappers.gpw.request_scheduler import RequestSchedulerException
+
+    try:
+        registry.refresh_if_stale(wse)
+    except (CompanyRegistryException, RequestSchedulerException, httpx.HTTPError) as exc:
+        if registry.refreshed_at is None:
+            raise
+        # NOTE: companies rarely change, a day old registry beats no answer while gpw.pl is down.
+        Console(stderr=True).print(
+            f"Warning: company registry not refreshed ({exc}), using companies from {registry.refreshed_at:%Y-%m-%d}.",
+            highlight=False,
+        )
+
+
+def _print_failures(failures: "Counter[str]", rows_name: str, output_format: OutputFormatEnum) -> None:
+    if not failures:
+        return
+    # NOTE: machine readable rows may go to standard output, so the summary goes to standard error.
+    from rich.console import Console
+
+    console = Console(stderr=output_format != OutputFormatEnum.TEXT)
+    console.print(f"There were {sum(failures.values())} {rows_name} that failed parsing.")
+    for error, count in failures.most_common():
+        console.print(f"  {error}: {count}")
+
+
+def _check_date_options(date_: Optional[datetime], date_from: Optional[datetime], date_to: Optional[datetime]) -> None:
+    if date_ and (date_from or date_to):
+        raise typer.BadParameter("--date can't be used with --from or --to.")
+    if date_to and not date_from:
+        raise typer.BadParameter("--to can't be used without --from.")
+    if date_from and date_from.date() > (date_to.date() if date_to else date.today()):
+        raise typer.BadParameter("--from can't be after --to, which defaults to today.")
 
 
 @reports_app.command(name="list")
 def report_list(
-    market: MarketEnum = typer.Option(MarketEnum.GPW, case_sensitive=False),
+    market: MarketOption = typer.Option(MarketOption.GPW, case_sensitive=False),
     search: str = typer.Option("", help="Search phrase."),
     date_: datetime = typer.Option(None, "--date", formats=["%Y-%m-%d"], help="Search for date"),
+    date_from: datetime = typer.Option(None, "--from", formats=["%Y-%m-%d"], help="Reports from day."),
+    date_to: datetime = typer.Option(None, "--to", formats=["%Y-%m-%d"], help="Reports to day. Defaults to today."),
+    new: bool = typer.Option(False, "--new", help="Only reports published since the previous --new run."),
+    state_path: Path = typer.Option(None, "--state", help="State file of --new runs."),
+    output_format: OutputFormatEnum = typer.Option(OutputFormatEnum.TEXT, "--format", help=FORMAT_OPTION_HELP),
+    output: Path = typer.Option(None, "--output", help=OUTPUT_OPTION_HELP),
 ) -> None:
+    from wse_data.data_scrappers.gpw.failed_parsing_element_model import FailedParsingElementModel
+    from wse_data.data_scrappers.gpw.report_model import ReportModel
+    from wse_data.reports_state import ReportsState
+
+    _check_date_options(date_, date_from, date_to)
     if date_:
         date_ = date_.date()  # type: ignore
-    wse = WSE()
-    reports = wse.get_reports(market=market, search=search, date_=date_)
-    for report in reports:
-        print(report)
+    wse = _new_wse()
+    date_from_ = date_from.date() if date_from else None
+    date_to_ = date_to.date() if date_to else None
+    failures: Counter[str] = Counter()
+    if market == MarketOption.ALL:
+        if new:
+            raise typer.BadParameter("--new can't be used with --market all.")
+        reports_by_market = wse.get_reports_by_market(
+            market.markets(), search=search, date_=date_, date_from=date_from_, date_to=date_to_
+        )
+        with _open_rows_writer(output_format, ReportModel, output, extra_columns=("market",)) as writer:
+            for report_market, report in reports_by_market:
+                if isinstance(report, FailedParsingElementModel):
+                    failures[report.error] += 1
+                    continue
+                writer.write(report, report_market.value)
+        _print_failures(failures, "reports", output_format)
+        return
+    single_market = market.markets()[0]
+    if new:
+        if date_ or date_from:
+            raise typer.BadParameter("--new can't be used with --date or --from.")
+        reports = wse.get_new_reports(market=single_market, search=search, state=ReportsState(state_path))
+    else:
+        reports = wse.get_reports(
+            market=single_market, search=search, date_=date_, date_from=date_from_, date_to=date_to_
+        )
+    with _open_rows_writer(output_format, ReportModel, output) as writer:
+        for report in reports:
+            if isinstance(report, FailedParsingElementModel):
+                failures[report.error] += 1
+                continue
+            writer.write(report)
+    _print_failures(failures, "reports", output_format)
+
+
+@reports_app.command(name="watch")
+def reports_watch(
+    market: MarketEnum = typer.Option(MarketEnum.GPW, case_sensitive=False),
+    search: str = typer.Option("", help="Search phrase."),
+    session_interval: float = typer.Option(SESSION_POLL_INTERVAL, help="Seconds between polls during session hours."),
+) -> None:
+    """
+    Print reports as soon as they are published, until interrupted.
+    """
+    from wse_data.report_watch import PollScheduleModel
+
+    watcher = _new_wse().watch_reports(
+        market=market, search=search, schedule=PollScheduleModel(session_interval=session_interval)
+    )
+    try:
+        for report in watcher:
+            print(report)
+    except KeyboardInterrupt:
+        pass
+    print(watcher.latency.snapshot())
 
 
 @quotes_app.command(name="list")
-def quotes(date_: datetime = typer.Option(None, "--date", formats=["%Y-%m-%d"], help="Search from")) -> None:
-    date_ = date_.date()  # type: ignore
-    wse = WSE()
+def quotes(
+    date_: datetime = typer.Option(None, "--date", formats=["%Y-%m-%d"], help="Quotes for single day."),
+    date_from: datetime = typer.Option(None, "--from", formats=["%Y-%m-%d"], help="Quotes from day."),
+    date_to: datetime = typer.Option(None, "--to", formats=["%Y-%m-%d"], help="Quotes to day. Defaults to today."),
+    workers: int = typer.Option(STOCK_QUOTES_WORKERS, help="Number of days downloaded at once."),
+    local: bool = typer.Option(False, help="Read quotes from the local store filled by `wse sync quotes`."),
+    store_path: Path = typer.Option(None, "--store", help="Local quotes store file."),
+    output_format: OutputFormatEnum = typer.Option(OutputFormatEnum.TEXT, "--format", help=FORMAT_OPTION_HELP),
+    output: Path = typer.Option(None, "--output", help=OUTPUT_OPTION_HELP),
+) -> None:
+    from wse_data.data_scrappers.gpw.stock_quotes_model import StockQuotesModel
+
+    _check_date_options(date_, date_from, date_to)
+    if date_from:
+        start, end = date_from.date(), date_to.date() if date_to else date.today()
+    elif date_:
+        start = end = date_.date()
+    else:
+        raise typer.BadParameter("Provide --date or --from.")
+
+    if local:
+        from wse_data.quote_store import QuoteStore
+
+        with QuoteStore(store_path) as store, _open_rows_writer(output_format, StockQuotesModel, output) as writer:
+            for quote in store.get_stock_quotes(start, end):
+                writer.write(quote)
+        return
+
+    wse = _new_wse()
     # TODO: print info when empty response from client
-    for quote in wse.get_stock_quotes(date_):
+    if date_from:
+        stock_quotes = wse.get_stock_quotes_range(start, end, workers=workers)
+    else:
+        stock_quotes = wse.get_stock_quotes(start)
+    with _open_rows_writer(output_format, StockQuotesModel, output) as writer:
+        for quote in stock_quotes:
+            writer.write(quote)
+
+
+@sync_app.command(name="quotes")
+def sync_quotes(
+    date_from: datetime = typer.Option(..., "--from", formats=["%Y-%m-%d"], help="Sync from day."),
+    date_to: datetime = typer.Option(None, "--to", formats=["%Y-%m-%d"], help="Sync to day. Defaults to today."),
+    workers: int = typer.Option(STOCK_QUOTES_WORKERS, help="Number of days downloaded at once."),
+    store_path: Path = typer.Option(None, "--store", help="Local quotes store file."),
+) -> None:
+    """
+    Download stock quotes of days missing from the local store.
+    """
+    from wse_data.quote_store import QuoteStore
+
+    with QuoteStore(store_path) as store:
+        result = store.sync(_new_wse(), date_from.date(), date_to.date() if date_to else None, workers=workers)
+    print(f"Fetched {result.fetched_days} days, {result.trading_days} trading days with {result.stock_quotes} quotes.")
+
+
+@sync_app.command(name="companies")
+def sync_companies(
+    registry_path: Path = typer.Option(None, "--registry", help="Local company registry file."),
+) -> None:
+    """
+    Download companies of all markets into the local company registry.
+    """
+    from wse_data.company_registry import CompanyRegistry
+
+    companies_count = CompanyRegistry(registry_path).refresh(_new_wse())
+    print(f"Fetched {companies_count} companies.")
+
+
+def _print_backfill_progress(progress: "BackfillProgressModel") -> None:
+    from rich.console import Console
+
+    throughput = f"{progress.items_per_second:.1f}/s" if progress.items_per_second is not None else "-"
+    Console(stderr=True).print(
+        f"Days done {progress.days_done}, remaining {progress.days_remaining}; "
+        f"{progress.items_done} items done, {throughput}."
+    )
+
+
+@backfill_app.command(name="reports")
+def backfill_reports(
+    date_from: datetime = typer.Option(..., "--from", formats=["%Y-%m-%d"], help="Backfill from day."),
+    date_to: datetime = typer.Option(None, "--to", formats=["%Y-%m-%d"], help="Backfill to day. Defaults to today."),
+    market: MarketEnum = typer.Option(MarketEnum.GPW, case_sensitive=False),
+    search: str = typer.Option("", help="Search phrase."),
+    checkpoint_path: Path = typer.Option(None, "--checkpoint", help="Checkpoint file of the backfill."),
+) -> None:
+    """
+    Print reports of every day in range. An interrupted backfill resumes from its checkpoint.
+    """
+    from wse_data.backfill import ReportsBackfill
+
+    backfill = ReportsBackfill(
+        _new_wse(),
+        market,
+        date_from.date(),
+        date_to.date() if date_to else date.today(),
+        search=search,
+        checkpoint_path=checkpoint_path,
+        on_day_done=_print_backfill_progress,
+    )
+    for report in backfill:
+        print(report)
+
+
+@backfill_app.command(name="quotes")
+def backfill_quotes(
+    date_from: datetime = typer.Option(..., "--from", formats=["%Y-%m-%d"], help="Backfill from day."),
+    date_to: datetime = typer.Option(None, "--to", formats=["%Y-%m-%d"], help="Backfill to day. Defaults to today."),
+    workers: int = typer.Option(STOCK_QUOTES_WORKERS, help="Number of days downloaded at once."),
+    checkpoint_path: Path = typer.Option(None, "--checkpoint", help="Checkpoint file of the backfill."),
+) -> None:
+    """
+    Print stock quotes of every day in range. An interrupted backfill resumes from its checkpoint.
+    """
+    from wse_data.backfill import StockQuotesBackfill
+
+    backfill = StockQuotesBackfill(
+        _new_wse(),
+        date_from.date(),
+        date_to.date() if date_to else date.today(),
+        checkpoint_path=checkpoint_path,
+        workers=workers,
+        on_day_done=_print_backfill_progress,
+    )
+    for quote in backfill:
         print(quote)
 
 
@@ -0,0 +1,143 @@
+import logging
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, Iterator, Optional, Union
+
+from pydantic import BaseModel, ValidationError
+
+from wse_data.data_scrappers.gpw.company_model import CompanyModel, MarketEnum
+from wse_data.data_scrappers.gpw.failed_parsing_element_model import log_failure_counts
+from wse_data.defaults import COMPANY_REGISTRY_TTL
+from wse_data.paths import default_cache_dir, write_text_atomically
+from wse_data.wse import WSE
+
+logger = logging.getLogger(__name__)
+
+# Longest substrings of names, tickers and ISINs indexed; longer queries intersect postings of their n-grams.
+NGRAM_SIZE = 3
+# Never matched by a query, so n-grams don't span two fields.
+FIELD_SEPARATOR = "\n"
+
+
+class CompanyRegistryException(Exception):
+    pass
+
+
+class CompanyRegistryModel(BaseModel):
+    refreshed_at: datetime
+    companies: list[CompanyModel]
+
+
+class CompanyRegistry:
+    """
+    Companies of all markets, kept in a JSON file and indexed in memory: ISIN and ticker lookups are dict lookups,
+    `search` goes through an n-gram index instead of a request to gpw.pl. The registry is stale once it is older
+    than `ttl` seconds; `refresh_if_stale` scrapes companies again only then.
+    """
+
+    path: Path
+    ttl: float
+    refreshed_at: Optional[datetime]
+    _companies: list[CompanyModel]
+    _by_isin: dict[str, CompanyModel]
+    _by_ticker: dict[str, CompanyModel]
+    _search_texts: list[str]
+    # Company indexes by n-gram of their search text.
+    _ngrams: dict[str, set[int]]
+
+    def __init__(self, path: Optional[Union[str, Path]] = None, ttl: float = COMPANY_REGISTRY_TTL) -> None:
+        self.path = Path(path) if path is not None else default_cache_dir() / "companies.json"
+        self.ttl = ttl
+        self.refreshed_at = None
+        self._set_companies([])
+        self._load()
+
+    def is_stale(self, now: Optional[datetime] = None) -> bool:
+        if self.refreshed_at is None:
+            return True
+        return ((now or datetime.now()) - self.refreshed_at).total_seconds() >= self.ttl
+
+    def refresh(self, wse: WSE) -> int:
+        """Scrapes companies of all markets and saves them. Returns number of companies."""
+        companies = []
+        failures: Counter[str] = Counter()
+        for _, company in wse.get_companies_by_market():
+            if isinstance(company, CompanyModel):
+                companies.append(company)
+            else:
+                failures[company.error] += 1
+        log_failure_counts(logger, failures, "companies")
+        # NOTE: a market without companies is rather a broken page than delisting of all its companies, keep the
+        # saved ones.
+        missing_markets = [market.value for market in MarketEnum if all(c.market != market for c in companies)]
+        if missing_markets:
+            raise CompanyRegistryException(
+                f"No companies fetched for {', '.join(missing_markets)}, registry not refreshed."
+            )
+        registry = CompanyRegistryModel(refreshed_at=datetime.now(), companies=companies)
+        write_text_atomically(self.path, registry.json())
+        self.refreshed_at = registry.refreshed_at
+        self._set_companies(companies)
+        logger.info(f"Refreshed company registry with {len(companies)} companies.")
+        return len(companies)
+
+    def refresh_if_stale(self, wse: WSE) -> bool:
+        if not self.is_stale():
+            return False
+        self.refresh(wse)
+        return True
+
+    def companies(self, markets: Iterable[MarketEnum] = tuple(MarketEnum)) -> list[CompanyModel]:
+        markets = set(markets)
+        return [company for company in self._companies if company.market in markets]
+
+    def by_isin(self, isin: str) -> Optional[CompanyModel]:
+        return self._by_isin.get(isin.upper())
+
+    def by_ticker(self, ticker: str) -> Optional[CompanyModel]:
+        return self._by_ticker.get(ticker.upper())
+
+    def search(self, query: str, markets: Iterable[MarketEnum] = tuple(MarketEnum)) -> list[CompanyModel]:
+        """Companies whose name, ticker or ISIN contains `query`, ignoring case, in registry order."""
+        query = query.strip().casefold()
+        if not query:
+            return self.companies(markets)
+        if len(query) <= NGRAM_SIZE:
+            indexes = sorted(self._ngrams.get(query, ()))
+        else:
+            postings = sorted((self._ngrams.get(ngram, set()) for ngram in _ngrams(query, NGRAM_SIZE)), key=len)
+            candidates = set.intersection(*postings)
+            indexes = sorted(index for index in candidates if query in self._search_texts[index])
+        markets = set(markets)
+        return [self._companies[index] for index in indexes if self._companies[index].market in markets]
+
+    def _load(self) -> None:
+        try:
+            registry = CompanyRegistryModel.parse_raw(self.path.read_text())
+        except FileNotFoundError:
+            return
+        except ValidationError:
+            logger.warning(f"Ignoring corrupted company registry {self.path}.")
+            return
+        self.refreshed_at = registry.refreshed_at
+        self._set_companies(registry.companies)
+
+    def _set_companies(self, companies: list[CompanyModel]) -> None:
+        self._companies = companies
+        self._by_isin = {company.isin.upper(): company for company in companies}
+        self._by_ticker = {company.ticker.upper(): company for company in companies}
+        self._search_texts = [
+            FIELD_SEPARATOR.join((company.name, company.ticker, company.isin)).casefold() for company in companies
+        ]
+        self._ngrams = {}
+        for index, text in enumerate(self._search_texts):
+            for size in range(1, NGRAM_SIZE + 1):
+                for ngram in _ngrams(text, size):
+                    self._ngrams.setdefault(ngram, set()).add(index)
+
+
+def _ngrams(text: str, size: int) -> Iterator[str]:
+    for start in range(len(text) - size + 1):
+        end = start + size
+        yield text[start:end]
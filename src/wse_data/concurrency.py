@@ -0,0 +1,132 @@
+import asyncio
+import itertools
+import queue
+import threading
+from collections import deque
+from concurrent.futures import Executor, Future, ThreadPoolExecutor, wait
+from typing import Any, AsyncGenerator, Awaitable, Callable, Generator, Iterable, Optional, Sequence, TypeVar, cast
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+_SOURCE_DONE = object()
+# Seconds between checks whether a producer blocked on a full queue should stop.
+_PUT_TIMEOUT = 0.1
+
+
+class _SourceFailure:
+    def __init__(self, exc: BaseException) -> None:
+        self.exc = exc
+
+
+def ordered_map(
+    func: Callable[[T], R], items: Iterable[T], workers: int, executor: Optional[Executor] = None
+) -> Generator[R, None, None]:
+    """
+    Lazy `map` keeping up to `workers` calls in flight, counting the one whose result is being consumed.
+    Results are yielded in input order. Closing the iterator cancels calls that have not started yet and waits
+    for the running ones, so no work outlives it. Threads are used unless an executor is given; a given executor
+    is not shut down, only the calls submitted here are waited for.
+    """
+    if workers < 1:
+        raise ValueError(f"workers must be positive, got {workers}.")
+    own_executor = executor is None
+    if executor is None:
+        executor = ThreadPoolExecutor(max_workers=workers)
+    items_iterator = iter(items)
+    pending: deque[Future[R]] = deque()
+    try:
+        for item in itertools.islice(items_iterator, workers):
+            pending.append(executor.submit(func, item))
+        while pending:
+            future = pending.popleft()
+            yield future.result()
+            for item in itertools.islice(items_iterator, 1):
+                pending.append(executor.submit(func, item))
+    finally:
+        for future in pending:
+            future.cancel()
+        if own_executor:
+            executor.shutdown(wait=True)
+        else:
+            wait(pending)
+
+
+async def async_ordered_map(
+    func: Callable[[T], Awaitable[R]], items: Iterable[T], concurrency: int
+) -> AsyncGenerator[R, None]:
+    """Asyncio counterpart of `ordered_map`, keeping up to `concurrency` coroutines in flight."""
+    if concurrency < 1:
+        raise ValueError(f"concurrency must be positive, got {concurrency}.")
+    items_iterator = iter(items)
+    pending: deque[asyncio.Future[R]] = deque()
+    try:
+        for item in itertools.islice(items_iterator, concurrency):
+            pending.append(asyncio.ensure_future(func(item)))
+        while pending:
+            task = pending.popleft()
+            yield await task
+            for item in itertools.islice(items_iterator, 1):
+                pending.append(asyncio.ensure_future(func(item)))
+    finally:
+        for task in pending:
+            task.cancel()
+        # NOTE: cancelled tasks are awaited, so none is left running or destroyed while pending.
+        await asyncio.gather(*pending, return_exceptions=True)
+
+
+def interleave(
+    sources: Sequence[Callable[[], Iterable[T]]], queue_size: int = 64
+) -> Generator[tuple[int, T], None, None]:
+    """
+    Iterates every source in its own thread and yields `(source index, item)` in order of arrival. The queue is
+    bounded, so sources ahead of the consumer wait. An exception of a source is raised once the items it yielded
+    before are consumed. Closing the iterator stops sources at their next item and waits for their threads.
+    """
+    results: queue.Queue[tuple[int, Any]] = queue.Queue(maxsize=queue_size)
+    stopped = threading.Event()
+
+    def put(entry: tuple[int, Any]) -> bool:
+        while not stopped.is_set():
+            try:
+                results.put(entry, timeout=_PUT_TIMEOUT)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce(index: int, source: Callable[[], Iterable[T]]) -> None:
+        try:
+            items = iter(source())
+            try:
+                for item in items:
+                    if not put((index, item)):
+                        return
+            finally:
+                close = getattr(items, "close", None)
+                if close is not None:
+                    close()
+        except BaseException as exc:
+            put((index, _SourceFailure(exc)))
+            return
+        put((index, _SOURCE_DONE))
+
+    threads = [
+        threading.Thread(target=produce, args=(index, source), daemon=True) for index, source in enumerate(sources)
+    ]
+    for thread in threads:
+        thread.start()
+    try:
+        running = len(threads)
+        while running:
+            index, entry = results.get()
+            if entry is _SOURCE_DONE:
+                running -= 1
+                continue
+            if isinstance(entry, _SourceFailure):
+                raise entry.exc
+            yield index, cast(T, entry)
+    finally:
+        stopped.set()
+        for thread in threads:
+            thread.join()
@@ -0,0 +1,179 @@
+import functools
+import importlib.util
+import itertools
+import logging
+import time
+from datetime import date
+from types import TracebackType
+from typing import Any, AsyncIterator, Callable, Optional, Type
+
+import httpx
+
+from wse_data.concurrency import async_ordered_map
+from wse_data.data_scrappers.gpw.company_model import MarketEnum
+from wse_data.data_scrappers.gpw.gpw_client import (
+    BaseGPWClient,
+    REPORT_ENTRY_STR,
+    REPORTS_PAGE_SIZE,
+    REQUEST_TIMEOUT,
+    STOCK_QUOTES_URL,
+)
+from wse_data.data_scrappers.gpw.request_scheduler import RequestScheduler
+from wse_data.data_scrappers.gpw.response_cache import CachePolicy, ResponseCache
+from wse_data.metrics import DataKindEnum, MetricsSink
+
+logger = logging.getLogger(__name__)
+
+# NOTE: httpx negotiates HTTP/2 only when the optional `h2` package is installed.
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+CONNECTION_LIMITS = httpx.Limits(max_connections=10, max_keepalive_connections=10, keepalive_expiry=60.0)
+
+
+class AsyncGPWClient(BaseGPWClient):
+    """GPWClient counterpart for asyncio, reusing one connection pool for all requests to a market."""
+
+    _http_client: httpx.AsyncClient
+
+    def __init__(
+        self,
+        market: MarketEnum,
+        http_client: Optional[httpx.AsyncClient] = None,
+        cache: Optional[ResponseCache] = None,
+        cache_policy: Optional[CachePolicy] = None,
+        scheduler: Optional[RequestScheduler] = None,
+        metrics: Optional[MetricsSink] = None,
+    ) -> None:
+        super().__init__(market, cache=cache, cache_policy=cache_policy, scheduler=scheduler, metrics=metrics)
+        if http_client is None:
+            http_client = httpx.AsyncClient(
+                http2=HTTP2_AVAILABLE,
+                limits=CONNECTION_LIMITS,
+                timeout=REQUEST_TIMEOUT,
+            )
+        self._http_client = http_client
+
+    async def __aenter__(self) -> "AsyncGPWClient":
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        await self._http_client.aclose()
+
+    async def companies_list(self, search: str = "", concurrency: int = 1) -> AsyncIterator[httpx.Response]:
+        async for response in async_ordered_map(
+            self._post_companies_request, self._companies_requests(search), concurrency=concurrency
+        ):
+            yield response
+
+    async def _post_companies_request(self, companies_request: tuple[str, dict[str, str]]) -> httpx.Response:
+        url, params = companies_request
+        return await self._send("POST", url, DataKindEnum.COMPANIES, ttl=self._cache_policy.companies_ttl, data=params)
+
+    async def reports_list(
+        self,
+        search: str = "",
+        for_date: Optional[date] = None,
+        page_size: int = REPORTS_PAGE_SIZE,
+        prefetch: int = 0,
+        offset: int = 0,
+    ) -> AsyncIterator[httpx.Response]:
+        self._check_reports_paging(page_size, prefetch)
+        fetch_page = functools.partial(self._post_reports_request, limit=page_size, search=search, for_date=for_date)
+        responses = async_ordered_map(fetch_page, itertools.count(offset, page_size), concurrency=prefetch + 1)
+
+        try:
+            async for response in responses:
+                # NOTE: an error page has no entries either, it must not pass for the last page.
+                response.raise_for_status()
+                report_entries_count = self._get_entries_count(response.content, REPORT_ENTRY_STR)
+
+                # Empty page.
+                if report_entries_count == 0:
+                    break
+
+                yield response
+
+                # Last page.
+                if report_entries_count < page_size:
+                    break
+        finally:
+            await responses.aclose()
+
+    async def _post_reports_request(
+        self, offset: int, limit: int, search: str, for_date: Optional[date]
+    ) -> httpx.Response:
+        return await self._send(
+            "POST",
+            self.config.reports_url,
+            DataKindEnum.REPORTS,
+            ttl=self._reports_ttl(for_date),
+            data=self._reports_request_data(offset, limit, search, for_date),
+        )
+
+    async def reports_page(
+        self, offset: int = 0, limit: int = REPORTS_PAGE_SIZE, search: str = "", revalidate: bool = False
+    ) -> httpx.Response:
+        """Single page of current reports. With `revalidate` a cached page is always checked with the server."""
+        return await self._send(
+            "POST",
+            self.config.reports_url,
+            DataKindEnum.REPORTS,
+            ttl=0 if revalidate else self._reports_ttl(None),
+            data=self._reports_request_data(offset, limit, search, None),
+        )
+
+    async def stock_quotes(self, date_: date) -> Optional[httpx.Response]:
+        response = await self._send(
+            "GET",
+            STOCK_QUOTES_URL,
+            DataKindEnum.STOCK_QUOTES,
+            ttl=self._stock_quotes_ttl(date_),
+            params=self._stock_quotes_params(date_),
+            read_if=self._is_stock_quotes_response,
+        )
+        response.raise_for_status()
+        if not self._is_stock_quotes_response(response):
+            return None
+        return response
+
+    async def _send(
+        self,
+        method: str,
+        url: str,
+        endpoint: DataKindEnum,
+        ttl: Optional[float],
+        data: Optional[dict[str, Any]] = None,
+        params: Optional[dict[str, Any]] = None,
+        read_if: Callable[[httpx.Response], bool] = lambda response: True,
+    ) -> httpx.Response:
+        key, entry = self._get_cache_entry(method, url, data if data is not None else params)
+        if entry and entry.is_fresh():
+            self._record_cached_page(endpoint)
+            return entry.to_response(httpx.Request(method, url, params=params))
+
+        headers = entry.conditional_headers() if entry else {}
+
+        async def attempt() -> httpx.Response:
+            async with self._http_client.stream(method, url, data=data, params=params, headers=headers) as response:
+                if response.status_code != httpx.codes.NOT_MODIFIED and read_if(response):
+                    await response.aread()
+            return response
+
+        started_at = time.perf_counter()
+        response = await self._scheduler.arun(url, attempt)
+        self._record_request(endpoint, time.perf_counter() - started_at, response.num_bytes_downloaded)
+        if entry and response.status_code == httpx.codes.NOT_MODIFIED:
+            return self._revalidated_response(key, entry, response.request)
+        if not read_if(response):
+            self._set_cache_entry(key, response, self._rejected_ttl(ttl), content=b"")
+            return response
+        self._set_cache_entry(key, response, ttl, content=response.content)
+        return response
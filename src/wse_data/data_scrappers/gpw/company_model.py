@@ -1,11 +1,6 @@
-from enum import Enum
-
 from pydantic import BaseModel, Field
 
-
-class MarketEnum(str, Enum):
-    GPW = "GPW"
-    NEW_CONNECT = "NEW-CONNECT"
+from wse_data.data_scrappers.gpw.market import MarketEnum as MarketEnum
 
 
 class CompanyModel(BaseModel):
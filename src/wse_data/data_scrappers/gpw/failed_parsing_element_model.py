@@ -1,5 +1,104 @@
-from pydantic import BaseModel
+import logging
+import re
+from collections import Counter
+from typing import Any, Callable, Optional, Union
+
+from pydantic import BaseModel, root_validator
+
+DICT_ARGUMENTS = (
+    "include",
+    "exclude",
+    "by_alias",
+    "skip_defaults",
+    "exclude_unset",
+    "exclude_defaults",
+    "exclude_none",
+)
 
 
 class FailedParsingElementModel(BaseModel):
-    raw_data: bytes
+    """
+    Row which failed parsing. `page` is the whole response page, shared by all failed rows of the page rather than
+    copied, and the row spans from `start` to `end` in it. `error` is the exception type name. The row alone can
+    still be given as `raw_data`. Exports have `raw_data` instead of the page.
+    """
+
+    page: bytes
+    start: int
+    end: int
+    error: str
+
+    @root_validator(pre=True)
+    def _raw_data_as_page(cls, values: dict[str, Any]) -> dict[str, Any]:
+        if "raw_data" in values and "page" not in values:
+            raw_data = values.pop("raw_data")
+            values.update(page=raw_data, start=0, end=len(raw_data))
+        return values
+
+    @property
+    def raw_data(self) -> bytes:
+        if self.start == 0 and self.end == len(self.page):
+            return self.page
+        start, end = self.start, self.end
+        return bytes(memoryview(self.page)[start:end])
+
+    def dict(self, **kwargs: Any) -> dict[str, Any]:
+        # NOTE: the page is shared by all failed rows of a page, exporting it would repeat it for every row.
+        values = super().dict(**kwargs)
+        if values.pop("page", None) is not None:
+            values["raw_data"] = self.raw_data
+        return values
+
+    def json(self, *, encoder: Optional[Callable[[Any], Any]] = None, **kwargs: Any) -> str:
+        dict_kwargs = {key: kwargs.pop(key) for key in DICT_ARGUMENTS if key in kwargs}
+        kwargs.pop("models_as_dict", None)
+        return self.__config__.json_dumps(self.dict(**dict_kwargs), default=encoder or self.__json_encoder__, **kwargs)
+
+    def __repr_args__(self) -> list[tuple[Optional[str], Any]]:
+        # NOTE: never print the whole page.
+        return [("raw_data", self.raw_data), ("error", self.error)]
+
+
+class PageFailures:
+    """
+    Failed rows of a single page, counted by exception type. Rows are located by their opening and closing tags,
+    searching forward from the previously located row, so all failures of a page cost at most one pass over it.
+    `row_start` must end where the tag name or an attribute value ends, so `<li` does not match `<link`.
+    """
+
+    def __init__(self, page: Union[bytes, str], row_start: bytes, row_end: bytes) -> None:
+        self.page = page.encode("utf-8") if isinstance(page, str) else page
+        self.counts: Counter[str] = Counter()
+        self._row_start = re.compile(re.escape(row_start) + rb"""(?=[\s>/"'])""")
+        self._row_end = row_end
+        self._row_index = -1
+        self._row_span_found = (0, len(self.page))
+
+    def failed_element(self, row_index: int, exc: Exception) -> FailedParsingElementModel:
+        error = type(exc).__name__
+        self.counts[error] += 1
+        start, end = self._row_span(row_index)
+        return FailedParsingElementModel(page=self.page, start=start, end=end, error=error)
+
+    def log_summary(self, logger: logging.Logger, rows_name: str) -> None:
+        log_failure_counts(logger, self.counts, rows_name)
+
+    def _row_span(self, row_index: int) -> tuple[int, int]:
+        while self._row_index < row_index:
+            position = self._row_span_found[0] + 1 if self._row_index >= 0 else 0
+            match = self._row_start.search(self.page, position)
+            if match is None:
+                # NOTE: rows not found by tags, fall back to the whole page.
+                return 0, len(self.page)
+            start = match.start()
+            end = self.page.find(self._row_end, start)
+            self._row_span_found = (start, len(self.page) if end == -1 else end + len(self._row_end))
+            self._row_index += 1
+        return self._row_span_found
+
+
+def log_failure_counts(logger: logging.Logger, counts: "Counter[str]", rows_name: str) -> None:
+    """Single warning per page instead of a traceback per failed row."""
+    if counts:
+        errors = ", ".join(f"{error}: {count}" for error, count in counts.most_common())
+        logger.warning(f"Failed to parse {sum(counts.values())} {rows_name} of a page ({errors}).")
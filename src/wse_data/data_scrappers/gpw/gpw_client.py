@@ -1,88 +1,324 @@
+import functools
+import itertools
 import logging
+import time
+from contextlib import ExitStack, closing
 from datetime import date
-from typing import Iterator, Optional, Union
+from typing import Any, BinaryIO, Callable, Generator, Iterator, Mapping, Optional, Union
 
 import httpx
 from httpx import Timeout
 
+from wse_data.concurrency import ordered_map
 from wse_data.data_scrappers.gpw.company_model import MarketEnum
 from wse_data.data_scrappers.gpw.gpw_config import GPWConfig
 from wse_data.data_scrappers.gpw.new_connect_config import NewConnectConfig
+from wse_data.data_scrappers.gpw.request_scheduler import RequestScheduler, default_scheduler
+from wse_data.data_scrappers.gpw.response_cache import CacheEntry, CachePolicy, ResponseCache, cache_key
+from wse_data.metrics import DOWNLOADED_BYTES, PAGES_FETCHED, REQUEST_SECONDS, DataKindEnum, MetricsSink
 
 logger = logging.getLogger(__name__)
 
+STOCK_QUOTES_URL = "https://www.gpw.pl/archiwum-notowan"
+STOCK_QUOTES_CONTENT_TYPE = "application/vnd.ms-excel"
+REPORTS_PAGE_SIZE = 20
+REPORT_ENTRY_STR = b"<li"
+REQUEST_TIMEOUT = Timeout(timeout=10.0)
+
 
 class UnmappedEnumException(Exception):
     pass
 
 
-class GPWClient:
+class BaseGPWClient:
+    """Request building shared by the blocking and the asyncio clients."""
+
     _market: MarketEnum
+    _scheduler: RequestScheduler
+    _cache: Optional[ResponseCache]
+    _cache_policy: CachePolicy
+    _metrics: Optional[MetricsSink]
     config: Union[GPWConfig, NewConnectConfig]
 
-    def __init__(self, market: MarketEnum) -> None:
+    def __init__(
+        self,
+        market: MarketEnum,
+        cache: Optional[ResponseCache] = None,
+        cache_policy: Optional[CachePolicy] = None,
+        scheduler: Optional[RequestScheduler] = None,
+        metrics: Optional[MetricsSink] = None,
+    ) -> None:
         self._market = market
+        self._scheduler = scheduler or default_scheduler()
+        self._cache = cache
+        self._cache_policy = cache_policy or CachePolicy()
+        self._metrics = metrics
         if market == MarketEnum.GPW:
             self.config = GPWConfig()
         elif market == MarketEnum.NEW_CONNECT:
             self.config = NewConnectConfig()
 
-    def companies_list(self, search: str = "") -> Iterator[httpx.Response]:
-        for url, params in self.config.companies_requests:
-            params["filters[search]"] = search
-            yield httpx.post(
-                url,
-                data=params,
-                timeout=Timeout(timeout=10.0),
-            )
-
-    # TODO: a lot of code the same as companies_list. Abstract common code, add retry and other stuff.
-    def reports_list(self, search: str = "", for_date: Optional[date] = None) -> Iterator[httpx.Response]:
-        limit = 20
-        offset = 0
-        report_entry_str = b"<li"
-
-        while True:
-            query_params = {
-                "limit": limit,
-                "offset": offset,
-                "searchText": search,
-            }
-            if for_date:
-                query_params["date"] = for_date.strftime("%d-%m-%Y")
-            query_params.update(self.config.reports_query_params)
-            response = httpx.post(
-                self.config.reports_url,
-                data=query_params,
-                timeout=Timeout(timeout=10.0),
-            )
-
-            report_entries_count = self._get_entries_count(response.content, report_entry_str)
-
-            # Empty page.
-            if report_entries_count == 0:
-                break
-
-            offset += limit
-
-            yield response
-
-            # Last page.
-            if report_entries_count < limit:
-                break
+    def _companies_requests(self, search: str) -> list[tuple[str, dict[str, str]]]:
+        return [(url, {**params, "filters[search]": search}) for url, params in self.config.companies_requests]
+
+    def _reports_request_data(
+        self, offset: int, limit: int, search: str, for_date: Optional[date]
+    ) -> dict[str, Union[str, int, list[str]]]:
+        query_params: dict[str, Union[str, int, list[str]]] = {
+            "limit": limit,
+            "offset": offset,
+            "searchText": search,
+        }
+        if for_date:
+            query_params["date"] = for_date.strftime("%d-%m-%Y")
+        query_params.update(self.config.reports_query_params)
+        return query_params
+
+    def _stock_quotes_params(self, date_: date) -> dict[str, Union[str, int]]:
+        return {"fetch": 1, "type": 10, "date": date_.strftime("%d-%m-%Y")}
+
+    def _is_stock_quotes_response(self, response: httpx.Response) -> bool:
+        # NOTE: if no report exist for given day gpw.pl returns html
+        return response.headers["content-type"] == STOCK_QUOTES_CONTENT_TYPE
+
+    def _get_entries_count(self, content: bytes, entry_string: bytes) -> int:
+        return content.count(entry_string)
+
+    def _check_reports_paging(self, page_size: int, prefetch: int) -> None:
+        # NOTE: a page size of 0 requests the same offset forever.
+        if page_size < 1:
+            raise ValueError(f"page_size must be positive, got {page_size}.")
+        if prefetch < 0:
+            raise ValueError(f"prefetch must not be negative, got {prefetch}.")
+
+    def _reports_ttl(self, for_date: Optional[date]) -> float:
+        if for_date and for_date < date.today():
+            return self._cache_policy.historical_reports_ttl
+        return self._cache_policy.reports_ttl
+
+    def _stock_quotes_ttl(self, date_: date) -> Optional[float]:
+        # NOTE: archive of past days never changes.
+        return None if date_ < date.today() else self._cache_policy.stock_quotes_ttl
+
+    def _rejected_ttl(self, ttl: Optional[float]) -> float:
+        return self._cache_policy.rejected_ttl if ttl is None else min(ttl, self._cache_policy.rejected_ttl)
+
+    def _get_cache_entry(
+        self, method: str, url: str, params: Optional[Mapping[str, Any]]
+    ) -> tuple[str, Optional[CacheEntry]]:
+        key = cache_key(method, url, params)
+        return key, self._cache.get(key) if self._cache else None
+
+    def _set_cache_entry(self, key: str, response: httpx.Response, ttl: Optional[float], content: bytes) -> None:
+        if self._cache and response.status_code == httpx.codes.OK:
+            self._cache.set(key, CacheEntry.from_response(response, ttl=ttl, content=content))
+
+    def _record_request(self, endpoint: DataKindEnum, seconds: float, downloaded_bytes: int) -> None:
+        if self._metrics is None:
+            return
+        labels = {"endpoint": endpoint.value, "market": self._market.value}
+        self._metrics.observe(REQUEST_SECONDS, seconds, **labels)
+        self._metrics.increment(DOWNLOADED_BYTES, downloaded_bytes, **labels)
+        self._metrics.increment(PAGES_FETCHED, 1, **labels)
+
+    def _record_cached_page(self, endpoint: DataKindEnum) -> None:
+        if self._metrics is not None:
+            self._metrics.increment(PAGES_FETCHED, endpoint=endpoint.value, market=self._market.value)
+
+    def _revalidated_response(self, key: str, entry: CacheEntry, request: httpx.Request) -> httpx.Response:
+        if self._cache:
+            self._cache.set(key, entry.copy(update={"stored_at": time.time()}))
+        return entry.to_response(request)
+
+
+class GPWClient(BaseGPWClient):
+    def companies_list(self, search: str = "", concurrency: int = 1) -> Iterator[httpx.Response]:
+        """
+        Yields responses in config order. With `concurrency` > 1 up to that many requests are sent at once,
+        so the whole list costs about as much as the slowest request.
+        """
+        companies_requests = self._companies_requests(search)
+        if concurrency > 1:
+            yield from ordered_map(self._post_companies_request, companies_requests, workers=concurrency)
+            return
+        for companies_request in companies_requests:
+            yield self._post_companies_request(companies_request)
+
+    def _post_companies_request(self, companies_request: tuple[str, dict[str, str]]) -> httpx.Response:
+        url, params = companies_request
+        return self._send("POST", url, DataKindEnum.COMPANIES, ttl=self._cache_policy.companies_ttl, data=params)
+
+    def reports_list(
+        self,
+        search: str = "",
+        for_date: Optional[date] = None,
+        page_size: int = REPORTS_PAGE_SIZE,
+        prefetch: int = 0,
+        offset: int = 0,
+    ) -> Iterator[httpx.Response]:
+        """
+        Yields report pages in offset order, starting at `offset`. With `prefetch` > 0 that many following pages
+        are requested while the current one is consumed; requests past the last page are cancelled or discarded.
+        """
+        self._check_reports_paging(page_size, prefetch)
+        fetch_page = functools.partial(self._post_reports_request, limit=page_size, search=search, for_date=for_date)
+        offsets = itertools.count(offset, page_size)
+        responses: Generator[httpx.Response, None, None]
+        if prefetch > 0:
+            responses = ordered_map(fetch_page, offsets, workers=prefetch + 1)
+        else:
+            responses = (fetch_page(offset) for offset in offsets)
+
+        with closing(responses):
+            for response in responses:
+                # NOTE: an error page has no entries either, it must not pass for the last page.
+                response.raise_for_status()
+                report_entries_count = self._get_entries_count(response.content, REPORT_ENTRY_STR)
+
+                # Empty page.
+                if report_entries_count == 0:
+                    break
+
+                yield response
+
+                # Last page.
+                if report_entries_count < page_size:
+                    break
+
+    def _post_reports_request(self, offset: int, limit: int, search: str, for_date: Optional[date]) -> httpx.Response:
+        return self._send(
+            "POST",
+            self.config.reports_url,
+            DataKindEnum.REPORTS,
+            ttl=self._reports_ttl(for_date),
+            data=self._reports_request_data(offset, limit, search, for_date),
+        )
+
+    def reports_page(
+        self, offset: int = 0, limit: int = REPORTS_PAGE_SIZE, search: str = "", revalidate: bool = False
+    ) -> httpx.Response:
+        """Single page of current reports. With `revalidate` a cached page is always checked with the server."""
+        return self._send(
+            "POST",
+            self.config.reports_url,
+            DataKindEnum.REPORTS,
+            ttl=0 if revalidate else self._reports_ttl(None),
+            data=self._reports_request_data(offset, limit, search, None),
+        )
+
+    def reports_page_chunks(
+        self,
+        offset: int = 0,
+        limit: int = REPORTS_PAGE_SIZE,
+        search: str = "",
+        for_date: Optional[date] = None,
+    ) -> Iterator[bytes]:
+        """Streams body of a single reports page. Response cache is not used."""
+        with ExitStack() as stack:
+
+            def open_stream() -> httpx.Response:
+                return stack.enter_context(
+                    httpx.stream(
+                        "POST",
+                        self.config.reports_url,
+                        data=self._reports_request_data(offset, limit, search, for_date),
+                        timeout=REQUEST_TIMEOUT,
+                    )
+                )
+
+            started_at = time.perf_counter()
+            response = self._scheduler.run(self.config.reports_url, open_stream)
+            seconds = time.perf_counter() - started_at
+            yield from response.iter_bytes()
+            self._record_request(DataKindEnum.REPORTS, seconds, response.num_bytes_downloaded)
 
     def stock_quotes(self, date_: date) -> Optional[httpx.Response]:
         # TODO: integration test for this
-        response = httpx.get(
-            "https://www.gpw.pl/archiwum-notowan",
-            params={"fetch": 1, "type": 10, "date": date_.strftime("%d-%m-%Y")},
+        # NOTE: headers are enough to tell a non-trading day, so its html body is never downloaded.
+        response = self._send(
+            "GET",
+            STOCK_QUOTES_URL,
+            DataKindEnum.STOCK_QUOTES,
+            ttl=self._stock_quotes_ttl(date_),
+            params=self._stock_quotes_params(date_),
+            read_if=self._is_stock_quotes_response,
         )
-
-        # NOTE: if no report exist for given day gpw.pl returns html
-        if response.headers["content-type"] != "application/vnd.ms-excel":
+        # NOTE: an error still failing after retries is not a day without quotes, it's raised.
+        response.raise_for_status()
+        if not self._is_stock_quotes_response(response):
             # TODO: or should it be manually created 404? Do this coherently across clients.
             return None
         return response
 
-    def _get_entries_count(self, content: bytes, entry_string: bytes) -> int:
-        return content.count(entry_string)
+    def stock_quotes_to_file(self, date_: date, file: BinaryIO) -> bool:
+        """
+        Writes stock quotes sheet of `date_` to `file`, returning False for days without one. Without a response
+        cache the body goes to the file chunk by chunk as it is downloaded, so the whole sheet is never in memory.
+        """
+        if self._cache is not None:
+            # NOTE: cache entries hold the whole content anyway.
+            response = self.stock_quotes(date_)
+            if response is None:
+                return False
+            file.write(response.content)
+            return True
+
+        with ExitStack() as stack:
+
+            def open_stream() -> httpx.Response:
+                return stack.enter_context(
+                    httpx.stream(
+                        "GET", STOCK_QUOTES_URL, params=self._stock_quotes_params(date_), timeout=REQUEST_TIMEOUT
+                    )
+                )
+
+            started_at = time.perf_counter()
+            response = self._scheduler.run(STOCK_QUOTES_URL, open_stream)
+            response.raise_for_status()
+            is_stock_quotes_response = self._is_stock_quotes_response(response)
+            if is_stock_quotes_response:
+                for chunk in response.iter_bytes():
+                    file.write(chunk)
+            seconds = time.perf_counter() - started_at
+            self._record_request(DataKindEnum.STOCK_QUOTES, seconds, response.num_bytes_downloaded)
+        return is_stock_quotes_response
+
+    def _send(
+        self,
+        method: str,
+        url: str,
+        endpoint: DataKindEnum,
+        ttl: Optional[float],
+        data: Optional[dict[str, Any]] = None,
+        params: Optional[dict[str, Any]] = None,
+        read_if: Callable[[httpx.Response], bool] = lambda response: True,
+    ) -> httpx.Response:
+        """
+        Sends request through the response cache, if there is one, and the request scheduler. Stale entries are
+        revalidated with a conditional request. Body of responses rejected by `read_if` is not downloaded.
+        """
+        key, entry = self._get_cache_entry(method, url, data if data is not None else params)
+        if entry and entry.is_fresh():
+            self._record_cached_page(endpoint)
+            return entry.to_response(httpx.Request(method, url, params=params))
+
+        headers = entry.conditional_headers() if entry else {}
+
+        def attempt() -> httpx.Response:
+            with httpx.stream(
+                method, url, data=data, params=params, headers=headers, timeout=REQUEST_TIMEOUT
+            ) as response:
+                if response.status_code != httpx.codes.NOT_MODIFIED and read_if(response):
+                    response.read()
+            return response
+
+        started_at = time.perf_counter()
+        response = self._scheduler.run(url, attempt)
+        self._record_request(endpoint, time.perf_counter() - started_at, response.num_bytes_downloaded)
+        if entry and response.status_code == httpx.codes.NOT_MODIFIED:
+            return self._revalidated_response(key, entry, response.request)
+        if not read_if(response):
+            self._set_cache_entry(key, response, self._rejected_ttl(ttl), content=b"")
+            return response
+        self._set_cache_entry(key, response, ttl, content=response.content)
+        return response
@@ -0,0 +1,72 @@
+from typing import Any, Iterable
+
+import xlrd
+
+from wse_data.data_scrappers.gpw.gpw_parser import ColumnarOutputNotAvailableException
+
+try:
+    import numpy
+except ImportError as exc:
+    raise ColumnarOutputNotAvailableException("Columnar stock quotes require numpy package.") from exc
+
+# NOTE: prices are float64, the xls sheet stores them as doubles too, so no precision is lost compared to the
+# source. Rounding to Decimal like in StockQuotesModel is left to the caller.
+STOCK_QUOTES_DTYPE = numpy.dtype(
+    [
+        ("date", "datetime64[D]"),
+        ("company_name", object),
+        ("company_isin", "U12"),
+        ("opening", numpy.float64),
+        ("closing", numpy.float64),
+        ("max", numpy.float64),
+        ("min", numpy.float64),
+        ("volume", numpy.int64),
+    ]
+)
+# Sheet column of every field, same as in GPWParser.parse_stock_quotes_xls.
+STOCK_QUOTES_COLUMNS = {
+    "date": 0,
+    "company_name": 1,
+    "company_isin": 2,
+    "opening": 4,
+    "max": 5,
+    "min": 6,
+    "closing": 7,
+    "volume": 9,
+}
+
+# numpy structured array with STOCK_QUOTES_DTYPE; numpy is untyped for mypy, see pyproject.toml.
+StockQuotesArray = Any
+
+
+def parse_stock_quotes_columns(xls_content: bytes) -> StockQuotesArray:
+    """
+    Reads the quotes sheet column by column into a structured array with STOCK_QUOTES_DTYPE, one record per row.
+    Fields are accessed by name, `records["closing"]`, as `max` and `min` would clash with recarray attributes.
+    """
+    sheet = xlrd.open_workbook(file_contents=xls_content).sheet_by_index(0)
+    records = numpy.empty(max(sheet.nrows - 1, 0), dtype=STOCK_QUOTES_DTYPE)
+    for field, column in STOCK_QUOTES_COLUMNS.items():
+        values = sheet.col_values(column, start_rowx=1)
+        if field == "volume":
+            # NOTE: numeric cells are always floats in xls.
+            records[field] = numpy.array(values, dtype=numpy.float64)
+        else:
+            records[field] = values
+    return records
+
+
+def concatenate_stock_quotes_columns(day_records: Iterable[StockQuotesArray]) -> StockQuotesArray:
+    arrays = list(day_records)
+    if not arrays:
+        return numpy.empty(0, dtype=STOCK_QUOTES_DTYPE)
+    return numpy.concatenate(arrays)
+
+
+def stock_quotes_arrow_table(records: StockQuotesArray) -> Any:
+    """Arrow table with the same columns as `records`; dates become date32 and strings become utf8."""
+    try:
+        import pyarrow
+    except ImportError as exc:
+        raise ColumnarOutputNotAvailableException("Arrow stock quotes table requires pyarrow package.") from exc
+    return pyarrow.table({field: pyarrow.array(records[field]) for field in STOCK_QUOTES_DTYPE.names or ()})
@@ -0,0 +1,195 @@
+import logging
+from typing import Any, Iterator, Union
+
+from lxml import etree, html
+from pydantic import ValidationError
+
+from wse_data.data_scrappers.gpw.company_model import CompanyModel, MarketEnum
+from wse_data.data_scrappers.gpw.failed_parsing_element_model import FailedParsingElementModel, PageFailures
+from wse_data.data_scrappers.gpw.gpw_parser import (
+    COMPANY_ROW_TAGS,
+    REPORT_ROW_TAGS,
+    CompanyIdNotFoundException,
+    CompanyNameNotFoundException,
+    CompanySymbolNotFoundException,
+    EmptyPageException,
+    GPWParserException,
+    ReportDataTagNotFound,
+    ReportIdNotFoundException,
+    ReportNameNotFoundException,
+    ReportSummaryNotFoundException,
+    _ReportData,
+    parse_report_company_isin_text,
+    build_model,
+    parse_report_data_text,
+    parse_report_id_href,
+)
+from wse_data.data_scrappers.gpw.report_model import ReportModel
+
+logger = logging.getLogger(__name__)
+
+
+def _has_class(class_name: str) -> str:
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {class_name} ')"
+
+
+# NOTE: XPath equivalents of selectors used by the BeautifulSoup backend, compiled once.
+COMPANY_ROWS_XPATH = etree.XPath(f"//tr[{_has_class('trclass')}]")
+GPW_COMPANY_ID_XPATH = etree.XPath(f".//td[{_has_class('col3')}]")
+GPW_COMPANY_NAME_XPATH = etree.XPath(f".//*[{_has_class('col2')}]//a")
+GPW_COMPANY_TICKER_XPATH = etree.XPath(f".//td[{_has_class('col4')}]")
+NEW_CONNECT_COMPANY_ID_XPATH = etree.XPath(f".//td[{_has_class('col2')}]")
+NEW_CONNECT_COMPANY_NAME_XPATH = etree.XPath(f".//*[{_has_class('col1')}]//a")
+NEW_CONNECT_COMPANY_TICKER_XPATH = etree.XPath(f".//td[{_has_class('col3')}]")
+REPORT_ROWS_XPATH = etree.XPath("//li")
+REPORT_DATA_XPATH = etree.XPath(f".//*[{_has_class('date')}]")
+REPORT_ID_XPATH = etree.XPath(".//a[contains(@href, 'geru_id=')]/@href")
+REPORT_NAME_XPATH = etree.XPath(f".//*[{_has_class('name')}]//a")
+REPORT_SUMMARY_XPATH = etree.XPath(".//p")
+
+HTML_PARSER = html.HTMLParser(encoding="utf-8")
+
+
+class LxmlGPWParser:
+    """GPWParser backend producing the same models as the BeautifulSoup one, using libxml2 and compiled XPath."""
+
+    market: MarketEnum
+    trusted: bool
+
+    def __init__(self, market: MarketEnum, trusted: bool = False):
+        self.market = market
+        self.trusted = trusted
+        if market == MarketEnum.GPW:
+            self._company_xpaths = (GPW_COMPANY_ID_XPATH, GPW_COMPANY_NAME_XPATH, GPW_COMPANY_TICKER_XPATH)
+        else:
+            self._company_xpaths = (
+                NEW_CONNECT_COMPANY_ID_XPATH,
+                NEW_CONNECT_COMPANY_NAME_XPATH,
+                NEW_CONNECT_COMPANY_TICKER_XPATH,
+            )
+
+    def parse_companies_page(self, response_page: bytes) -> Iterator[Union[CompanyModel, FailedParsingElementModel]]:
+        document = self._parse_document(response_page)
+        if document is None:
+            return
+        failures = PageFailures(response_page, *COMPANY_ROW_TAGS)
+        try:
+            for index, row in enumerate(COMPANY_ROWS_XPATH(document)):
+                try:
+                    yield build_model(
+                        CompanyModel,
+                        self.trusted,
+                        isin=self._parse_company_id(row),
+                        name=self._parse_company_name(row),
+                        ticker=self._parse_company_ticker(row),
+                        market=self.market,
+                    )
+                except (GPWParserException, ValidationError) as exc:
+                    logger.debug(f"Failed to parse company row {index}: {exc!r}")
+                    yield failures.failed_element(index, exc)
+        finally:
+            failures.log_summary(logger, "company rows")
+
+    def parse_reports_page(self, response_page: bytes) -> Iterator[Union[ReportModel, FailedParsingElementModel]]:
+        document = self._parse_document(response_page)
+        rows = REPORT_ROWS_XPATH(document) if document is not None else []
+        if not rows:
+            logger.warning("Parser received empty page.")
+            raise EmptyPageException()
+
+        failures = PageFailures(response_page, *REPORT_ROW_TAGS)
+        try:
+            for index, row in enumerate(rows):
+                try:
+                    report_data = self._parse_report_data(row)
+                    yield build_model(
+                        ReportModel,
+                        self.trusted,
+                        gpw_id=self._parse_report_id(row),
+                        company_isin=self._parse_report_company_isin(row),
+                        name=self._parse_report_name(row),
+                        summary=self._parse_report_summary(row),
+                        datetime=report_data.datetime,
+                        category=report_data.category,
+                        type=report_data.type,
+                    )
+                except (GPWParserException, ValidationError) as exc:
+                    logger.debug(f"Failed to parse report row {index}: {exc!r}")
+                    yield failures.failed_element(index, exc)
+        finally:
+            failures.log_summary(logger, "report rows")
+
+    def _parse_document(self, response_page: Union[bytes, str]) -> Any:
+        if isinstance(response_page, str):
+            response_page = response_page.encode("utf-8")
+        try:
+            return html.document_fromstring(response_page, parser=HTML_PARSER)
+        except etree.ParserError:
+            # NOTE: raised for whitespace only documents.
+            return None
+
+    def _parse_company_id(self, company_row: Any) -> str:
+        isin_tags = self._company_xpaths[0](company_row)
+        if not isin_tags:
+            raise CompanyIdNotFoundException(f"Failed to parse company id: {self._describe_row(company_row)}")
+        return self._get_stripped_text(isin_tags[0])
+
+    def _parse_company_name(self, company_row: Any) -> str:
+        name_tags = self._company_xpaths[1](company_row)
+        if not name_tags:
+            raise CompanyNameNotFoundException(f"Failed to parse company name: {self._describe_row(company_row)}")
+        return self._get_stripped_text(name_tags[0])
+
+    def _parse_company_ticker(self, company_row: Any) -> str:
+        ticker_tags = self._company_xpaths[2](company_row)
+        if not ticker_tags:
+            raise CompanySymbolNotFoundException(f"Failed to parse company ticker: {self._describe_row(company_row)}")
+        return self._get_stripped_text(ticker_tags[0])
+
+    def _parse_report_data(self, report_row: Any) -> _ReportData:
+        data_tags = REPORT_DATA_XPATH(report_row)
+        if not data_tags:
+            raise ReportDataTagNotFound(f"Failed to find data tag: {self._describe_row(report_row)}")
+        return parse_report_data_text(
+            self._get_own_text(data_tags[0]), self._describe_row(report_row), trusted=self.trusted
+        )
+
+    def _parse_report_id(self, report_row: Any) -> str:
+        hrefs = REPORT_ID_XPATH(report_row)
+        if not hrefs:
+            raise ReportIdNotFoundException(f"Failed to find report id: {self._describe_row(report_row)}")
+        return parse_report_id_href(str(hrefs[0]))
+
+    def _parse_report_company_isin(self, report_row: Any) -> str:
+        name_tags = REPORT_NAME_XPATH(report_row)
+        if not name_tags:
+            raise ReportNameNotFoundException(f"Failed to find report company isin: {self._describe_row(report_row)}")
+        return parse_report_company_isin_text(self._get_own_text(name_tags[0]), self._describe_row(report_row))
+
+    def _parse_report_name(self, report_row: Any) -> str:
+        name_tags = REPORT_NAME_XPATH(report_row)
+        if not name_tags:
+            raise ReportNameNotFoundException(f"Failed to find report name: {self._describe_row(report_row)}")
+        return self._get_own_text(name_tags[0])
+
+    def _parse_report_summary(self, report_row: Any) -> str:
+        summary_tags = REPORT_SUMMARY_XPATH(report_row)
+        if not summary_tags:
+            raise ReportSummaryNotFoundException(f"Failed to find report summary: {self._describe_row(report_row)}")
+        return self._get_own_text(summary_tags[0])
+
+    def _get_stripped_text(self, element: Any) -> str:
+        # NOTE: same as BeautifulSoup `get_text(strip=True)`.
+        return "".join(text.strip() for text in element.itertext())
+
+    def _get_own_text(self, element: Any) -> str:
+        # NOTE: same as joining NavigableString children in BeautifulSoup, where comments are strings too.
+        texts = [element.text or ""]
+        for child in element:
+            if child.tag is etree.Comment:
+                texts.append(child.text or "")
+            texts.append(child.tail or "")
+        return "".join(texts).strip()
+
+    def _describe_row(self, row: Any) -> str:
+        return f"row at line {row.sourceline}"
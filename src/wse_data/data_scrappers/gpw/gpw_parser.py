@@ -1,21 +1,33 @@
+import functools
 import logging
 import re
 from decimal import Decimal
-from typing import Iterator, Union
+from enum import Enum
+from typing import TYPE_CHECKING, Any, Generator, Iterable, Iterator, Optional, Type, TypeVar, Union
 from datetime import datetime
-from urllib.parse import parse_qs, urlparse
+from pathlib import Path
+from urllib.parse import parse_qs, unquote_plus, urlparse
 
-import xlrd
-from bs4 import BeautifulSoup, NavigableString, Tag
 from pydantic import ValidationError, BaseModel
+from pydantic.error_wrappers import ErrorWrapper
+from pydantic.errors import AnyStrMinLengthError
 
 from wse_data.data_scrappers.gpw.company_model import MarketEnum, CompanyModel
-from wse_data.data_scrappers.gpw.failed_parsing_element_model import FailedParsingElementModel
+from wse_data.data_scrappers.gpw.failed_parsing_element_model import FailedParsingElementModel, PageFailures
 from wse_data.data_scrappers.gpw.report_model import ReportCategory, ReportType, ReportModel
 from wse_data.data_scrappers.gpw.stock_quotes_model import StockQuotesModel
 
+# NOTE: bs4 and xlrd are imported where used, so importing the parser (and the CLI) does not load them.
+if TYPE_CHECKING:
+    from bs4 import NavigableString, Tag
+    from xlrd.book import Book
+
+    from wse_data.data_scrappers.gpw.gpw_columnar_parser import StockQuotesArray
+
 logger = logging.getLogger(__name__)
 
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
 
 class GPWParserException(Exception):
     message: str
@@ -60,6 +72,22 @@ class ReportNameNotFoundException(GPWParserException):
     pass
 
 
+class ParserBackendNotAvailableException(GPWParserException):
+    pass
+
+
+class ColumnarOutputNotAvailableException(GPWParserException):
+    pass
+
+
+class ParserBackend(str, Enum):
+    BS4 = "bs4"
+    # NOTE: BS4 with reports rows walked once for all fields, see `_extract_report_row`.
+    BS4_SINGLE_PASS = "bs4-single-pass"
+    # NOTE: needs optional lxml package.
+    LXML = "lxml"
+
+
 class _ReportData(BaseModel):
     datetime: datetime
     category: ReportCategory
@@ -67,159 +95,373 @@ class _ReportData(BaseModel):
 
 
 REPORT_COMPANY_ISIN_RE = re.compile(r"\(([a-z,A-Z,0-9]*)\)")
+REPORT_ID_RE = re.compile(r"[?&]geru_id=([^&#]+)")
+# Tags locating failed rows in raw pages.
+COMPANY_ROW_TAGS = (b'<tr class="trclass', b"</tr>")
+REPORT_ROW_TAGS = (b"<li", b"</li>")
+
+
+def build_model(model_type: Type[ModelT], trusted: bool, **values: Any) -> ModelT:
+    """
+    Validated model, or with `trusted` a model created by `construct()` without validation. Trusted values must
+    already be of the field types, e.g. enums and dates rather than strings; only `min_length` of fields is
+    checked, so rows with empty fields still fail like validated ones.
+    """
+    if not trusted:
+        return model_type(**values)
+    for alias, min_length in _min_lengths(model_type):
+        if len(values[alias]) < min_length:
+            error = ErrorWrapper(AnyStrMinLengthError(limit_value=min_length), loc=alias)
+            raise ValidationError([error], model_type)
+    # NOTE: pydantic 1.10 `construct()` keeps an alias as an extra field next to the field it names.
+    field_names = _field_names_by_alias(model_type)
+    if field_names:
+        values = {field_names.get(key, key): value for key, value in values.items()}
+    return model_type.construct(**values)
+
+
+@functools.lru_cache(maxsize=None)
+def _field_names_by_alias(model_type: Type[BaseModel]) -> dict[str, str]:
+    return {field.alias: name for name, field in model_type.__fields__.items() if field.alias != name}
+
+
+@functools.lru_cache(maxsize=None)
+def _min_lengths(model_type: Type[BaseModel]) -> tuple[tuple[str, int], ...]:
+    return tuple(
+        (field.alias, field.field_info.min_length)
+        for field in model_type.__fields__.values()
+        if field.field_info.min_length is not None
+    )
+
+
+def parse_report_data_text(data_text: str, row_description: str, trusted: bool = False) -> _ReportData:
+    cleaned_data = data_text.split(" | ")
+    report_date = report_type = report_category = None
+
+    if len(cleaned_data) == 4:
+        report_date, report_type, report_category, _ = cleaned_data
+    elif len(cleaned_data) == 3:
+        report_date, data_elem_1, data_elem_2 = cleaned_data
+        for data_elem in [data_elem_1, data_elem_2]:
+            if ReportType.has_value(data_elem):
+                report_type = data_elem
+            elif ReportCategory.has_value(data_elem):
+                report_category = data_elem
+    else:
+        raise FailedToParseReportDataException(f"Failed to parse report data: {row_description}")
+
+    if report_category is None:
+        report_category = "Inny"
+    if report_type is None:
+        report_type = "Inny"
+
+    report_datetime = datetime.strptime(report_date, "%d-%m-%Y %H:%M:%S")
+    if trusted:
+        try:
+            return _ReportData.construct(
+                datetime=report_datetime, category=ReportCategory(report_category), type=ReportType(report_type)
+            )
+        except ValueError:
+            raise FailedToParseReportDataException(f"Unknown report category or type: {row_description}")
+    return _ReportData(datetime=report_datetime, category=report_category, type=report_type)
+
+
+def _has_ancestor_with_class(tag: "Tag", class_name: str) -> bool:
+    parent = tag.parent
+    while parent is not None:
+        if class_name in (parent.get("class") or ()):
+            return True
+        parent = parent.parent
+    return False
+
+
+def parse_report_id_href(href: str) -> str:
+    return parse_qs(urlparse(href).query)["geru_id"][0]
+
+
+def find_report_id_href(href: str) -> str:
+    """Same as `parse_report_id_href` without parsing the whole url, for hrefs with a non-empty geru_id."""
+    match = REPORT_ID_RE.search(href)
+    if match is None:
+        return parse_report_id_href(href)
+    return unquote_plus(match[1])
+
+
+def parse_report_company_isin_text(name_text: str, row_description: str) -> str:
+    groups = re.search(REPORT_COMPANY_ISIN_RE, name_text)
+    try:
+        return groups[1]  # type: ignore
+    except IndexError:
+        raise ReportNameNotFoundException(f"Failed to match report company isin: {row_description}")
 
 
 class GPWParser:
+    """
+    With `trusted` models are created without pydantic validation, see `build_model`. Parsed values are already
+    typed, so models and failed rows are the same as validated ones, except for unknown report categories and
+    types failing with FailedToParseReportDataException.
+    """
+
     market: MarketEnum
+    backend: ParserBackend
+    trusted: bool
 
-    def __init__(self, market: MarketEnum):
+    def __init__(self, market: MarketEnum, backend: ParserBackend = ParserBackend.BS4, trusted: bool = False):
         self.market = market
+        self.backend = backend
+        self.trusted = trusted
+        if backend == ParserBackend.LXML:
+            try:
+                from wse_data.data_scrappers.gpw.gpw_lxml_parser import LxmlGPWParser
+            except ImportError as exc:
+                raise ParserBackendNotAvailableException("lxml parser backend requires lxml package.") from exc
+            self._lxml_parser = LxmlGPWParser(market, trusted=trusted)
 
     def parse_companies_page(self, response_page: bytes) -> Iterator[Union[CompanyModel, FailedParsingElementModel]]:
+        if self.backend == ParserBackend.LXML:
+            yield from self._lxml_parser.parse_companies_page(response_page)
+            return
+        from bs4 import BeautifulSoup
+
         soup = BeautifulSoup(response_page, "html.parser", from_encoding="utf-8")
-        for row in soup.find_all("tr", class_="trclass"):
-            try:
-                yield CompanyModel(
-                    isin=self._parse_company_id(row),
-                    name=self._parse_company_name(row),
-                    ticker=self._parse_company_ticker(row),
-                    market=self.market,
-                )
-            except (GPWParserException, ValidationError) as exc:
-                logger.exception(exc)
-                yield FailedParsingElementModel(raw_data=response_page)
+        failures = PageFailures(response_page, *COMPANY_ROW_TAGS)
+        try:
+            for index, row in enumerate(soup.find_all("tr", class_="trclass")):
+                try:
+                    yield build_model(
+                        CompanyModel,
+                        self.trusted,
+                        isin=self._parse_company_id(row),
+                        name=self._parse_company_name(row),
+                        ticker=self._parse_company_ticker(row),
+                        market=self.market,
+                    )
+                except (GPWParserException, ValidationError) as exc:
+                    logger.debug(f"Failed to parse company row {index}: {exc!r}")
+                    yield failures.failed_element(index, exc)
+        finally:
+            failures.log_summary(logger, "company rows")
 
     # TODO: consider splitting parsers per page, as they do not have a lot in common.
     def parse_reports_page(self, response_page: bytes) -> Iterator[Union[ReportModel, FailedParsingElementModel]]:
+        if self.backend == ParserBackend.LXML:
+            yield from self._lxml_parser.parse_reports_page(response_page)
+            return
+        from bs4 import BeautifulSoup
+
         soup = BeautifulSoup(response_page, "html.parser", from_encoding="utf-8")
 
         if soup.li is None:
             logger.warning("Parser received empty page.")
             raise EmptyPageException()
 
-        for row in soup.find_all("li"):
-            try:
-                report_data = self._parse_report_data(row)
-                yield ReportModel(
-                    gpw_id=self._parse_report_id(row),
-                    company_isin=self._parse_report_company_isin(row),
-                    name=self._parse_report_name(row),
-                    summary=self._parse_report_summary(row),
-                    datetime=report_data.datetime,
-                    category=report_data.category,
-                    type=report_data.type,
-                )
-            except (GPWParserException, ValidationError) as exc:
-                logger.exception(exc)
-                yield FailedParsingElementModel(raw_data=response_page)
+        failures = PageFailures(response_page, *REPORT_ROW_TAGS)
+        try:
+            build_report = (
+                self._build_report_single_pass if self.backend == ParserBackend.BS4_SINGLE_PASS else self._build_report
+            )
+            for index, row in enumerate(soup.find_all("li")):
+                try:
+                    yield build_report(row)
+                except (GPWParserException, ValidationError) as exc:
+                    logger.debug(f"Failed to parse report row {index}: {exc!r}")
+                    yield failures.failed_element(index, exc)
+        finally:
+            failures.log_summary(logger, "report rows")
+
+    def _build_report(self, report_row: "Tag") -> ReportModel:
+        report_data = self._parse_report_data(report_row)
+        return build_model(
+            ReportModel,
+            self.trusted,
+            gpw_id=self._parse_report_id(report_row),
+            company_isin=self._parse_report_company_isin(report_row),
+            name=self._parse_report_name(report_row),
+            summary=self._parse_report_summary(report_row),
+            datetime=report_data.datetime,
+            category=report_data.category,
+            type=report_data.type,
+        )
+
+    def _build_report_single_pass(self, report_row: "Tag") -> ReportModel:
+        """Same report as `_build_report`, failing with the same exceptions, from one walk over the row."""
+        data_tag, id_anchor, name_anchor, summary_tag = self._extract_report_row(report_row)
+        row_description = self._describe_row(report_row)
+        if data_tag is None:
+            raise ReportDataTagNotFound(f"Failed to find data tag: {row_description}")
+        report_data = parse_report_data_text(self._get_text_from_soup(data_tag), row_description, self.trusted)
+        if id_anchor is None:
+            raise ReportIdNotFoundException(f"Failed to find report id: {row_description}")
+        gpw_id = find_report_id_href(id_anchor["href"])  # type: ignore
+        if name_anchor is None:
+            raise ReportNameNotFoundException(f"Failed to find report company isin: {row_description}")
+        name = self._get_text_from_soup(name_anchor)
+        company_isin = parse_report_company_isin_text(name, row_description)
+        if summary_tag is None:
+            raise ReportSummaryNotFoundException(f"Failed to find report summary: {row_description}")
+        return build_model(
+            ReportModel,
+            self.trusted,
+            gpw_id=gpw_id,
+            company_isin=company_isin,
+            name=name,
+            summary=self._get_text_from_soup(summary_tag),
+            datetime=report_data.datetime,
+            category=report_data.category,
+            type=report_data.type,
+        )
+
+    def _extract_report_row(
+        self, report_row: "Tag"
+    ) -> tuple[Optional["Tag"], Optional["Tag"], Optional["Tag"], Optional["Tag"]]:
+        """
+        Elements the per field methods find, in one walk over the row which stops once all are found: first `.date`
+        element, first `a` with `geru_id=` in href, first `a` inside a `.name` element and first `p`.
+        """
+        from bs4 import Tag
+
+        data_tag = id_anchor = name_anchor = summary_tag = None
+        for element in report_row.descendants:
+            if not isinstance(element, Tag):
+                continue
+            if data_tag is None and "date" in (element.get("class") or ()):
+                data_tag = element
+            if element.name == "a":
+                if id_anchor is None and "geru_id=" in (element.get("href") or ""):
+                    id_anchor = element
+                if name_anchor is None and _has_ancestor_with_class(element, "name"):
+                    name_anchor = element
+            elif summary_tag is None and element.name == "p":
+                summary_tag = element
+            if data_tag is not None and id_anchor is not None and name_anchor is not None and summary_tag is not None:
+                break
+        return data_tag, id_anchor, name_anchor, summary_tag
+
+    def parse_reports_stream(
+        self, chunks: Iterable[bytes]
+    ) -> Generator[Union[ReportModel, FailedParsingElementModel], None, int]:
+        """
+        Parses reports page from response chunks, yielding each report as soon as its row is complete.
+        Returns number of report entries on the page.
+        """
+        from wse_data.data_scrappers.gpw.gpw_stream_parser import ReportsStreamParser
+
+        stream_parser = ReportsStreamParser(trusted=self.trusted)
+        for chunk in chunks:
+            yield from stream_parser.feed_chunk(chunk)
+        yield from stream_parser.finish()
+        return stream_parser.entries_count
 
     def parse_stock_quotes_xls(self, xls_content: bytes) -> Iterator[StockQuotesModel]:
         # TODO: handle empty data (closed market day)
-        book = xlrd.open_workbook(file_contents=xls_content)
-        sheet = book.sheet_by_index(0)
-        # TODO: handle error
-        for i in range(1, sheet.nrows):
-            row = sheet.row(i)
-            yield StockQuotesModel(
-                date=datetime.strptime(row[0].value, "%Y-%m-%d"),
-                company_name=row[1].value,
-                company_isin=row[2].value,
-                opening=Decimal(self._parse_xls_float(row[4].value)),
-                closing=Decimal(self._parse_xls_float(row[7].value)),
-                max=Decimal(self._parse_xls_float(row[5].value)),
-                min=Decimal(self._parse_xls_float(row[6].value)),
-                volume=int(row[9].value),
-            )
+        import xlrd
+
+        yield from self._parse_stock_quotes_book(xlrd.open_workbook(file_contents=xls_content, on_demand=True))
+
+    def parse_stock_quotes_xls_file(self, path: Union[str, Path]) -> Iterator[StockQuotesModel]:
+        """
+        Same as `parse_stock_quotes_xls` for a sheet saved to `path`. The file is memory mapped rather than read, so
+        only the decoded cells of the sheet are held in memory.
+        """
+        import xlrd
+
+        yield from self._parse_stock_quotes_book(xlrd.open_workbook(str(path), on_demand=True))
+
+    def _parse_stock_quotes_book(self, book: "Book") -> Iterator[StockQuotesModel]:
+        try:
+            sheet = book.sheet_by_index(0)
+            # TODO: handle error
+            for i in range(1, sheet.nrows):
+                # NOTE: row values are a slice of the sheet's value lists, `sheet.row` would create a Cell per value.
+                row = sheet.row_values(i)
+                yield build_model(
+                    StockQuotesModel,
+                    self.trusted,
+                    date=datetime.strptime(row[0], "%Y-%m-%d").date(),
+                    company_name=row[1],
+                    company_isin=row[2],
+                    opening=Decimal(self._parse_xls_float(row[4])),
+                    closing=Decimal(self._parse_xls_float(row[7])),
+                    max=Decimal(self._parse_xls_float(row[5])),
+                    min=Decimal(self._parse_xls_float(row[6])),
+                    volume=int(row[9]),
+                )
+        finally:
+            book.release_resources()
+
+    def parse_stock_quotes_columns(self, xls_content: bytes) -> "StockQuotesArray":
+        """Same data as `parse_stock_quotes_xls` as a numpy structured array, without per row model construction."""
+        from wse_data.data_scrappers.gpw.gpw_columnar_parser import parse_stock_quotes_columns
+
+        return parse_stock_quotes_columns(xls_content)
 
     def _parse_xls_float(self, cell_value: float) -> str:
         return str("%0.15g" % cell_value)
 
-    def _parse_company_id(self, company_row: Tag) -> str:
+    def _parse_company_id(self, company_row: "Tag") -> str:
         if self.market == MarketEnum.GPW:
             isin_tag = company_row.find("td", class_="col3")
         else:
             isin_tag = company_row.find("td", class_="col2")
         if not isin_tag:
-            raise CompanyIdNotFoundException(f"Failed to parse company id: {company_row}")
+            raise CompanyIdNotFoundException(f"Failed to parse company id: {self._describe_row(company_row)}")
         return isin_tag.get_text(strip=True)
 
-    def _parse_company_name(self, company_row: Tag) -> str:
+    def _parse_company_name(self, company_row: "Tag") -> str:
         if self.market == MarketEnum.GPW:
             name_tag = company_row.select(".col2 a")
         else:
             name_tag = company_row.select(".col1 a")
         if not name_tag:
-            raise CompanyNameNotFoundException(f"Failed to parse company name: {company_row}")
+            raise CompanyNameNotFoundException(f"Failed to parse company name: {self._describe_row(company_row)}")
         return name_tag[0].get_text(strip=True)
 
-    def _parse_company_ticker(self, company_row: Tag) -> str:
+    def _parse_company_ticker(self, company_row: "Tag") -> str:
         if self.market == MarketEnum.GPW:
             ticker_tag = company_row.find("td", class_="col4")
         else:
             ticker_tag = company_row.find("td", class_="col3")
         if not ticker_tag:
-            raise CompanySymbolNotFoundException(f"Failed to parse company ticker: {company_row}")
+            raise CompanySymbolNotFoundException(f"Failed to parse company ticker: {self._describe_row(company_row)}")
         return ticker_tag.get_text(strip=True)
 
-    def _parse_report_data(self, report_row: Tag) -> _ReportData:
+    def _parse_report_data(self, report_row: "Tag") -> _ReportData:
         data_tag = report_row.find(class_="date")
         if not data_tag:
-            raise ReportDataTagNotFound(f"Failed to find data tag: {report_row}")
-
-        cleaned_data = self._get_text_from_soup(data_tag).split(" | ")
-        report_date = report_type = report_category = None
-
-        if len(cleaned_data) == 4:
-            report_date, report_type, report_category, _ = cleaned_data
-        elif len(cleaned_data) == 3:
-            report_date, data_elem_1, data_elem_2 = cleaned_data
-            for data_elem in [data_elem_1, data_elem_2]:
-                if ReportType.has_value(data_elem):
-                    report_type = data_elem
-                elif ReportCategory.has_value(data_elem):
-                    report_category = data_elem
-        else:
-            raise FailedToParseReportDataException(f"Failed to parse report data: {report_row}")
-
-        if report_category is None:
-            report_category = "Inny"
-        if report_type is None:
-            report_type = "Inny"
-
-        return _ReportData(
-            datetime=datetime.strptime(report_date, "%d-%m-%Y %H:%M:%S"),
-            category=report_category,
-            type=report_type,
+            raise ReportDataTagNotFound(f"Failed to find data tag: {self._describe_row(report_row)}")
+        return parse_report_data_text(
+            self._get_text_from_soup(data_tag), self._describe_row(report_row), trusted=self.trusted
         )
 
-    def _parse_report_id(self, report_row: Tag) -> str:
+    def _parse_report_id(self, report_row: "Tag") -> str:
         anchor = report_row.find("a", href=re.compile("geru_id="))
         if not anchor:
-            raise ReportIdNotFoundException(f"Failed to find report id: {report_row}")
-        return parse_qs(urlparse(anchor["href"]).query)["geru_id"][0]  # type: ignore
+            raise ReportIdNotFoundException(f"Failed to find report id: {self._describe_row(report_row)}")
+        return parse_report_id_href(anchor["href"])  # type: ignore
 
-    def _parse_report_company_isin(self, report_row: Tag) -> str:
+    def _parse_report_company_isin(self, report_row: "Tag") -> str:
         name_tag = report_row.select(".name a")
         if not name_tag:
-            raise ReportNameNotFoundException(f"Failed to find report company isin: {report_row}")
-        name_str = self._get_text_from_soup(name_tag[0])
-        groups = re.search(REPORT_COMPANY_ISIN_RE, name_str)
-        try:
-            return groups[1]  # type: ignore
-        except IndexError:
-            raise ReportNameNotFoundException(f"Failed to match report company isin: {report_row}")
+            raise ReportNameNotFoundException(f"Failed to find report company isin: {self._describe_row(report_row)}")
+        return parse_report_company_isin_text(self._get_text_from_soup(name_tag[0]), self._describe_row(report_row))
 
-    def _parse_report_name(self, report_row: Tag) -> str:
+    def _parse_report_name(self, report_row: "Tag") -> str:
         name_tag = report_row.select(".name a")
         if not name_tag:
-            raise ReportNameNotFoundException(f"Failed to find report name: {report_row}")
+            raise ReportNameNotFoundException(f"Failed to find report name: {self._describe_row(report_row)}")
         return self._get_text_from_soup(name_tag[0])
 
-    def _parse_report_summary(self, report_row: Tag) -> str:
+    def _parse_report_summary(self, report_row: "Tag") -> str:
         summary = report_row.find("p")
         if not summary:
-            raise ReportSummaryNotFoundException(f"Failed to find report summary: {report_row}")
+            raise ReportSummaryNotFoundException(f"Failed to find report summary: {self._describe_row(report_row)}")
         return self._get_text_from_soup(summary)
 
-    def _get_text_from_soup(self, soup: Union[Tag, NavigableString]) -> str:
+    def _describe_row(self, row: "Tag") -> str:
+        # NOTE: not the row itself, stringifying a tag costs more than parsing it.
+        return f"row at line {row.sourceline}"
+
+    def _get_text_from_soup(self, soup: Union["Tag", "NavigableString"]) -> str:
+        from bs4 import NavigableString
+
         return "".join([t for t in soup if isinstance(t, NavigableString)]).strip()
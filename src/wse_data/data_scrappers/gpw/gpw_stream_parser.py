@@ -0,0 +1,196 @@
+import codecs
+import html
+import logging
+import re
+from collections import Counter
+from html.parser import HTMLParser
+from typing import Optional, Union
+
+from pydantic import ValidationError
+
+from wse_data.data_scrappers.gpw.failed_parsing_element_model import FailedParsingElementModel, log_failure_counts
+from wse_data.data_scrappers.gpw.gpw_parser import (
+    GPWParserException,
+    ReportDataTagNotFound,
+    ReportIdNotFoundException,
+    ReportNameNotFoundException,
+    ReportSummaryNotFoundException,
+    parse_report_company_isin_text,
+    build_model,
+    parse_report_data_text,
+    parse_report_id_href,
+)
+from wse_data.data_scrappers.gpw.report_model import ReportModel
+
+logger = logging.getLogger(__name__)
+
+VOID_ELEMENTS = frozenset(
+    {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "param", "source", "track", "wbr"}
+)
+REPORT_ID_HREF_RE = re.compile("geru_id=")
+
+
+class _OpenElement:
+    __slots__ = ("tag", "in_name", "texts")
+
+    def __init__(self, tag: str, in_name: bool, texts: Optional[list[str]] = None) -> None:
+        self.tag = tag
+        self.in_name = in_name
+        # Own (not nested) text of the element, collected only for elements holding a report field.
+        self.texts = texts
+
+
+class _ReportRow:
+    __slots__ = ("data_texts", "report_href", "name_texts", "summary_texts", "raw")
+
+    def __init__(self) -> None:
+        self.data_texts: Optional[list[str]] = None
+        self.report_href: Optional[str] = None
+        self.name_texts: Optional[list[str]] = None
+        self.summary_texts: Optional[list[str]] = None
+        self.raw: list[str] = []
+
+
+class ReportsStreamParser(HTMLParser):
+    """
+    Incremental reports page parser. Every `feed_chunk` returns reports whose `<li>` was closed by the fed chunk, so
+    neither the whole page nor its tree is kept in memory. Fields are found like in GPWParser.parse_reports_page:
+    first `.date` element, first `a` with `geru_id=` in href, first `.name a` and first `p` of the row.
+    """
+
+    entries_count: int
+    trusted: bool
+
+    def __init__(self, trusted: bool = False) -> None:
+        super().__init__(convert_charrefs=True)
+        self.entries_count = 0
+        self.trusted = trusted
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self._stack: list[_OpenElement] = []
+        self._row: Optional[_ReportRow] = None
+        self._parsed: list[Union[ReportModel, FailedParsingElementModel]] = []
+        self._failure_counts: Counter[str] = Counter()
+
+    def feed_chunk(self, chunk: Union[bytes, str]) -> list[Union[ReportModel, FailedParsingElementModel]]:
+        self.feed(self._decoder.decode(chunk) if isinstance(chunk, bytes) else chunk)
+        return self._pop_parsed()
+
+    def finish(self) -> list[Union[ReportModel, FailedParsingElementModel]]:
+        self.feed(self._decoder.decode(b"", final=True))
+        self.close()
+        if self._row is not None:
+            self._finish_row()
+        log_failure_counts(logger, self._failure_counts, "report rows")
+        return self._pop_parsed()
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, Optional[str]]]) -> None:
+        row = self._row
+        if row is None:
+            if tag == "li":
+                self.entries_count += 1
+                self._row = _ReportRow()
+                self._row.raw.append(self.get_starttag_text() or "")
+                self._stack = [_OpenElement(tag, in_name=False)]
+            return
+
+        row.raw.append(self.get_starttag_text() or "")
+        classes = self._get_classes(attrs)
+        parent = self._stack[-1]
+        texts: Optional[list[str]] = None
+        if row.data_texts is None and "date" in classes:
+            texts = row.data_texts = []
+        if tag == "a" and parent.in_name and row.name_texts is None:
+            texts = row.name_texts = texts if texts is not None else []
+        if tag == "p" and row.summary_texts is None:
+            texts = row.summary_texts = texts if texts is not None else []
+        if tag == "a" and row.report_href is None:
+            href = dict(attrs).get("href")
+            if href and REPORT_ID_HREF_RE.search(href):
+                row.report_href = href
+
+        if tag not in VOID_ELEMENTS:
+            self._stack.append(_OpenElement(tag, in_name=parent.in_name or "name" in classes, texts=texts))
+
+    def handle_startendtag(self, tag: str, attrs: list[tuple[str, Optional[str]]]) -> None:
+        self.handle_starttag(tag, attrs)
+        if self._row is not None and tag not in VOID_ELEMENTS:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag: str) -> None:
+        if self._row is None:
+            return
+        self._row.raw.append(f"</{tag}>")
+        # NOTE: like BeautifulSoup, closing tag closes everything opened after its start tag, unmatched ones are
+        # ignored.
+        for position in range(len(self._stack) - 1, -1, -1):
+            if self._stack[position].tag == tag:
+                del self._stack[position:]
+                break
+        if not self._stack:
+            self._finish_row()
+
+    def handle_data(self, data: str) -> None:
+        if self._row is None:
+            return
+        self._row.raw.append(html.escape(data, quote=False))
+        texts = self._stack[-1].texts
+        if texts is not None:
+            texts.append(data)
+
+    def handle_comment(self, data: str) -> None:
+        if self._row is None:
+            return
+        self._row.raw.append(f"<!--{data}-->")
+        texts = self._stack[-1].texts
+        if texts is not None:
+            texts.append(data)
+
+    def _finish_row(self) -> None:
+        row = self._row
+        self._row = None
+        self._stack = []
+        if row is None:
+            return
+        try:
+            self._parsed.append(self._build_report(row))
+        except (GPWParserException, ValidationError) as exc:
+            logger.debug(f"Failed to parse report entry {self.entries_count}: {exc!r}")
+            error = type(exc).__name__
+            self._failure_counts[error] += 1
+            # NOTE: the page is not kept while streaming, so only the rebuilt row is attached.
+            raw = "".join(row.raw).encode()
+            self._parsed.append(FailedParsingElementModel(page=raw, start=0, end=len(raw), error=error))
+
+    def _build_report(self, row: _ReportRow) -> ReportModel:
+        row_description = f"report entry {self.entries_count}"
+        if row.data_texts is None:
+            raise ReportDataTagNotFound(f"Failed to find data tag: {row_description}")
+        report_data = parse_report_data_text("".join(row.data_texts).strip(), row_description, trusted=self.trusted)
+        if row.report_href is None:
+            raise ReportIdNotFoundException(f"Failed to find report id: {row_description}")
+        if row.name_texts is None:
+            raise ReportNameNotFoundException(f"Failed to find report company isin: {row_description}")
+        name = "".join(row.name_texts).strip()
+        if row.summary_texts is None:
+            raise ReportSummaryNotFoundException(f"Failed to find report summary: {row_description}")
+        return build_model(
+            ReportModel,
+            self.trusted,
+            gpw_id=parse_report_id_href(row.report_href),
+            company_isin=parse_report_company_isin_text(name, row_description),
+            name=name,
+            summary="".join(row.summary_texts).strip(),
+            datetime=report_data.datetime,
+            category=report_data.category,
+            type=report_data.type,
+        )
+
+    def _pop_parsed(self) -> list[Union[ReportModel, FailedParsingElementModel]]:
+        parsed, self._parsed = self._parsed, []
+        return parsed
+
+    def _get_classes(self, attrs: list[tuple[str, Optional[str]]]) -> list[str]:
+        for name, value in attrs:
+            if name == "class" and value:
+                return value.split()
+        return []
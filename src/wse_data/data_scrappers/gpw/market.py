@@ -0,0 +1,7 @@
+from enum import Enum
+
+
+# NOTE: kept apart from the models, so the CLI can offer markets without importing pydantic.
+class MarketEnum(str, Enum):
+    GPW = "GPW"
+    NEW_CONNECT = "NEW-CONNECT"
@@ -11,7 +11,7 @@ class ReportCategory(Enum):
 
     @classmethod
     def has_value(cls, value: str) -> bool:
-        return value in [member.value for member in cls]
+        return value in cls._value2member_map_
 
 
 class ReportType(Enum):
@@ -24,7 +24,7 @@ class ReportType(Enum):
 
     @classmethod
     def has_value(cls, value: str) -> bool:
-        return value in [member.value for member in cls]
+        return value in cls._value2member_map_
 
 
 class ReportModel(BaseModel):
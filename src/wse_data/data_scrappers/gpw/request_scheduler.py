@@ -0,0 +1,238 @@
+import asyncio
+import logging
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Awaitable, Callable, Optional
+
+import httpx
+from pydantic import BaseModel, Field
+
+logger = logging.getLogger(__name__)
+
+
+class RequestSchedulerException(Exception):
+    pass
+
+
+class CircuitOpenException(RequestSchedulerException):
+    pass
+
+
+class SchedulerPolicy(BaseModel):
+    """
+    Limits shared by all requests to a host. `rate` is requests per second with bursts of `burst` requests, None
+    disables rate limiting. Transient errors are retried `max_attempts` times with exponential backoff with full
+    jitter, and `failure_threshold` failures in a row stop requests to the host for `reset_timeout` seconds.
+    """
+
+    rate: Optional[float] = 5.0
+    burst: int = 10
+    max_attempts: int = Field(4, ge=1)
+    backoff_base: float = 0.5
+    backoff_max: float = 30.0
+    max_retry_after: float = 5 * 60
+    retry_statuses: frozenset[int] = frozenset({429, 500, 502, 503, 504})
+    failure_threshold: int = 5
+    reset_timeout: float = 30.0
+
+    def backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2**attempt))
+
+
+class TokenBucket:
+    """Thread safe; tokens are reserved up front, so blocking and asyncio callers can sleep in their own way."""
+
+    def __init__(self, rate: float, burst: int, clock: Callable[[], float] = time.monotonic) -> None:
+        self.rate = rate
+        self.burst = burst
+        self._clock = clock
+        self._tokens = float(burst)
+        self._updated_at = clock()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Takes a token and returns seconds to wait before using it."""
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated_at) * self.rate)
+            self._updated_at = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+
+class CircuitBreaker:
+    """
+    Closed until `failure_threshold` failures in a row, then open for `reset_timeout` seconds. After that a single
+    trial request is let through (half-open); its success closes the circuit and its failure opens it again.
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float, clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        return self._opened_at is not None
+
+    def before_request(self) -> bool:
+        """Raises CircuitOpenException while the circuit is open, returns True for the trial request."""
+        with self._lock:
+            if self._opened_at is None:
+                return False
+            if self._trial_running or self._clock() - self._opened_at < self.reset_timeout:
+                raise CircuitOpenException(f"Circuit open after {self._failures} failed requests.")
+            self._trial_running = True
+            return True
+
+    def abandon_trial(self) -> None:
+        """Trial request ended without a response or transport error, so the next request is a new trial."""
+        with self._lock:
+            self._trial_running = False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_running = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._trial_running or self._failures >= self.failure_threshold:
+                self._opened_at = self._clock()
+            self._trial_running = False
+
+
+class RequestScheduler:
+    """Rate limiting, retries and circuit breaking per host, for blocking (`run`) and asyncio (`arun`) requests."""
+
+    policy: SchedulerPolicy
+
+    def __init__(self, policy: Optional[SchedulerPolicy] = None) -> None:
+        self.policy = policy or SchedulerPolicy()
+        self._buckets: dict[str, TokenBucket] = {}
+        self._breakers: dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def run(self, url: str, attempt: Callable[[], httpx.Response]) -> httpx.Response:
+        """
+        Calls `attempt` until it returns a non transient response. The last response is returned even if it is
+        transient, and the last transport error is raised.
+        """
+        host = httpx.URL(url).host
+        for attempt_number in range(self.policy.max_attempts):
+            wait, trial = self._before_attempt(host)
+            try:
+                time.sleep(wait)
+                response = attempt()
+            except httpx.TransportError as exc:
+                time.sleep(self._after_error(host, attempt_number, exc))
+                continue
+            except BaseException:
+                self._abandon_trial(host, trial)
+                raise
+            delay = self._after_response(host, attempt_number, response)
+            if delay is None:
+                return response
+            response.close()
+            time.sleep(delay)
+        raise AssertionError("unreachable")  # pragma: no cover
+
+    async def arun(self, url: str, attempt: Callable[[], Awaitable[httpx.Response]]) -> httpx.Response:
+        host = httpx.URL(url).host
+        for attempt_number in range(self.policy.max_attempts):
+            wait, trial = self._before_attempt(host)
+            try:
+                await asyncio.sleep(wait)
+                response = await attempt()
+            except httpx.TransportError as exc:
+                await asyncio.sleep(self._after_error(host, attempt_number, exc))
+                continue
+            except BaseException:
+                # NOTE: also cancellation of prefetched requests, which may happen while waiting for a token.
+                self._abandon_trial(host, trial)
+                raise
+            delay = self._after_response(host, attempt_number, response)
+            if delay is None:
+                return response
+            await response.aclose()
+            await asyncio.sleep(delay)
+        raise AssertionError("unreachable")  # pragma: no cover
+
+    def breaker(self, host: str) -> CircuitBreaker:
+        with self._lock:
+            if host not in self._breakers:
+                self._breakers[host] = CircuitBreaker(self.policy.failure_threshold, self.policy.reset_timeout)
+            return self._breakers[host]
+
+    def _before_attempt(self, host: str) -> tuple[float, bool]:
+        """Delay before the attempt and whether it is the trial request of an open circuit."""
+        trial = self.breaker(host).before_request()
+        if self.policy.rate is None:
+            return 0.0, trial
+        with self._lock:
+            if host not in self._buckets:
+                self._buckets[host] = TokenBucket(self.policy.rate, self.policy.burst)
+            bucket = self._buckets[host]
+        return bucket.reserve(), trial
+
+    def _abandon_trial(self, host: str, trial: bool) -> None:
+        if trial:
+            self.breaker(host).abandon_trial()
+
+    def _after_error(self, host: str, attempt_number: int, exc: httpx.TransportError) -> float:
+        """Delay before the next attempt, raises `exc` when there are no attempts left."""
+        self.breaker(host).record_failure()
+        if attempt_number + 1 >= self.policy.max_attempts:
+            raise exc
+        delay = self.policy.backoff(attempt_number)
+        logger.warning(f"Request to {host} failed with {exc!r}, retrying in {delay:.2f}s.")
+        return delay
+
+    def _after_response(self, host: str, attempt_number: int, response: httpx.Response) -> Optional[float]:
+        """Delay before the next attempt, None when `response` should be returned."""
+        if response.status_code not in self.policy.retry_statuses:
+            self.breaker(host).record_success()
+            return None
+        self.breaker(host).record_failure()
+        if attempt_number + 1 >= self.policy.max_attempts:
+            return None
+        delay = max(self.policy.backoff(attempt_number), self._retry_after(response))
+        logger.warning(f"Request to {host} returned {response.status_code}, retrying in {delay:.2f}s.")
+        return delay
+
+    def _retry_after(self, response: httpx.Response) -> float:
+        value = response.headers.get("retry-after")
+        if not value:
+            return 0.0
+        try:
+            seconds = float(value)
+        except ValueError:
+            try:
+                seconds = (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds()
+            except (TypeError, ValueError):
+                return 0.0
+        return min(max(seconds, 0.0), self.policy.max_retry_after)
+
+
+_default_scheduler: Optional[RequestScheduler] = None
+_default_scheduler_lock = threading.Lock()
+
+
+def default_scheduler() -> RequestScheduler:
+    """Scheduler shared by clients created without their own one."""
+    global _default_scheduler
+    with _default_scheduler_lock:
+        if _default_scheduler is None:
+            _default_scheduler = RequestScheduler()
+        return _default_scheduler
@@ -0,0 +1,184 @@
+import hashlib
+import logging
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Mapping, Optional, Union
+from urllib.parse import urlencode
+
+import httpx
+from pydantic import BaseModel, ValidationError
+
+from wse_data.paths import default_cache_dir
+
+logger = logging.getLogger(__name__)
+
+# Stored content is already decoded, so encoding and length headers of the original response don't apply to it.
+SKIPPED_HEADERS = {"content-encoding", "content-length", "transfer-encoding"}
+
+
+class CachePolicy(BaseModel):
+    """
+    Time to live, in seconds, of cached responses per endpoint. Days in the past never change. Responses whose body
+    was not downloaded, like non-trading days of stock quotes, live at most `rejected_ttl`.
+    """
+
+    companies_ttl: float = 15 * 60
+    reports_ttl: float = 60
+    historical_reports_ttl: float = 24 * 60 * 60
+    stock_quotes_ttl: float = 5 * 60
+    # NOTE: a past day without a sheet may as well be a temporary error page, so it is checked again.
+    rejected_ttl: float = 60 * 60
+
+
+class CacheEntry(BaseModel):
+    url: str
+    status_code: int
+    headers: dict[str, str]
+    stored_at: float
+    ttl: Optional[float]  # None never expires
+    content: bytes = b""
+
+    def is_fresh(self, now: Optional[float] = None) -> bool:
+        if self.ttl is None:
+            return True
+        return (now if now is not None else time.time()) - self.stored_at < self.ttl
+
+    def conditional_headers(self) -> dict[str, str]:
+        headers = {}
+        if "etag" in self.headers:
+            headers["If-None-Match"] = self.headers["etag"]
+        if "last-modified" in self.headers:
+            headers["If-Modified-Since"] = self.headers["last-modified"]
+        return headers
+
+    def to_response(self, request: httpx.Request) -> httpx.Response:
+        return httpx.Response(self.status_code, headers=self.headers, content=self.content, request=request)
+
+    @classmethod
+    def from_response(cls, response: httpx.Response, ttl: Optional[float], content: bytes) -> "CacheEntry":
+        return cls(
+            url=str(response.request.url),
+            status_code=response.status_code,
+            headers={key: value for key, value in response.headers.items() if key not in SKIPPED_HEADERS},
+            stored_at=time.time(),
+            ttl=ttl,
+            content=content,
+        )
+
+
+def cache_key(method: str, url: str, params: Optional[Mapping[str, Any]] = None) -> str:
+    encoded_params = urlencode(sorted((params or {}).items()), doseq=True)
+    return hashlib.sha256(f"{method.upper()} {url}?{encoded_params}".encode()).hexdigest()
+
+
+class ResponseCache(ABC):
+    @abstractmethod
+    def get(self, key: str) -> Optional[CacheEntry]:
+        pass
+
+    @abstractmethod
+    def set(self, key: str, entry: CacheEntry) -> None:
+        pass
+
+
+class InMemoryResponseCache(ResponseCache):
+    """Least recently used entries are evicted above `max_entries`."""
+
+    _entries: "OrderedDict[str, CacheEntry]"
+
+    def __init__(self, max_entries: int = 1024) -> None:
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: str, entry: CacheEntry) -> None:
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class DiskResponseCache(ResponseCache):
+    """
+    One file per entry: json metadata line followed by the raw content. File mtime is the last access time,
+    and least recently used files are removed once the directory grows above `max_size` bytes. The access order
+    is read from mtimes once and then kept in memory, so eviction never scans the directory.
+    """
+
+    directory: Path
+    max_size: int
+    # Entry sizes by path, least recently used first.
+    _index: "OrderedDict[Path, int]"
+
+    def __init__(self, directory: Optional[Union[str, Path]] = None, max_size: int = 256 * 1024 * 1024) -> None:
+        self.directory = Path(directory) if directory is not None else default_cache_dir() / "http"
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._index = OrderedDict()
+        self._size = 0
+        stats = ((path, path.stat()) for path in self.directory.glob("*.entry"))
+        for path, stat in sorted(stats, key=lambda item: item[1].st_mtime):
+            self._track(path, stat.st_size)
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        path = self._path(key)
+        try:
+            with path.open("rb") as entry_file:
+                metadata = entry_file.readline()
+                content = entry_file.read()
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        try:
+            entry = CacheEntry.parse_raw(metadata)
+        except ValidationError:
+            logger.warning(f"Dropping corrupted cache entry {path}.")
+            with self._lock:
+                self._remove(path)
+            return None
+        with self._lock:
+            # NOTE: the entry may have been written by another process sharing the directory.
+            self._track(path, len(metadata) + len(content))
+        entry.content = content
+        return entry
+
+    def set(self, key: str, entry: CacheEntry) -> None:
+        path = self._path(key)
+        tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        metadata = entry.json(exclude={"content"}).encode() + b"\n"
+        with tmp_path.open("wb") as entry_file:
+            entry_file.write(metadata)
+            entry_file.write(entry.content)
+        with self._lock:
+            os.replace(tmp_path, path)
+            self._track(path, len(metadata) + len(entry.content))
+            while self._size > self.max_size and self._index:
+                self._remove(next(iter(self._index)))
+
+    def _track(self, path: Path, size: int) -> None:
+        """Marks `path` as the most recently used entry."""
+        self._size += size - self._index.pop(path, 0)
+        self._index[path] = size
+
+    def _remove(self, path: Path) -> None:
+        self._size -= self._index.pop(path, 0)
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.entry"
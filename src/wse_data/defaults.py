@@ -0,0 +1,10 @@
+"""
+Defaults shared by the library and the CLI. Kept free of imports, so the CLI can show them without loading the
+library.
+"""
+
+STOCK_QUOTES_WORKERS = 4
+REPORTS_DAYS_WORKERS = 4
+SESSION_POLL_INTERVAL = 5.0
+COMPANY_REGISTRY_TTL = 24 * 60 * 60.0
+NEW_REPORTS_OVERLAP = 60 * 60.0
@@ -0,0 +1,286 @@
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import Counter
+from contextlib import contextmanager
+from enum import Enum
+from typing import Any, Generator, Iterable, Iterator, Optional, TypeVar
+
+from pydantic import BaseModel
+
+from wse_data.data_scrappers.gpw.failed_parsing_element_model import FailedParsingElementModel
+
+T = TypeVar("T")
+
+REQUEST_SECONDS = "wse_request_seconds"
+DOWNLOADED_BYTES = "wse_downloaded_bytes_total"
+PAGES_FETCHED = "wse_pages_fetched_total"
+PAGE_PARSE_SECONDS = "wse_page_parse_seconds"
+PARSED_ROWS = "wse_parsed_rows_total"
+FAILED_ROWS = "wse_failed_rows_total"
+
+# Sorted (label, value) pairs.
+Labels = tuple[tuple[str, str], ...]
+
+
+class MetricsException(Exception):
+    pass
+
+
+class MetricsSinkNotAvailableException(MetricsException):
+    pass
+
+
+class DataKindEnum(str, Enum):
+    COMPANIES = "companies"
+    REPORTS = "reports"
+    STOCK_QUOTES = "stock_quotes"
+
+
+class MetricsSink(ABC):
+    """
+    Receives counters and timings of WSE runs, labelled with string `labels`. Clients report from worker threads,
+    so implementations must be thread safe.
+    """
+
+    @abstractmethod
+    def increment(self, name: str, value: float = 1.0, **labels: str) -> None:
+        ...
+
+    @abstractmethod
+    def observe(self, name: str, seconds: float, **labels: str) -> None:
+        ...
+
+    @contextmanager
+    def timer(self, name: str, **labels: str) -> Iterator[None]:
+        started_at = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started_at, **labels)
+
+
+class TimingModel(BaseModel):
+    count: int
+    total: float
+    max: float
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+
+class InMemoryMetricsSink(MetricsSink):
+    """Keeps counter sums and timing count, total and max per metric and labels."""
+
+    def __init__(self) -> None:
+        self.started_at = time.monotonic()
+        self._counters: dict[tuple[str, Labels], float] = {}
+        # [count, total, max]
+        self._timings: dict[tuple[str, Labels], list[float]] = {}
+        self._lock = threading.Lock()
+
+    def increment(self, name: str, value: float = 1.0, **labels: str) -> None:
+        key = (name, _labels(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0.0) + value
+
+    def observe(self, name: str, seconds: float, **labels: str) -> None:
+        key = (name, _labels(labels))
+        with self._lock:
+            timing = self._timings.get(key)
+            if timing is None:
+                self._timings[key] = [1, seconds, seconds]
+            else:
+                timing[0] += 1
+                timing[1] += seconds
+                timing[2] = max(timing[2], seconds)
+
+    def counter(self, name: str, **labels: str) -> float:
+        """Sum of the counter over all label sets matching `labels`."""
+        with self._lock:
+            return sum(value for key, value in self._counters.items() if _matches(key, name, labels))
+
+    def timing(self, name: str, **labels: str) -> TimingModel:
+        """Timing merged over all label sets matching `labels`."""
+        count, total, max_ = 0, 0.0, 0.0
+        with self._lock:
+            for key, (key_count, key_total, key_max) in self._timings.items():
+                if _matches(key, name, labels):
+                    count += int(key_count)
+                    total += key_total
+                    max_ = max(max_, key_max)
+        return TimingModel(count=count, total=total, max=max_)
+
+    def counters(self) -> dict[tuple[str, Labels], float]:
+        with self._lock:
+            return dict(self._counters)
+
+    def timings(self) -> dict[tuple[str, Labels], TimingModel]:
+        with self._lock:
+            return {
+                key: TimingModel(count=int(count), total=total, max=max_)
+                for key, (count, total, max_) in self._timings.items()
+            }
+
+
+class OpenTelemetryMetricsSink(MetricsSink):
+    """
+    Timings become OpenTelemetry spans ending when they are observed, with labels as span attributes. Counters have
+    no span counterpart; they and timings are also passed on to `sink`, if given. Without `tracer` the global
+    tracer provider of optional opentelemetry-api package is used.
+    """
+
+    def __init__(self, tracer: Any = None, sink: Optional[MetricsSink] = None) -> None:
+        if tracer is None:
+            try:
+                from opentelemetry import trace
+            except ImportError as exc:
+                raise MetricsSinkNotAvailableException(
+                    "OpenTelemetry spans require opentelemetry-api package."
+                ) from exc
+            tracer = trace.get_tracer(__name__)
+        self.tracer = tracer
+        self.sink = sink
+
+    def increment(self, name: str, value: float = 1.0, **labels: str) -> None:
+        if self.sink is not None:
+            self.sink.increment(name, value, **labels)
+
+    def observe(self, name: str, seconds: float, **labels: str) -> None:
+        ended_at = time.time_ns()
+        span = self.tracer.start_span(name, attributes=labels, start_time=ended_at - int(seconds * 1e9))
+        span.end(end_time=ended_at)
+        if self.sink is not None:
+            self.sink.observe(name, seconds, **labels)
+
+
+def prometheus_text(sink: InMemoryMetricsSink) -> str:
+    """Metrics of `sink` in Prometheus text exposition format; timings are summaries without quantiles."""
+    lines = []
+    counters = sink.counters()
+    for name in sorted({name for name, _ in counters}):
+        lines.append(f"# TYPE {name} counter")
+        for (key_name, labels), value in sorted(counters.items()):
+            if key_name == name:
+                lines.append(f"{name}{_prometheus_labels(labels)} {value:g}")
+    timings = sink.timings()
+    for name in sorted({name for name, _ in timings}):
+        lines.append(f"# TYPE {name} summary")
+        for (key_name, labels), timing in sorted(timings.items()):
+            if key_name == name:
+                lines.append(f"{name}_count{_prometheus_labels(labels)} {timing.count}")
+                lines.append(f"{name}_sum{_prometheus_labels(labels)} {timing.total:g}")
+    return "".join(f"{line}\n" for line in lines)
+
+
+def metered_page(
+    sink: MetricsSink, items: Iterable[T], kind: DataKindEnum, market: str, timed: bool = True
+) -> Generator[T, None, Any]:
+    """
+    Yields parsed rows of a page, counting rows and failed rows, and returns what `items` generator returns. With
+    `timed` the time spent producing rows is observed as page parse time; time the caller spends between rows is
+    not counted.
+    """
+    rows = 0
+    failures: Counter[str] = Counter()
+    seconds = 0.0
+    iterator = iter(items)
+    try:
+        while True:
+            started_at = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration as stop:
+                return stop.value
+            finally:
+                seconds += time.perf_counter() - started_at
+            if isinstance(item, FailedParsingElementModel):
+                failures[item.error] += 1
+            else:
+                rows += 1
+            yield item
+    finally:
+        if isinstance(iterator, Generator):
+            iterator.close()
+        # NOTE: nothing is recorded for empty pages, they only end pagination.
+        if rows or failures:
+            record_parsed_page(sink, kind, market, rows, failures, seconds if timed else None)
+
+
+def record_parsed_page(
+    sink: MetricsSink,
+    kind: DataKindEnum,
+    market: str,
+    rows: int,
+    failures: "Counter[str]",
+    seconds: Optional[float],
+) -> None:
+    if seconds is not None:
+        sink.observe(PAGE_PARSE_SECONDS, seconds, kind=kind.value, market=market)
+    sink.increment(PARSED_ROWS, rows, kind=kind.value, market=market)
+    for error, count in failures.items():
+        sink.increment(FAILED_ROWS, count, kind=kind.value, market=market, error=error)
+
+
+def count_parsed_rows(items: Iterable[Any]) -> tuple[int, "Counter[str]"]:
+    """Rows and failed rows by error of already parsed `items`."""
+    rows = 0
+    failures: Counter[str] = Counter()
+    for item in items:
+        if isinstance(item, FailedParsingElementModel):
+            failures[item.error] += 1
+        else:
+            rows += 1
+    return rows, failures
+
+
+def _labels(labels: dict[str, str]) -> Labels:
+    return tuple(sorted(labels.items()))
+
+
+def _matches(key: tuple[str, Labels], name: str, labels: dict[str, str]) -> bool:
+    key_name, key_labels = key
+    return key_name == name and all(label in key_labels for label in labels.items())
+
+
+def _prometheus_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    escaped = ((label, value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")) for label, value in labels)
+    return "{" + ",".join(f'{label}="{value}"' for label, value in escaped) + "}"
+
+
+def timing_summary(sink: InMemoryMetricsSink) -> str:
+    """Human readable summary of requests and parsing per endpoint and market, for the end of a run."""
+    lines = []
+    timings = sink.timings()
+    for (name, labels), timing in sorted(timings.items()):
+        label_values = dict(labels)
+        if name == REQUEST_SECONDS:
+            downloaded = sink.counter(DOWNLOADED_BYTES, **label_values)
+            lines.append(
+                f"{label_values['endpoint']} {label_values['market']}: {timing.count} requests, "
+                f"{timing.total:.2f}s total, {timing.mean:.3f}s mean, {timing.max:.3f}s max, "
+                f"{downloaded / 1024:.0f} KiB downloaded."
+            )
+    parsed = {labels: value for (name, labels), value in sorted(sink.counters().items()) if name == PARSED_ROWS}
+    for labels, rows in parsed.items():
+        label_values = dict(labels)
+        parse_timing = timings.get((PAGE_PARSE_SECONDS, labels))
+        parse_time = ""
+        if parse_timing is not None:
+            throughput = f", {rows / parse_timing.total:.0f} rows/s" if parse_timing.total > 0 else ""
+            parse_time = f" in {parse_timing.count} pages, {parse_timing.total:.2f}s{throughput}"
+        lines.append(f"{label_values['kind']} {label_values['market']}: parsed {rows:.0f} rows{parse_time}.")
+    for (name, labels), count in sorted(sink.counters().items()):
+        if name == FAILED_ROWS:
+            label_values = dict(labels)
+            lines.append(
+                f"{label_values['kind']} {label_values['market']}: {count:.0f} rows failed with "
+                f"{label_values['error']}."
+            )
+    elapsed = time.monotonic() - sink.started_at
+    rows_total = sum(parsed.values())
+    lines.append(f"Total {elapsed:.2f}s, {rows_total / elapsed if elapsed > 0 else 0:.0f} rows/s.")
+    return "\n".join(lines)
@@ -0,0 +1,216 @@
+import csv
+import json
+import sys
+from abc import ABC, abstractmethod
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+from pathlib import Path
+from types import TracebackType
+from typing import IO, TYPE_CHECKING, Any, Optional, Sequence, Type
+
+# NOTE: the CLI imports output formats up front, pydantic is imported only once rows are written.
+if TYPE_CHECKING:
+    from pydantic import BaseModel
+
+# NOTE: rows are written as they come, files are flushed to disk in chunks of this size.
+OUTPUT_BUFFER_SIZE = 1024 * 1024
+PARQUET_BATCH_ROWS = 10_000
+
+
+class OutputException(Exception):
+    pass
+
+
+class OutputFormatNotAvailableException(OutputException):
+    pass
+
+
+class OutputFormatEnum(str, Enum):
+    TEXT = "text"
+    JSONL = "jsonl"
+    CSV = "csv"
+    PARQUET = "parquet"
+
+
+class RowsWriter(ABC):
+    """
+    Writes models one by one as rows of `columns`: `extra_columns` first, then fields of `model_type` by alias.
+    Values of `extra_columns` are strings passed to `write` along with the model. Models of other types are
+    rejected, their fields would not match the columns.
+    """
+
+    def __init__(self, model_type: "Type[BaseModel]", extra_columns: Sequence[str] = ()) -> None:
+        self.model_type = model_type
+        self.extra_columns = tuple(extra_columns)
+        self.columns = self.extra_columns + tuple(field.alias for field in model_type.__fields__.values())
+
+    def write(self, model: "BaseModel", *extra: str) -> None:
+        if not isinstance(model, self.model_type):
+            raise OutputException(f"Can't write {type(model).__name__} as {self.model_type.__name__} row.")
+        self._write(model, extra)
+
+    @abstractmethod
+    def _write(self, model: "BaseModel", extra: Sequence[str]) -> None:
+        ...
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self) -> "RowsWriter":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_val: Optional[BaseException],
+        exc_tb: Optional[TracebackType],
+    ) -> None:
+        self.close()
+
+    def _row(self, model: "BaseModel", extra: Sequence[str]) -> dict[str, Any]:
+        row: dict[str, Any] = dict(zip(self.extra_columns, extra))
+        row.update(model.dict(by_alias=True))
+        return row
+
+
+class _StreamRowsWriter(RowsWriter):
+    def __init__(
+        self, model_type: "Type[BaseModel]", stream: IO[str], owns_stream: bool, extra_columns: Sequence[str] = ()
+    ) -> None:
+        super().__init__(model_type, extra_columns)
+        self.stream = stream
+        self._owns_stream = owns_stream
+
+    def close(self) -> None:
+        if self._owns_stream:
+            self.stream.close()
+        else:
+            self.stream.flush()
+
+
+class TextRowsWriter(_StreamRowsWriter):
+    """Human readable rows, the way `rich.print` shows models."""
+
+    def _write(self, model: "BaseModel", extra: Sequence[str]) -> None:
+        from rich import print
+
+        print(*extra, model, file=self.stream)
+
+
+class JsonLinesRowsWriter(_StreamRowsWriter):
+    def _write(self, model: "BaseModel", extra: Sequence[str]) -> None:
+        from pydantic.json import pydantic_encoder
+
+        self.stream.write(json.dumps(self._row(model, extra), default=pydantic_encoder, ensure_ascii=False))
+        self.stream.write("\n")
+
+
+class CsvRowsWriter(_StreamRowsWriter):
+    def __init__(
+        self, model_type: "Type[BaseModel]", stream: IO[str], owns_stream: bool, extra_columns: Sequence[str] = ()
+    ) -> None:
+        super().__init__(model_type, stream, owns_stream, extra_columns)
+        self._writer = csv.writer(stream)
+        self._writer.writerow(self.columns)
+
+    def _write(self, model: "BaseModel", extra: Sequence[str]) -> None:
+        self._writer.writerow(_csv_value(value) for value in self._row(model, extra).values())
+
+
+class ParquetRowsWriter(RowsWriter):
+    """
+    Rows collected into column batches of `PARQUET_BATCH_ROWS` and written as row groups, so memory use does not
+    grow with the number of rows. Needs optional pyarrow package. Decimals are stored as float64 like in the
+    columnar stock quotes.
+    """
+
+    def __init__(self, model_type: "Type[BaseModel]", path: Path, extra_columns: Sequence[str] = ()) -> None:
+        super().__init__(model_type, extra_columns)
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError as exc:
+            raise OutputFormatNotAvailableException("Parquet output requires pyarrow package.") from exc
+        self._pyarrow = pyarrow
+        self.schema = pyarrow.schema(
+            [(column, pyarrow.string()) for column in self.extra_columns]
+            + [(field.alias, _arrow_type(pyarrow, field.outer_type_)) for field in model_type.__fields__.values()]
+        )
+        self._writer = pyarrow.parquet.ParquetWriter(str(path), self.schema)
+        self._batch: dict[str, list[Any]] = {column: [] for column in self.columns}
+        self._batch_rows = 0
+
+    def _write(self, model: "BaseModel", extra: Sequence[str]) -> None:
+        for column, value in self._row(model, extra).items():
+            self._batch[column].append(_parquet_value(value))
+        self._batch_rows += 1
+        if self._batch_rows >= PARQUET_BATCH_ROWS:
+            self._write_batch()
+
+    def close(self) -> None:
+        self._write_batch()
+        self._writer.close()
+
+    def _write_batch(self) -> None:
+        if not self._batch_rows:
+            return
+        self._writer.write_table(self._pyarrow.Table.from_pydict(self._batch, schema=self.schema))
+        self._batch = {column: [] for column in self.columns}
+        self._batch_rows = 0
+
+
+def open_rows_writer(
+    output_format: OutputFormatEnum,
+    model_type: "Type[BaseModel]",
+    path: Optional[Path] = None,
+    extra_columns: Sequence[str] = (),
+) -> RowsWriter:
+    """Writer of `output_format` rows to `path`, or to standard output when no path is given."""
+    if output_format == OutputFormatEnum.PARQUET:
+        if path is None:
+            raise OutputException("Parquet output needs a file path.")
+        return ParquetRowsWriter(model_type, path, extra_columns)
+    if path is None:
+        stream, owns_stream = sys.stdout, False
+    else:
+        stream, owns_stream = open(path, "w", buffering=OUTPUT_BUFFER_SIZE, encoding="utf-8", newline=""), True
+    if output_format == OutputFormatEnum.JSONL:
+        return JsonLinesRowsWriter(model_type, stream, owns_stream, extra_columns)
+    if output_format == OutputFormatEnum.CSV:
+        return CsvRowsWriter(model_type, stream, owns_stream, extra_columns)
+    return TextRowsWriter(model_type, stream, owns_stream, extra_columns)
+
+
+def _csv_value(value: Any) -> Any:
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def _parquet_value(value: Any) -> Any:
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+
+def _arrow_type(pyarrow: Any, type_: Any) -> Any:
+    # NOTE: datetime is a subclass of date, so it goes first.
+    if isinstance(type_, type):
+        if issubclass(type_, datetime):
+            return pyarrow.timestamp("us")
+        if issubclass(type_, date):
+            return pyarrow.date32()
+        if issubclass(type_, Decimal):
+            return pyarrow.float64()
+        if issubclass(type_, bool):
+            return pyarrow.bool_()
+        if issubclass(type_, int):
+            return pyarrow.int64()
+        if issubclass(type_, (str, Enum)):
+            return pyarrow.string()
+    raise OutputException(f"Type {type_!r} can't be written to parquet.")
@@ -0,0 +1,21 @@
+import os
+import threading
+from pathlib import Path
+
+CACHE_DIR_ENV = "WSE_DATA_CACHE_DIR"
+
+
+def default_cache_dir() -> Path:
+    """Directory for local wse-data files: `$WSE_DATA_CACHE_DIR`, else `$XDG_CACHE_HOME/wse-data`."""
+    if os.environ.get(CACHE_DIR_ENV):
+        return Path(os.environ[CACHE_DIR_ENV])
+    xdg_cache_home = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(xdg_cache_home) / "wse-data"
+
+
+def write_text_atomically(path: Path, text: str) -> None:
+    """Writes through a temporary file, so readers and crashes never see a partially written file."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp_path.write_text(text)
+    os.replace(tmp_path, path)
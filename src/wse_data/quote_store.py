@@ -0,0 +1,146 @@
+import logging
+import sqlite3
+from datetime import date
+from decimal import Decimal
+from pathlib import Path
+from types import TracebackType
+from typing import Iterator, Optional, Type, Union
+
+from pydantic import BaseModel
+
+from wse_data.data_scrappers.gpw.stock_quotes_model import StockQuotesModel
+from wse_data.defaults import STOCK_QUOTES_WORKERS
+from wse_data.paths import default_cache_dir
+from wse_data.wse import WSE, weekdays
+
+logger = logging.getLogger(__name__)
+
+# NOTE: prices are stored as TEXT to keep them exact Decimals, dates as ISO TEXT so they sort chronologically.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS stock_quotes (
+    isin TEXT NOT NULL,
+    date TEXT NOT NULL,
+    company_name TEXT NOT NULL,
+    opening TEXT NOT NULL,
+    closing TEXT NOT NULL,
+    max TEXT NOT NULL,
+    min TEXT NOT NULL,
+    volume INTEGER NOT NULL,
+    PRIMARY KEY (isin, date)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS stock_quotes_date ON stock_quotes (date, company_name);
+CREATE TABLE IF NOT EXISTS fetched_days (
+    date TEXT NOT NULL PRIMARY KEY,
+    trading INTEGER NOT NULL
+) WITHOUT ROWID;
+"""
+INSERT_QUOTE = "INSERT OR REPLACE INTO stock_quotes VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+INSERT_FETCHED_DAY = "INSERT OR REPLACE INTO fetched_days VALUES (?, ?)"
+SELECT_QUOTES = "SELECT date, company_name, isin, opening, closing, max, min, volume FROM stock_quotes"
+
+
+class SyncResultModel(BaseModel):
+    fetched_days: int
+    trading_days: int
+    stock_quotes: int
+
+
+class QuoteStore:
+    """
+    Local SQLite store of stock quotes, keyed by (isin, date). Days already fetched, including non-trading ones,
+    are remembered, so `sync` downloads only missing days. Use as `with QuoteStore() as store:`.
+    """
+
+    path: Path
+
+    def __init__(self, path: Optional[Union[str, Path]] = None) -> None:
+        self.path = Path(path) if path is not None else default_cache_dir() / "quotes.sqlite3"
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(self.path)
+        self._connection.executescript(SCHEMA)
+
+    def __enter__(self) -> "QuoteStore":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def missing_days(self, start: date, end: date) -> list[date]:
+        cursor = self._connection.execute(
+            "SELECT date FROM fetched_days WHERE date BETWEEN ? AND ?", (start.isoformat(), end.isoformat())
+        )
+        fetched = {date.fromisoformat(row[0]) for row in cursor}
+        return [day for day in weekdays(start, end) if day not in fetched]
+
+    def sync(
+        self, wse: WSE, start: date, end: Optional[date] = None, workers: int = STOCK_QUOTES_WORKERS
+    ) -> SyncResultModel:
+        """
+        Downloads days from `start` to `end` (default today) missing from the store. Every day is committed
+        separately, so an interrupted sync keeps its progress. Today is never marked as fetched, as its quotes
+        may not be published yet.
+        """
+        today = date.today()
+        days = self.missing_days(start, end or today)
+        result = SyncResultModel(fetched_days=0, trading_days=0, stock_quotes=0)
+        for day, day_quotes in wse.get_stock_quotes_days(days, workers=workers):
+            with self._connection:
+                if day_quotes:
+                    self._insert_quotes(day_quotes)
+                    result.trading_days += 1
+                    result.stock_quotes += len(day_quotes)
+                if day < today:
+                    self._connection.execute(INSERT_FETCHED_DAY, (day.isoformat(), bool(day_quotes)))
+            result.fetched_days += 1
+        logger.info(f"Synced quotes from {start} to {end or today}: {result}.")
+        return result
+
+    def get_stock_quotes(self, start: date, end: date, isin: Optional[str] = None) -> Iterator[StockQuotesModel]:
+        """Stored quotes from `start` to `end` inclusive, ordered by date and company name like in the xls sheets."""
+        if isin is None:
+            cursor = self._connection.execute(
+                f"{SELECT_QUOTES} WHERE date BETWEEN ? AND ? ORDER BY date, company_name",
+                (start.isoformat(), end.isoformat()),
+            )
+        else:
+            cursor = self._connection.execute(
+                f"{SELECT_QUOTES} WHERE isin = ? AND date BETWEEN ? AND ? ORDER BY date",
+                (isin, start.isoformat(), end.isoformat()),
+            )
+        for row in cursor:
+            yield StockQuotesModel(
+                date=date.fromisoformat(row[0]),
+                company_name=row[1],
+                company_isin=row[2],
+                opening=Decimal(row[3]),
+                closing=Decimal(row[4]),
+                max=Decimal(row[5]),
+                min=Decimal(row[6]),
+                volume=row[7],
+            )
+
+    def _insert_quotes(self, day_quotes: list[StockQuotesModel]) -> None:
+        self._connection.executemany(
+            INSERT_QUOTE,
+            (
+                (
+                    quotes.company_isin,
+                    quotes.date_.isoformat(),
+                    quotes.company_name,
+                    str(quotes.opening),
+                    str(quotes.closing),
+                    str(quotes.max),
+                    str(quotes.min),
+                    quotes.volume,
+                )
+                for quotes in day_quotes
+            ),
+        )
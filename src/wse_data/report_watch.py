@@ -0,0 +1,254 @@
+import asyncio
+import logging
+import threading
+from collections import OrderedDict, deque
+from datetime import datetime, time
+from typing import AsyncIterator, Callable, Iterator, Optional
+from zoneinfo import ZoneInfo
+
+import httpx
+from pydantic import BaseModel
+
+from wse_data.data_scrappers.gpw.async_gpw_client import AsyncGPWClient
+from wse_data.data_scrappers.gpw.failed_parsing_element_model import FailedParsingElementModel
+from wse_data.data_scrappers.gpw.gpw_client import REPORTS_PAGE_SIZE, GPWClient
+from wse_data.data_scrappers.gpw.gpw_parser import EmptyPageException, GPWParser
+from wse_data.data_scrappers.gpw.report_model import ReportModel
+from wse_data.data_scrappers.gpw.request_scheduler import RequestSchedulerException
+from wse_data.defaults import SESSION_POLL_INTERVAL
+
+logger = logging.getLogger(__name__)
+
+# NOTE: report datetimes on gpw.pl are Warsaw local time.
+WARSAW_TZ = ZoneInfo("Europe/Warsaw")
+# Pages fetched in one poll when every report of a page is new.
+MAX_POLL_PAGES = 5
+LATENCY_WINDOW = 1000
+
+
+class PollScheduleModel(BaseModel):
+    """
+    Seconds between polls. Most reports are published on working days around the session, which runs from 9:00
+    to about 17:05 in Warsaw, with results often released just after it.
+    """
+
+    session_interval: float = SESSION_POLL_INTERVAL
+    off_session_interval: float = 60
+    weekend_interval: float = 10 * 60
+    session_start: time = time(7, 30)
+    session_end: time = time(18, 30)
+
+    def interval(self, now: Optional[datetime] = None) -> float:
+        now = now.astimezone(WARSAW_TZ) if now is not None else datetime.now(WARSAW_TZ)
+        if now.weekday() >= 5:
+            return self.weekend_interval
+        if self.session_start <= now.time() < self.session_end:
+            return self.session_interval
+        return self.off_session_interval
+
+
+class DetectionLatencyModel(BaseModel):
+    """Seconds from report publication to its detection; `p95` is computed over recent detections."""
+
+    count: int
+    last: Optional[float]
+    mean: Optional[float]
+    max: Optional[float]
+    p95: Optional[float]
+
+
+class DetectionLatencyStats:
+    def __init__(self, window: int = LATENCY_WINDOW) -> None:
+        self._count = 0
+        self._total = 0.0
+        self._max: Optional[float] = None
+        self._recent: deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, latency: float) -> None:
+        with self._lock:
+            self._count += 1
+            self._total += latency
+            self._max = latency if self._max is None else max(self._max, latency)
+            self._recent.append(latency)
+
+    def snapshot(self) -> DetectionLatencyModel:
+        with self._lock:
+            if not self._count:
+                return DetectionLatencyModel(count=0, last=None, mean=None, max=None, p95=None)
+            recent = sorted(self._recent)
+            return DetectionLatencyModel(
+                count=self._count,
+                last=self._recent[-1],
+                mean=self._total / self._count,
+                max=self._max,
+                p95=recent[min(len(recent) - 1, int(len(recent) * 0.95))],
+            )
+
+
+class BoundedIdSet:
+    """Set of the most recently added ids; the oldest ones are forgotten above `max_size`."""
+
+    _ids: "OrderedDict[str, None]"
+
+    def __init__(self, max_size: int) -> None:
+        self.max_size = max_size
+        self._ids = OrderedDict()
+
+    def add(self, id_: str) -> bool:
+        """Returns False when `id_` is already present."""
+        if id_ in self._ids:
+            return False
+        self._ids[id_] = None
+        if len(self._ids) > self.max_size:
+            self._ids.popitem(last=False)
+        return True
+
+    def __contains__(self, id_: object) -> bool:
+        return id_ in self._ids
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+
+class _BaseReportWatcher:
+    def __init__(
+        self,
+        parser: GPWParser,
+        search: str,
+        schedule: Optional[PollScheduleModel],
+        page_size: int,
+        max_seen: int,
+    ) -> None:
+        self.search = search
+        self.schedule = schedule or PollScheduleModel()
+        self.page_size = page_size
+        self.latency = DetectionLatencyStats()
+        self._parser = parser
+        self._seen = BoundedIdSet(max_seen)
+        self._primed = False
+
+    def _new_reports(self, response: httpx.Response) -> tuple[list[ReportModel], bool]:
+        """New reports of a page and whether the next page should be checked too."""
+        detected_at = datetime.now(WARSAW_TZ).replace(tzinfo=None)
+        new_reports = []
+        # NOTE: failed rows fill the page too, only a page shorter than `page_size` is the last one.
+        rows_count = 0
+        any_seen = False
+        try:
+            for report in self._parser.parse_reports_page(response.content):
+                rows_count += 1
+                if isinstance(report, FailedParsingElementModel):
+                    continue
+                if self._seen.add(report.gpw_id):
+                    new_reports.append(report)
+                else:
+                    any_seen = True
+        except EmptyPageException:
+            return [], False
+
+        if not self._primed:
+            # NOTE: first poll only fills the seen set, reports published before watching started are not new.
+            return [], False
+        for report in new_reports:
+            self.latency.record(max((detected_at - report.datetime).total_seconds(), 0.0))
+        all_new = bool(new_reports) and not any_seen and rows_count >= self.page_size
+        return new_reports, all_new
+
+
+class ReportWatcher(_BaseReportWatcher):
+    """
+    Polls the first reports page on `schedule` and yields reports not seen before, oldest first. Iterate over it,
+    or pass a callback to `run`; `stop` ends both from another thread.
+    """
+
+    def __init__(
+        self,
+        client: GPWClient,
+        parser: GPWParser,
+        search: str = "",
+        schedule: Optional[PollScheduleModel] = None,
+        page_size: int = REPORTS_PAGE_SIZE,
+        max_seen: int = 10_000,
+    ) -> None:
+        super().__init__(parser, search, schedule, page_size, max_seen)
+        self._client = client
+        self._stop_event = threading.Event()
+
+    def __iter__(self) -> Iterator[ReportModel]:
+        while not self._stop_event.is_set():
+            try:
+                yield from self.poll()
+            except (httpx.HTTPError, RequestSchedulerException) as exc:
+                logger.warning(f"Reports poll failed: {exc!r}")
+            self._stop_event.wait(self.schedule.interval())
+
+    def run(self, callback: Callable[[ReportModel], object]) -> None:
+        for report in self:
+            callback(report)
+
+    def stop(self) -> None:
+        self._stop_event.set()
+
+    def poll(self) -> list[ReportModel]:
+        new_reports: list[ReportModel] = []
+        for page in range(MAX_POLL_PAGES):
+            response = self._client.reports_page(
+                offset=page * self.page_size, limit=self.page_size, search=self.search, revalidate=True
+            )
+            page_reports, check_next_page = self._new_reports(response)
+            new_reports.extend(page_reports)
+            if not check_next_page:
+                break
+        self._primed = True
+        return new_reports[::-1]
+
+
+class AsyncReportWatcher(_BaseReportWatcher):
+    """Asyncio version of ReportWatcher, use as `async for report in watcher:`."""
+
+    def __init__(
+        self,
+        client: AsyncGPWClient,
+        parser: GPWParser,
+        search: str = "",
+        schedule: Optional[PollScheduleModel] = None,
+        page_size: int = REPORTS_PAGE_SIZE,
+        max_seen: int = 10_000,
+    ) -> None:
+        super().__init__(parser, search, schedule, page_size, max_seen)
+        self._client = client
+        self._stopped = False
+        self._stop_event: Optional[asyncio.Event] = None
+
+    async def __aiter__(self) -> AsyncIterator[ReportModel]:
+        # NOTE: created here, as before python 3.10 events are bound to the loop current at their creation.
+        self._stop_event = asyncio.Event()
+        while not self._stopped:
+            try:
+                for report in await self.poll():
+                    yield report
+            except (httpx.HTTPError, RequestSchedulerException) as exc:
+                logger.warning(f"Reports poll failed: {exc!r}")
+            try:
+                await asyncio.wait_for(self._stop_event.wait(), timeout=self.schedule.interval())
+            except asyncio.TimeoutError:
+                pass
+
+    def stop(self) -> None:
+        self._stopped = True
+        if self._stop_event is not None:
+            self._stop_event.set()
+
+    async def poll(self) -> list[ReportModel]:
+        new_reports: list[ReportModel] = []
+        for page in range(MAX_POLL_PAGES):
+            response = await self._client.reports_page(
+                offset=page * self.page_size, limit=self.page_size, search=self.search, revalidate=True
+            )
+            page_reports, check_next_page = self._new_reports(response)
+            new_reports.extend(page_reports)
+            if not check_next_page:
+                break
+        self._primed = True
+        return new_reports[::-1]
@@ -0,0 +1,83 @@
+import json
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Optional, Union
+
+from pydantic import BaseModel, root_validator
+
+from wse_data.data_scrappers.gpw.report_model import ReportModel
+from wse_data.defaults import NEW_REPORTS_OVERLAP
+from wse_data.paths import default_cache_dir, write_text_atomically
+
+
+class ReportsHighWaterMarkModel(BaseModel):
+    """
+    Newest report datetime seen so far and datetimes of reports seen within `overlap` seconds before it, by gpw_id.
+    A report may be published after newer ones, so reports of the overlap are checked by id instead of datetime.
+    """
+
+    # NOTE: declared first, so `datetime` still names the type here.
+    gpw_ids: dict[str, datetime]
+    datetime: datetime
+
+    @root_validator(pre=True)
+    def _ids_at_mark_datetime(cls, values: dict[str, Any]) -> dict[str, Any]:
+        # NOTE: marks saved before the overlap kept a set of ids published at the mark datetime.
+        gpw_ids = values.get("gpw_ids")
+        if isinstance(gpw_ids, (set, frozenset, list, tuple)):
+            values["gpw_ids"] = {gpw_id: values.get("datetime") for gpw_id in gpw_ids}
+        return values
+
+    def is_before_overlap(self, report: ReportModel, overlap: float = NEW_REPORTS_OVERLAP) -> bool:
+        return report.datetime < self.datetime - timedelta(seconds=overlap)
+
+    def is_seen(self, report: ReportModel, overlap: float = NEW_REPORTS_OVERLAP) -> bool:
+        return self.is_before_overlap(report, overlap) or report.gpw_id in self.gpw_ids
+
+    def advance(self, report: ReportModel, overlap: float = NEW_REPORTS_OVERLAP) -> "ReportsHighWaterMarkModel":
+        mark_datetime = max(self.datetime, report.datetime)
+        overlap_start = mark_datetime - timedelta(seconds=overlap)
+        if report.datetime < overlap_start:
+            return self
+        gpw_ids = {
+            gpw_id: seen_datetime for gpw_id, seen_datetime in self.gpw_ids.items() if seen_datetime >= overlap_start
+        }
+        gpw_ids[report.gpw_id] = report.datetime
+        return ReportsHighWaterMarkModel(datetime=mark_datetime, gpw_ids=gpw_ids)
+
+    @classmethod
+    def from_report(cls, report: ReportModel) -> "ReportsHighWaterMarkModel":
+        return cls(datetime=report.datetime, gpw_ids={report.gpw_id: report.datetime})
+
+
+class ReportsState:
+    """
+    JSON file with a high-water mark per reports query. Saving rewrites the whole file through a temporary file,
+    so a crash never leaves a partially written state.
+    """
+
+    path: Path
+
+    def __init__(self, path: Optional[Union[str, Path]] = None) -> None:
+        self.path = Path(path) if path is not None else default_cache_dir() / "reports_state.json"
+        self._lock = threading.Lock()
+
+    def load(self, key: str) -> Optional[ReportsHighWaterMarkModel]:
+        marks = self._read()
+        if key not in marks:
+            return None
+        return ReportsHighWaterMarkModel.parse_obj(marks[key])
+
+    def save(self, key: str, mark: ReportsHighWaterMarkModel) -> None:
+        with self._lock:
+            marks = self._read()
+            marks[key] = json.loads(mark.json())
+            write_text_atomically(self.path, json.dumps(marks, indent=2, sort_keys=True))
+
+    def _read(self) -> dict[str, object]:
+        try:
+            marks: dict[str, object] = json.loads(self.path.read_text())
+        except FileNotFoundError:
+            return {}
+        return marks
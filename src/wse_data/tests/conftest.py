@@ -0,0 +1,11 @@
+import pytest
+
+from wse_data.data_scrappers.gpw import request_scheduler
+
+
+@pytest.fixture(autouse=True)
+def unlimited_default_scheduler(monkeypatch):
+    # NOTE: fresh scheduler per test, so circuit state doesn't leak between tests, without rate limiting delays.
+    scheduler = request_scheduler.RequestScheduler(request_scheduler.SchedulerPolicy(rate=None))
+    monkeypatch.setattr(request_scheduler, "_default_scheduler", scheduler)
+    return scheduler
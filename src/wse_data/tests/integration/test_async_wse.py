@@ -0,0 +1,82 @@
+import asyncio
+from datetime import date
+
+import httpx
+import pytest
+
+from wse_data.async_wse import AsyncWSE
+from wse_data.data_scrappers.gpw.company_model import CompanyModel, MarketEnum
+
+from wse_data.tests.data.gpw_responses import (
+    GPW_COMPANIES_LIST_PAGE,
+    REPORTS_PAGE,
+    REPORTS_EMPTY_PAGE,
+    GPW_STOCK_QUOTATIONS_XLS,
+)
+
+
+async def _collect(async_iterator):
+    return [item async for item in async_iterator]
+
+
+@pytest.fixture
+def wse():
+    return AsyncWSE()
+
+
+def test_get_companies_returns_model_objects(wse, respx_mock):
+    # given
+    respx_mock.post(wse._gpw_client.config.companies_requests[0][0]).mock(
+        return_value=httpx.Response(200, content=GPW_COMPANIES_LIST_PAGE)
+    )
+
+    # when
+    companies = asyncio.run(_collect(wse.get_companies(market=MarketEnum.GPW)))
+
+    # then
+    assert len(companies) == 60
+    assert companies[0] == CompanyModel(isin="PLNFI0600010", name="06MAGNA", ticker="06N", market=MarketEnum.GPW)
+
+
+def test_get_reports_returns_proper_number_of_reports(wse, respx_mock):
+    # given
+    respx_mock.post(wse._new_connect_client.config.reports_url).side_effect = [
+        httpx.Response(200, content=REPORTS_PAGE),
+        httpx.Response(200, content=REPORTS_EMPTY_PAGE),
+    ]
+
+    # when
+    reports = asyncio.run(_collect(wse.get_reports(market=MarketEnum.NEW_CONNECT)))
+
+    # then
+    assert len(reports) == 20
+
+
+def test_get_stock_quotes_returns_proper_number_of_records(wse, respx_mock):
+    # given
+    respx_mock.get("https://www.gpw.pl/archiwum-notowan").mock(
+        return_value=httpx.Response(
+            200, content=GPW_STOCK_QUOTATIONS_XLS, headers={"content-type": "application/vnd.ms-excel"}
+        )
+    )
+
+    # when
+    stock_quotes = asyncio.run(_collect(wse.get_stock_quotes(date(2022, 10, 4))))
+
+    # then
+    assert len(stock_quotes) == 418
+
+
+def test_context_manager_closes_clients(respx_mock):
+    # given
+    async def use_wse():
+        async with AsyncWSE() as wse:
+            pass
+        return wse
+
+    # when
+    wse = asyncio.run(use_wse())
+
+    # then
+    assert wse._gpw_client._http_client.is_closed
+    assert wse._new_connect_client._http_client.is_closed
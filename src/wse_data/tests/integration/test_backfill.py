@@ -0,0 +1,174 @@
+import itertools
+from datetime import date
+from urllib.parse import parse_qs
+
+import httpx
+import pytest
+
+from wse_data.backfill import ReportsBackfill, StockQuotesBackfill
+from wse_data.data_scrappers.gpw.company_model import MarketEnum
+from wse_data.data_scrappers.gpw.request_scheduler import RequestScheduler, SchedulerPolicy
+from wse_data.wse import DateRangeException, WSE
+
+from wse_data.tests.data.gpw_responses import GPW_STOCK_QUOTATIONS_XLS, REPORTS_EMPTY_PAGE, REPORTS_PAGE
+
+STOCK_QUOTES_URL = "https://www.gpw.pl/archiwum-notowan"
+
+
+def _reports_response(request):
+    # NOTE: every day has two full pages of reports.
+    offset = int(parse_qs(request.content.decode())["offset"][0])
+    if offset < 40:
+        return httpx.Response(200, content=REPORTS_PAGE)
+    return httpx.Response(200, content=REPORTS_EMPTY_PAGE)
+
+
+def _requested_reports_pages(calls):
+    pages = []
+    for call in calls:
+        data = parse_qs(call.request.content.decode())
+        pages.append((data["date"][0], int(data["offset"][0])))
+    return pages
+
+
+def _stock_quotes_response(request):
+    if request.url.params["date"] == "06-10-2022":
+        return httpx.Response(200, content=b"<html></html>", headers={"content-type": "text/html"})
+    return httpx.Response(200, content=GPW_STOCK_QUOTATIONS_XLS, headers={"content-type": "application/vnd.ms-excel"})
+
+
+def test_reports_backfill_resumes_from_checkpointed_offset(tmp_path, respx_mock):
+    # given
+    wse = WSE()
+    respx_mock.post(wse._gpw_client.config.reports_url).mock(side_effect=_reports_response)
+    checkpoint_path = tmp_path / "reports.json"
+    interrupted = iter(
+        ReportsBackfill(wse, MarketEnum.GPW, date(2022, 10, 1), date(2022, 10, 2), checkpoint_path=checkpoint_path)
+    )
+    list(itertools.islice(interrupted, 30))
+    interrupted.close()
+    interrupted_calls = respx_mock.calls.call_count
+
+    # when
+    backfill = ReportsBackfill(
+        wse, MarketEnum.GPW, date(2022, 10, 1), date(2022, 10, 2), checkpoint_path=checkpoint_path
+    )
+    reports = list(backfill)
+
+    # then
+    assert len(reports) == 20 + 40
+    assert _requested_reports_pages(list(respx_mock.calls)[interrupted_calls:]) == [
+        ("01-10-2022", 20),
+        ("01-10-2022", 40),
+        ("02-10-2022", 0),
+        ("02-10-2022", 20),
+        ("02-10-2022", 40),
+    ]
+    progress = backfill.progress()
+    assert progress.days_done == 2
+    assert progress.days_remaining == 0
+    assert progress.items_done == 80
+
+
+def test_reports_backfill_skips_completed_days(tmp_path, respx_mock):
+    # given
+    wse = WSE()
+    respx_mock.post(wse._gpw_client.config.reports_url).mock(side_effect=_reports_response)
+    checkpoint_path = tmp_path / "reports.json"
+    list(ReportsBackfill(wse, MarketEnum.GPW, date(2022, 10, 1), date(2022, 10, 1), checkpoint_path=checkpoint_path))
+    first_run_calls = respx_mock.calls.call_count
+
+    # when
+    reports = list(
+        ReportsBackfill(wse, MarketEnum.GPW, date(2022, 10, 1), date(2022, 10, 2), checkpoint_path=checkpoint_path)
+    )
+
+    # then
+    assert len(reports) == 40
+    assert {day for day, _ in _requested_reports_pages(list(respx_mock.calls)[first_run_calls:])} == {"02-10-2022"}
+
+
+def test_reports_backfill_does_not_complete_days_failed_with_server_error(tmp_path, respx_mock):
+    # given
+    failing_wse = WSE(scheduler=RequestScheduler(SchedulerPolicy(rate=None, backoff_base=0, failure_threshold=100)))
+    route = respx_mock.post(failing_wse._gpw_client.config.reports_url)
+    route.return_value = httpx.Response(503)
+    checkpoint_path = tmp_path / "reports.json"
+    with pytest.raises(httpx.HTTPStatusError):
+        list(
+            ReportsBackfill(
+                failing_wse, MarketEnum.GPW, date(2022, 9, 22), date(2022, 9, 23), checkpoint_path=checkpoint_path
+            )
+        )
+    route.return_value = None
+    route.side_effect = _reports_response
+
+    # when
+    backfill = ReportsBackfill(
+        WSE(), MarketEnum.GPW, date(2022, 9, 22), date(2022, 9, 23), checkpoint_path=checkpoint_path
+    )
+    first_progress = backfill.progress()
+    reports = list(backfill)
+
+    # then
+    assert first_progress.days_done == 0
+    assert first_progress.items_done == 0
+    assert len(reports) == 2 * 40
+
+
+def test_reports_backfill_with_start_after_end_raises():
+    # when / then
+    with pytest.raises(DateRangeException):
+        ReportsBackfill(WSE(), MarketEnum.GPW, date(2022, 10, 2), date(2022, 10, 1))
+
+
+def test_stock_quotes_backfill_does_not_complete_days_failed_with_server_error(tmp_path, respx_mock):
+    # given
+    failing_wse = WSE(scheduler=RequestScheduler(SchedulerPolicy(rate=None, backoff_base=0, failure_threshold=100)))
+    route = respx_mock.get(STOCK_QUOTES_URL)
+    route.return_value = httpx.Response(503, content=b"<html></html>", headers={"content-type": "text/html"})
+    checkpoint_path = tmp_path / "quotes.json"
+    with pytest.raises(httpx.HTTPStatusError):
+        list(StockQuotesBackfill(failing_wse, date(2022, 9, 22), date(2022, 9, 23), checkpoint_path=checkpoint_path))
+    route.return_value = None
+    route.side_effect = _stock_quotes_response
+
+    # when
+    backfill = StockQuotesBackfill(WSE(), date(2022, 9, 22), date(2022, 9, 23), checkpoint_path=checkpoint_path)
+    first_progress = backfill.progress()
+    quotes = list(backfill)
+
+    # then
+    assert first_progress.days_done == 0
+    assert len(quotes) == 2 * 418
+
+
+def test_stock_quotes_backfill_resumes_after_completed_days(tmp_path, respx_mock):
+    # given
+    respx_mock.get(STOCK_QUOTES_URL).mock(side_effect=_stock_quotes_response)
+    checkpoint_path = tmp_path / "quotes.json"
+    interrupted = iter(
+        StockQuotesBackfill(WSE(), date(2022, 10, 3), date(2022, 10, 5), checkpoint_path=checkpoint_path)
+    )
+    list(itertools.islice(interrupted, 418 + 1))
+    interrupted.close()
+    progress_reports = []
+
+    # when
+    backfill = StockQuotesBackfill(
+        WSE(),
+        date(2022, 10, 3),
+        date(2022, 10, 7),
+        checkpoint_path=checkpoint_path,
+        on_day_done=progress_reports.append,
+    )
+    first_progress = backfill.progress()
+    quotes = list(backfill)
+
+    # then
+    assert first_progress.days_done == 1
+    assert first_progress.days_remaining == 4
+    assert first_progress.items_done == 418
+    assert len(quotes) == 3 * 418
+    assert [progress.days_remaining for progress in progress_reports] == [3, 2, 1, 0]
+    assert progress_reports[-1].items_done == 4 * 418
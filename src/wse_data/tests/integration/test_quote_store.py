@@ -0,0 +1,128 @@
+from datetime import date
+
+import httpx
+import pytest
+
+from wse_data.data_scrappers.gpw.request_scheduler import RequestScheduler, SchedulerPolicy
+from wse_data.quote_store import QuoteStore
+from wse_data.wse import DateRangeException, WSE
+
+from wse_data.tests.data.gpw_responses import GPW_STOCK_QUOTATIONS_XLS
+
+STOCK_QUOTES_URL = "https://www.gpw.pl/archiwum-notowan"
+
+
+def _stock_quotes_response_for_days(xls_days):
+    def stock_quotes_response(request):
+        if request.url.params["date"] in xls_days:
+            return httpx.Response(
+                200, content=GPW_STOCK_QUOTATIONS_XLS, headers={"content-type": "application/vnd.ms-excel"}
+            )
+        return httpx.Response(200, content=b"<html></html>", headers={"content-type": "text/html"})
+
+    return stock_quotes_response
+
+
+@pytest.fixture
+def store(tmp_path):
+    with QuoteStore(tmp_path / "quotes.sqlite3") as store:
+        yield store
+
+
+def test_sync_stores_quotes_of_trading_days(store, respx_mock):
+    # given
+    respx_mock.get(STOCK_QUOTES_URL).mock(side_effect=_stock_quotes_response_for_days({"04-10-2022"}))
+    wse = WSE()
+
+    # when
+    result = store.sync(wse, date(2022, 10, 1), date(2022, 10, 5), workers=2)
+
+    # then
+    assert result.fetched_days == 3
+    assert result.trading_days == 1
+    assert result.stock_quotes == 418
+    assert list(store.get_stock_quotes(date(2022, 10, 1), date(2022, 10, 5))) == list(
+        wse.get_stock_quotes(date(2022, 10, 4))
+    )
+
+
+def test_sync_fetches_only_missing_days(store, respx_mock):
+    # given
+    respx_mock.get(STOCK_QUOTES_URL).mock(side_effect=_stock_quotes_response_for_days({"03-10-2022"}))
+    store.sync(WSE(), date(2022, 10, 3), date(2022, 10, 4))
+    first_sync_calls = respx_mock.calls.call_count
+
+    # when
+    result = store.sync(WSE(), date(2022, 10, 3), date(2022, 10, 6))
+    requested_days = sorted(call.request.url.params["date"] for call in list(respx_mock.calls)[first_sync_calls:])
+
+    # then
+    assert result.fetched_days == 2
+    assert requested_days == ["05-10-2022", "06-10-2022"]
+    assert store.missing_days(date(2022, 10, 1), date(2022, 10, 7)) == [date(2022, 10, 7)]
+
+
+def test_sync_fetches_again_days_which_failed_with_server_error(store, respx_mock):
+    # given
+    route = respx_mock.get(STOCK_QUOTES_URL)
+    route.return_value = httpx.Response(503, content=b"<html></html>", headers={"content-type": "text/html"})
+    wse = WSE(scheduler=RequestScheduler(SchedulerPolicy(rate=None, backoff_base=0)))
+    with pytest.raises(httpx.HTTPStatusError):
+        store.sync(wse, date(2022, 10, 4), date(2022, 10, 4))
+    route.return_value = None
+    route.side_effect = _stock_quotes_response_for_days({"04-10-2022"})
+
+    # when
+    result = store.sync(wse, date(2022, 10, 4), date(2022, 10, 4))
+
+    # then
+    assert result.trading_days == 1
+    assert result.stock_quotes == 418
+    assert store.missing_days(date(2022, 10, 4), date(2022, 10, 4)) == []
+
+
+def test_sync_does_not_mark_today_as_fetched(store, respx_mock):
+    # given
+    respx_mock.get(STOCK_QUOTES_URL).mock(side_effect=_stock_quotes_response_for_days(set()))
+    today = date.today()
+
+    # when
+    store.sync(WSE(), today, today)
+
+    # then
+    assert store.missing_days(today, today) == ([today] if today.weekday() < 5 else [])
+
+
+def test_get_stock_quotes_for_isin_reads_date_range(store, respx_mock):
+    # given
+    respx_mock.get(STOCK_QUOTES_URL).mock(side_effect=_stock_quotes_response_for_days({"04-10-2022"}))
+    store.sync(WSE(), date(2022, 10, 3), date(2022, 10, 5))
+
+    # when
+    stock_quotes = list(store.get_stock_quotes(date(2022, 10, 1), date(2022, 10, 31), isin="PLNFI0600010"))
+    other_range_quotes = list(store.get_stock_quotes(date(2022, 10, 5), date(2022, 10, 31), isin="PLNFI0600010"))
+
+    # then
+    assert [(quotes.company_isin, quotes.date_) for quotes in stock_quotes] == [("PLNFI0600010", date(2022, 10, 4))]
+    assert other_range_quotes == []
+
+
+def test_store_persists_quotes_between_instances(tmp_path, respx_mock):
+    # given
+    respx_mock.get(STOCK_QUOTES_URL).mock(side_effect=_stock_quotes_response_for_days({"04-10-2022"}))
+    with QuoteStore(tmp_path / "quotes.sqlite3") as store:
+        store.sync(WSE(), date(2022, 10, 4), date(2022, 10, 4))
+
+    # when
+    with QuoteStore(tmp_path / "quotes.sqlite3") as store:
+        stock_quotes = list(store.get_stock_quotes(date(2022, 10, 4), date(2022, 10, 4)))
+        missing_days = store.missing_days(date(2022, 10, 4), date(2022, 10, 4))
+
+    # then
+    assert len(stock_quotes) == 418
+    assert missing_days == []
+
+
+def test_sync_raises_exception_for_reversed_range(store):
+    with pytest.raises(DateRangeException):
+        store.sync(WSE(), date(2022, 10, 5), date(2022, 10, 1))
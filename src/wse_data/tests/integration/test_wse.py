@@ -1,12 +1,17 @@
+import tempfile
+from collections import Counter
 from datetime import datetime, date
 from decimal import Decimal
+from urllib.parse import parse_qs
 
 import httpx
 import pytest
 
 from wse_data.data_scrappers.gpw.company_model import CompanyModel, MarketEnum
 from wse_data.data_scrappers.gpw.failed_parsing_element_model import FailedParsingElementModel
+from wse_data.data_scrappers.gpw.gpw_parser import ParserBackend
 from wse_data.data_scrappers.gpw.report_model import ReportModel, ReportCategory, ReportType
+from wse_data.data_scrappers.gpw.response_cache import DiskResponseCache
 from wse_data.data_scrappers.gpw.stock_quotes_model import StockQuotesModel
 
 from wse_data.tests.data.gpw_responses import (
@@ -18,7 +23,17 @@ from wse_data.tests.data.gpw_responses import (
     NEW_CONNECT_COMPANIES_LIST_PAGE,
     GPW_STOCK_QUOTATIONS_XLS,
 )
-from wse_data.wse import WSE
+from wse_data.metrics import (
+    DOWNLOADED_BYTES,
+    FAILED_ROWS,
+    PAGE_PARSE_SECONDS,
+    PAGES_FETCHED,
+    PARSED_ROWS,
+    REQUEST_SECONDS,
+    InMemoryMetricsSink,
+)
+from wse_data.reports_state import ReportsHighWaterMarkModel, ReportsState
+from wse_data.wse import STOCK_QUOTES_TEMP_PREFIX, DateRangeException, StockQuotesFrameFormat, WSE
 
 
 @pytest.fixture
@@ -26,6 +41,11 @@ def wse():
     return WSE()
 
 
+def _new_report_entry():
+    first_entry = REPORTS_PAGE[: REPORTS_PAGE.index(b"</li>") + len(b"</li>")]
+    return first_entry.replace(b"404679", b"404700").replace(b"23-09-2022 17:01:26", b"24-09-2022 10:00:00")
+
+
 def test_get_companies_returns_proper_number_of_companies(wse, respx_mock):
     # given
     respx_mock.post(wse._gpw_client.config.companies_requests[0][0]).mock(
@@ -44,6 +64,24 @@ def test_get_companies_returns_proper_number_of_companies(wse, respx_mock):
     assert len(new_connect_companies) == 20
 
 
+def test_get_companies_by_market_tags_companies_of_all_markets(wse, respx_mock):
+    # given
+    respx_mock.post(wse._gpw_client.config.companies_requests[0][0]).mock(
+        return_value=httpx.Response(200, content=GPW_COMPANIES_LIST_PAGE)
+    )
+    respx_mock.post(wse._new_connect_client.config.companies_requests[0][0]).mock(
+        return_value=httpx.Response(200, content=NEW_CONNECT_COMPANIES_LIST_PAGE)
+    )
+
+    # when
+    companies = list(wse.get_companies_by_market())
+
+    # then
+    assert sum(market == MarketEnum.GPW for market, _ in companies) == 60
+    assert sum(market == MarketEnum.NEW_CONNECT for market, _ in companies) == 20
+    assert all(market == company.market for market, company in companies)
+
+
 def test_get_companies_returns_model_object(wse, respx_mock):
     # given
     respx_mock.post(wse._gpw_client.config.companies_requests[0][0]).mock(
@@ -110,6 +148,62 @@ def test_get_reports_returns_proper_number_of_reports(wse, respx_mock):
     assert len(new_connect_reports) == 20
 
 
+def test_get_reports_for_date_range_merges_days_newest_first_without_duplicates(wse, respx_mock):
+    # given
+    days_pages = {"24-09-2022": [_new_report_entry()], "23-09-2022": [REPORTS_PAGE], "22-09-2022": [REPORTS_PAGE]}
+
+    def reports_response(request):
+        data = parse_qs(request.content.decode())
+        pages = days_pages[data["date"][0]]
+        page_number = int(data["offset"][0]) // 20
+        return httpx.Response(200, content=pages[page_number] if page_number < len(pages) else REPORTS_EMPTY_PAGE)
+
+    respx_mock.post(wse._gpw_client.config.reports_url).mock(side_effect=reports_response)
+
+    # when
+    reports = list(wse.get_reports(market=MarketEnum.GPW, date_from=date(2022, 9, 22), date_to=date(2022, 9, 24)))
+
+    # then
+    assert len(reports) == 21
+    assert reports[0].gpw_id == "404700"
+    assert reports[1].gpw_id == "404679"
+    assert len({report.gpw_id for report in reports}) == 21
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {"date_to": date(2022, 9, 24)},
+        {"date_from": date(2022, 9, 24), "date_to": date(2022, 9, 22)},
+        {"date_from": date(2022, 9, 22), "date_": date(2022, 9, 23)},
+        {"date_from": date(2022, 9, 22), "stream": True},
+        {"date_from": date(2022, 9, 22), "parse_workers": 2},
+    ],
+)
+def test_get_reports_with_invalid_date_range_raises(wse, kwargs):
+    # when / then
+    with pytest.raises(DateRangeException):
+        next(wse.get_reports(market=MarketEnum.GPW, **kwargs))
+
+
+def test_get_reports_by_market_tags_reports_of_all_markets(wse, respx_mock):
+    # given
+    respx_mock.post(wse._gpw_client.config.reports_url).side_effect = [
+        httpx.Response(200, content=REPORTS_PAGE),
+        httpx.Response(200, content=REPORTS_EMPTY_PAGE),
+    ]
+    respx_mock.post(wse._new_connect_client.config.reports_url).side_effect = [
+        httpx.Response(200, content=_new_report_entry()),
+    ]
+
+    # when
+    reports = list(wse.get_reports_by_market([MarketEnum.GPW, MarketEnum.NEW_CONNECT]))
+
+    # then
+    assert [report.gpw_id for market, report in reports if market == MarketEnum.NEW_CONNECT] == ["404700"]
+    assert sum(market == MarketEnum.GPW for market, _ in reports) == 20
+
+
 def test_get_reports_returns_model_object(wse, respx_mock):
     # given
     respx_mock.post(wse._gpw_client.config.reports_url).mock(return_value=httpx.Response(200, content=REPORTS_PAGE))
@@ -143,6 +237,37 @@ def test_get_reports_continues_after_known_parsing_exception(wse, respx_mock):
     assert len(reports) == 15
 
 
+def test_get_reports_parsed_in_processes_matches_sequential_parsing(wse, respx_mock):
+    # given
+    # NOTE: malformed page has less than 20 entries, so it is the last one.
+    pages = [REPORTS_PAGE, _new_report_entry() + REPORTS_PAGE, REPORTS_PAGE_MALFORMED]
+    respx_mock.post(wse._gpw_client.config.reports_url).side_effect = [
+        httpx.Response(200, content=page) for page in pages * 2
+    ]
+    expected_reports = list(wse.get_reports(market=MarketEnum.GPW))
+
+    # when
+    reports = list(wse.get_reports(market=MarketEnum.GPW, parse_workers=2))
+
+    # then
+    assert reports == expected_reports
+    assert any(isinstance(report, FailedParsingElementModel) for report in reports)
+
+
+def test_get_companies_parsed_in_processes_matches_sequential_parsing(wse, respx_mock):
+    # given
+    respx_mock.post(wse._gpw_client.config.companies_requests[0][0]).mock(
+        return_value=httpx.Response(200, content=GPW_COMPANIES_LIST_PAGE)
+    )
+    expected_companies = list(wse.get_companies(market=MarketEnum.GPW))
+
+    # when
+    companies = list(wse.get_companies(market=MarketEnum.GPW, parse_workers=2))
+
+    # then
+    assert companies == expected_companies
+
+
 def test_get_reports_break_after_reaching_empty_page(wse, respx_mock):
     # given
     respx_mock.post(wse._gpw_client.config.reports_url).side_effect = [
@@ -222,3 +347,358 @@ def test_get_stock_quotes_returns_proper_number_of_records(wse, respx_mock):
         min=Decimal("477"),
         volume=53,
     )
+
+
+def test_get_companies_concurrent_mode_returns_same_companies(wse, respx_mock):
+    # given
+    respx_mock.post(wse._gpw_client.config.companies_requests[0][0]).mock(
+        return_value=httpx.Response(200, content=GPW_COMPANIES_LIST_PAGE)
+    )
+
+    # when
+    sequential_companies = list(wse.get_companies(market=MarketEnum.GPW))
+    concurrent_companies = list(wse.get_companies(market=MarketEnum.GPW, concurrency=3))
+
+    # then
+    assert concurrent_companies == sequential_companies
+
+
+def test_get_new_reports_first_call_returns_all_reports(wse, respx_mock, tmp_path):
+    # given
+    respx_mock.post(wse._gpw_client.config.reports_url).side_effect = [
+        httpx.Response(200, content=REPORTS_PAGE),
+        httpx.Response(200, content=REPORTS_EMPTY_PAGE),
+    ]
+    state = ReportsState(tmp_path / "state.json")
+
+    # when
+    new_reports = list(wse.get_new_reports(market=MarketEnum.GPW, state=state))
+
+    # then
+    assert len(new_reports) == 20
+    expected_mark = ReportsHighWaterMarkModel(datetime=datetime(2022, 9, 23, 17, 1, 26), gpw_ids={"404679"})
+    assert state.load("GPW:") == expected_mark
+
+
+def test_get_new_reports_stops_at_first_seen_report(wse, respx_mock, tmp_path):
+    # given
+    route = respx_mock.post(wse._gpw_client.config.reports_url)
+    route.side_effect = [httpx.Response(200, content=REPORTS_PAGE), httpx.Response(200, content=REPORTS_EMPTY_PAGE)]
+    state = ReportsState(tmp_path / "state.json")
+    list(wse.get_new_reports(market=MarketEnum.GPW, state=state))
+    route.side_effect = None
+    route.return_value = httpx.Response(200, content=_new_report_entry() + REPORTS_PAGE)
+
+    # when
+    new_reports = list(wse.get_new_reports(market=MarketEnum.GPW, state=state))
+    next_new_reports = list(wse.get_new_reports(market=MarketEnum.GPW, state=state))
+
+    # then
+    assert [report.gpw_id for report in new_reports] == ["404700"]
+    assert next_new_reports == []
+    # NOTE: one page per call after the initial one.
+    assert route.call_count == 2 + 2
+
+
+def test_get_new_reports_yields_report_published_late_with_older_datetime(wse, respx_mock, tmp_path):
+    # given
+    route = respx_mock.post(wse._gpw_client.config.reports_url)
+    route.side_effect = [httpx.Response(200, content=REPORTS_PAGE), httpx.Response(200, content=REPORTS_EMPTY_PAGE)]
+    state = ReportsState(tmp_path / "state.json")
+    list(wse.get_new_reports(market=MarketEnum.GPW, state=state))
+    first_entry = REPORTS_PAGE[: REPORTS_PAGE.index(b"</li>") + len(b"</li>")]
+    late_entry = first_entry.replace(b"404679", b"404701").replace(b"23-09-2022 17:01:26", b"23-09-2022 16:45:00")
+    route.side_effect = None
+    route.return_value = httpx.Response(200, content=REPORTS_PAGE.replace(first_entry, first_entry + late_entry))
+
+    # when
+    new_reports = list(wse.get_new_reports(market=MarketEnum.GPW, state=state))
+    next_new_reports = list(wse.get_new_reports(market=MarketEnum.GPW, state=state))
+
+    # then
+    assert [report.gpw_id for report in new_reports] == ["404701"]
+    assert next_new_reports == []
+
+
+def test_get_new_reports_saves_state_only_after_complete_iteration(wse, respx_mock, tmp_path):
+    # given
+    respx_mock.post(wse._gpw_client.config.reports_url).side_effect = [
+        httpx.Response(200, content=REPORTS_PAGE),
+        httpx.Response(200, content=REPORTS_EMPTY_PAGE),
+    ]
+    state = ReportsState(tmp_path / "state.json")
+
+    # when
+    new_reports = wse.get_new_reports(market=MarketEnum.GPW, state=state)
+    next(new_reports)
+    new_reports.close()
+
+    # then
+    assert state.load("GPW:") is None
+
+
+def test_get_reports_with_prefetch_returns_same_reports(wse, respx_mock):
+    # given
+    def response_for_offset(request):
+        if b"offset=0&" in request.content:
+            return httpx.Response(200, content=REPORTS_PAGE)
+        return httpx.Response(200, content=REPORTS_EMPTY_PAGE)
+
+    respx_mock.post(wse._gpw_client.config.reports_url).mock(side_effect=response_for_offset)
+
+    # when
+    sequential_reports = list(wse.get_reports(market=MarketEnum.GPW))
+    prefetched_reports = list(wse.get_reports(market=MarketEnum.GPW, prefetch=2))
+
+    # then
+    assert prefetched_reports == sequential_reports
+
+
+def _stock_quotes_response_for_days(xls_days):
+    def stock_quotes_response(request):
+        if request.url.params["date"] in xls_days:
+            return httpx.Response(
+                200, content=GPW_STOCK_QUOTATIONS_XLS, headers={"content-type": "application/vnd.ms-excel"}
+            )
+        return httpx.Response(200, content=b"<html></html>", headers={"content-type": "text/html"})
+
+    return stock_quotes_response
+
+
+def test_get_stock_quotes_range_skips_weekends_and_non_trading_days(wse, respx_mock):
+    # given
+    respx_mock.get("https://www.gpw.pl/archiwum-notowan").mock(
+        side_effect=_stock_quotes_response_for_days({"03-10-2022", "05-10-2022"})
+    )
+
+    # when
+    stock_quotes = list(wse.get_stock_quotes_range(date(2022, 10, 1), date(2022, 10, 5), parse_workers=0))
+    requested_days = [call.request.url.params["date"] for call in respx_mock.calls]
+
+    # then
+    assert len(stock_quotes) == 2 * 418
+    assert sorted(requested_days) == ["03-10-2022", "04-10-2022", "05-10-2022"]
+
+
+def test_get_stock_quotes_range_parses_in_process_pool(wse, respx_mock):
+    # given
+    respx_mock.get("https://www.gpw.pl/archiwum-notowan").mock(
+        side_effect=_stock_quotes_response_for_days({"04-10-2022"})
+    )
+
+    # when
+    stock_quotes = list(wse.get_stock_quotes_range(date(2022, 10, 3), date(2022, 10, 4), workers=2, parse_workers=2))
+
+    # then
+    assert stock_quotes == list(wse.get_stock_quotes(date(2022, 10, 4)))
+
+
+def test_get_stock_quotes_range_trusted_parsed_in_process_pool_same_as_validated(wse, respx_mock):
+    # given
+    respx_mock.get("https://www.gpw.pl/archiwum-notowan").mock(
+        side_effect=_stock_quotes_response_for_days({"04-10-2022"})
+    )
+
+    # when
+    stock_quotes = list(
+        WSE(trusted=True).get_stock_quotes_range(date(2022, 10, 3), date(2022, 10, 4), workers=2, parse_workers=2)
+    )
+
+    # then
+    assert stock_quotes == list(wse.get_stock_quotes(date(2022, 10, 4)))
+
+
+def test_get_stock_quotes_days_yields_days_in_order(wse, respx_mock):
+    # given
+    respx_mock.get("https://www.gpw.pl/archiwum-notowan").mock(
+        side_effect=_stock_quotes_response_for_days({"03-10-2022", "06-10-2022"})
+    )
+
+    # when
+    days = list(wse._get_stock_quotes_days(date(2022, 10, 3), date(2022, 10, 7), workers=4, parse_workers=0))
+
+    # then
+    assert [day for day, _ in days] == [date(2022, 10, day) for day in range(3, 8)]
+    assert [quotes is not None for _, quotes in days] == [True, False, False, True, False]
+
+
+@pytest.mark.parametrize("parse_workers", [0, 2])
+def test_get_stock_quotes_days_removes_temporary_sheets(wse, respx_mock, monkeypatch, tmp_path, parse_workers):
+    # given
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_path))
+    respx_mock.get("https://www.gpw.pl/archiwum-notowan").mock(
+        side_effect=_stock_quotes_response_for_days({"03-10-2022", "04-10-2022", "05-10-2022"})
+    )
+    days = wse.get_stock_quotes_days(
+        [date(2022, 10, 3), date(2022, 10, 4), date(2022, 10, 5)], workers=2, parse_workers=parse_workers
+    )
+
+    # when
+    next(days)
+    directories_while_running = [path.name for path in tmp_path.iterdir()]
+    days.close()
+
+    # then
+    assert [name.startswith(STOCK_QUOTES_TEMP_PREFIX) for name in directories_while_running] == [True]
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_get_stock_quotes_range_raises_exception_for_reversed_range(wse):
+    with pytest.raises(DateRangeException):
+        list(wse.get_stock_quotes_range(date(2022, 10, 5), date(2022, 10, 1)))
+
+
+def test_get_stock_quotes_frame_returns_record_array_of_trading_days(wse, respx_mock):
+    # given
+    pytest.importorskip("numpy")
+    respx_mock.get("https://www.gpw.pl/archiwum-notowan").mock(
+        side_effect=_stock_quotes_response_for_days({"03-10-2022", "05-10-2022"})
+    )
+
+    # when
+    records = wse.get_stock_quotes_frame(date(2022, 10, 1), date(2022, 10, 5))
+    stock_quotes = list(wse.get_stock_quotes(date(2022, 10, 3)))
+
+    # then
+    assert len(records) == 2 * 418
+    assert records["company_isin"].tolist() == 2 * [quotes.company_isin for quotes in stock_quotes]
+    assert records["volume"].tolist() == 2 * [quotes.volume for quotes in stock_quotes]
+
+
+def test_get_stock_quotes_frame_returns_empty_array_without_trading_days(wse, respx_mock):
+    # given
+    pytest.importorskip("numpy")
+    respx_mock.get("https://www.gpw.pl/archiwum-notowan").mock(side_effect=_stock_quotes_response_for_days(set()))
+
+    # when
+    records = wse.get_stock_quotes_frame(date(2022, 10, 3), date(2022, 10, 4))
+
+    # then
+    assert len(records) == 0
+
+
+def test_get_stock_quotes_frame_returns_arrow_table(wse, respx_mock):
+    # given
+    pytest.importorskip("pyarrow")
+    respx_mock.get("https://www.gpw.pl/archiwum-notowan").mock(
+        side_effect=_stock_quotes_response_for_days({"04-10-2022"})
+    )
+
+    # when
+    table = wse.get_stock_quotes_frame(date(2022, 10, 4), date(2022, 10, 4), frame_format=StockQuotesFrameFormat.ARROW)
+
+    # then
+    assert table.num_rows == 418
+    assert table.column_names == ["date", "company_name", "company_isin", "opening", "closing", "max", "min", "volume"]
+
+
+def test_get_stock_quotes_frame_raises_exception_for_reversed_range(wse):
+    pytest.importorskip("numpy")
+    with pytest.raises(DateRangeException):
+        wse.get_stock_quotes_frame(date(2022, 10, 5), date(2022, 10, 1))
+
+
+def test_get_stock_quotes_with_disk_cache_downloads_day_once(respx_mock, tmp_path):
+    # given
+    wse = WSE(cache=DiskResponseCache(directory=tmp_path))
+    respx_mock.get("https://www.gpw.pl/archiwum-notowan").mock(
+        side_effect=_stock_quotes_response_for_days({"04-10-2022"})
+    )
+
+    # when
+    first_quotes = list(wse.get_stock_quotes(date(2022, 10, 4)))
+    second_quotes = list(WSE(cache=DiskResponseCache(directory=tmp_path)).get_stock_quotes(date(2022, 10, 4)))
+
+    # then
+    assert respx_mock.calls.call_count == 1
+    assert second_quotes == first_quotes
+
+
+def test_get_reports_with_lxml_backend_returns_same_reports(wse, respx_mock):
+    # given
+    pytest.importorskip("lxml")
+    lxml_wse = WSE(parser_backend=ParserBackend.LXML)
+    respx_mock.post(wse._gpw_client.config.reports_url).side_effect = [
+        httpx.Response(200, content=REPORTS_PAGE),
+        httpx.Response(200, content=REPORTS_EMPTY_PAGE),
+        httpx.Response(200, content=REPORTS_PAGE),
+        httpx.Response(200, content=REPORTS_EMPTY_PAGE),
+    ]
+
+    # when
+    bs4_reports = list(wse.get_reports(market=MarketEnum.GPW))
+    lxml_reports = list(lxml_wse.get_reports(market=MarketEnum.GPW))
+
+    # then
+    assert lxml_reports == bs4_reports
+
+
+def test_get_reports_stream_mode_returns_same_reports(wse, respx_mock):
+    # given
+    respx_mock.post(wse._gpw_client.config.reports_url).side_effect = [
+        httpx.Response(200, content=REPORTS_PAGE),
+        httpx.Response(200, content=REPORTS_EMPTY_PAGE),
+        httpx.Response(200, content=REPORTS_PAGE),
+        httpx.Response(200, content=REPORTS_EMPTY_PAGE),
+    ]
+
+    # when
+    reports = list(wse.get_reports(market=MarketEnum.GPW))
+    streamed_reports = list(wse.get_reports(market=MarketEnum.GPW, stream=True))
+
+    # then
+    assert streamed_reports == reports
+    assert respx_mock.calls.call_count == 4
+
+
+def test_get_reports_stream_mode_stops_after_short_page(wse, respx_mock):
+    # given
+    respx_mock.post(wse._gpw_client.config.reports_url).mock(return_value=httpx.Response(200, content=REPORTS_PAGE))
+
+    # when
+    reports = list(wse.get_reports(market=MarketEnum.GPW, page_size=50, stream=True))
+
+    # then
+    assert len(reports) == 20
+    assert respx_mock.calls.call_count == 1
+
+
+def test_get_reports_reports_metrics(respx_mock):
+    # given
+    metrics = InMemoryMetricsSink()
+    wse = WSE(metrics=metrics)
+    respx_mock.post(wse._gpw_client.config.reports_url).side_effect = [
+        httpx.Response(200, content=REPORTS_PAGE),
+        httpx.Response(200, content=REPORTS_PAGE_MALFORMED),
+    ]
+
+    # when
+    reports = list(wse.get_reports(market=MarketEnum.GPW))
+
+    # then
+    failed = Counter(report.error for report in reports if isinstance(report, FailedParsingElementModel))
+    labels = {"endpoint": "reports", "market": "GPW"}
+    assert metrics.timing(REQUEST_SECONDS, **labels).count == 2
+    assert metrics.counter(PAGES_FETCHED, **labels) == 2
+    assert metrics.counter(DOWNLOADED_BYTES, **labels) == len(REPORTS_PAGE) + len(REPORTS_PAGE_MALFORMED.encode())
+    assert metrics.timing(PAGE_PARSE_SECONDS, kind="reports", market="GPW").count == 2
+    assert metrics.counter(PARSED_ROWS, kind="reports") == len(reports) - sum(failed.values())
+    assert failed
+    for error, count in failed.items():
+        assert metrics.counter(FAILED_ROWS, kind="reports", error=error) == count
+
+
+def test_get_companies_parsed_in_processes_reports_parse_metrics(respx_mock):
+    # given
+    metrics = InMemoryMetricsSink()
+    wse = WSE(metrics=metrics)
+    respx_mock.post(wse._gpw_client.config.companies_requests[0][0]).mock(
+        return_value=httpx.Response(200, content=GPW_COMPANIES_LIST_PAGE)
+    )
+
+    # when
+    companies = list(wse.get_companies(market=MarketEnum.GPW, parse_workers=2))
+
+    # then
+    assert metrics.counter(PARSED_ROWS, kind="companies", market="GPW") == len(companies)
+    assert metrics.timing(PAGE_PARSE_SECONDS, kind="companies").total > 0
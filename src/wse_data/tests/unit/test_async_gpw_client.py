@@ -0,0 +1,125 @@
+import asyncio
+from datetime import date
+
+import httpx
+import pytest
+
+from wse_data.data_scrappers.gpw.async_gpw_client import AsyncGPWClient
+from wse_data.data_scrappers.gpw.company_model import MarketEnum
+from wse_data.data_scrappers.gpw.request_scheduler import RequestScheduler, SchedulerPolicy
+
+from wse_data.tests.data import gpw_responses
+
+
+@pytest.fixture
+def gpw_client():
+    return AsyncGPWClient(market=MarketEnum.GPW)
+
+
+async def _collect(async_iterator):
+    return [item async for item in async_iterator]
+
+
+def test_companies_list_makes_request_for_every_config_entry(gpw_client, respx_mock):
+    # given
+    respx_mock.post(gpw_client.config.companies_requests[0][0]).mock(httpx.Response(200, content=b"response"))
+
+    # when
+    responses = asyncio.run(_collect(gpw_client.companies_list(search="test-search")))
+
+    # then
+    assert len(responses) == len(gpw_client.config.companies_requests)
+    assert b"filters%5Bsearch%5D=test-search" in respx_mock.calls.last.request.content
+
+
+def test_companies_list_reuses_one_http_client(gpw_client, respx_mock):
+    # given
+    respx_mock.post(gpw_client.config.companies_requests[0][0]).mock(httpx.Response(200, content=b"response"))
+    http_client = gpw_client._http_client
+
+    # when
+    asyncio.run(_collect(gpw_client.companies_list()))
+
+    # then
+    assert gpw_client._http_client is http_client
+    assert not http_client.is_closed
+
+
+def test_reports_list_paging_parameters_for_second_page(gpw_client, respx_mock):
+    # given
+    respx_mock.post(gpw_client.config.reports_url).side_effect = [
+        httpx.Response(200, content=b"<li>response" * 20),
+        httpx.Response(200, content=b"<li>response"),
+    ]
+
+    # when
+    responses = asyncio.run(_collect(gpw_client.reports_list()))
+
+    # then
+    assert len(responses) == 2
+    assert b"offset=20" in respx_mock.calls.last.request.content
+
+
+def test_reports_list_breaks_loop_when_empty_response(gpw_client, respx_mock):
+    # given
+    respx_mock.post(gpw_client.config.reports_url).mock(
+        return_value=httpx.Response(200, content=gpw_responses.REPORTS_EMPTY_PAGE)
+    )
+
+    # when
+    responses = asyncio.run(_collect(gpw_client.reports_list()))
+
+    # then
+    assert responses == []
+
+
+def test_stock_quotes_returns_none_for_html_response(gpw_client, respx_mock):
+    # given
+    respx_mock.get("https://www.gpw.pl/archiwum-notowan").mock(
+        return_value=httpx.Response(200, content=b"<html></html>", headers={"content-type": "text/html"})
+    )
+
+    # when
+    response = asyncio.run(gpw_client.stock_quotes(date(2022, 10, 1)))
+
+    # then
+    assert response is None
+
+
+def test_aclose_closes_http_client(gpw_client):
+    # when
+    asyncio.run(gpw_client.aclose())
+
+    # then
+    assert gpw_client._http_client.is_closed
+
+
+def test_reports_list_prefetch_stops_after_short_page(gpw_client, respx_mock):
+    # given
+    respx_mock.post(gpw_client.config.reports_url).mock(return_value=httpx.Response(200, content=b"<li>response"))
+
+    # when
+    responses = asyncio.run(_collect(gpw_client.reports_list(prefetch=2)))
+
+    # then
+    assert len(responses) == 1
+
+
+@pytest.mark.parametrize("page_size,prefetch", [(0, 0), (20, -1)])
+def test_reports_list_rejects_invalid_paging(gpw_client, respx_mock, page_size, prefetch):
+    with pytest.raises(ValueError):
+        asyncio.run(_collect(gpw_client.reports_list(page_size=page_size, prefetch=prefetch)))
+
+    assert respx_mock.calls.call_count == 0
+
+
+def test_reports_list_raises_for_server_error(respx_mock):
+    # given
+    gpw_client = AsyncGPWClient(
+        market=MarketEnum.GPW, scheduler=RequestScheduler(SchedulerPolicy(rate=None, backoff_base=0))
+    )
+    respx_mock.post(gpw_client.config.reports_url).mock(return_value=httpx.Response(503))
+
+    # when / then
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(_collect(gpw_client.reports_list()))
@@ -1,19 +1,36 @@
 import io
+import logging
 from typing import Any
 
+import httpx
+import pytest
 from typer.testing import CliRunner
-from unittest.mock import patch
-from datetime import datetime
+from unittest.mock import MagicMock, patch
+from datetime import date, datetime
+from decimal import Decimal
 from rich import print
 
 from wse_data.cli import app, WSE
+from wse_data.company_registry import CompanyRegistry
 from wse_data.data_scrappers.gpw.company_model import CompanyModel, MarketEnum
+from wse_data.data_scrappers.gpw.failed_parsing_element_model import FailedParsingElementModel
 from wse_data.data_scrappers.gpw.report_model import ReportModel, ReportCategory, ReportType
+from wse_data.data_scrappers.gpw.stock_quotes_model import StockQuotesModel
+from wse_data.metrics import DataKindEnum
+from wse_data.quote_store import QuoteStore, SyncResultModel
+from wse_data.report_watch import DetectionLatencyModel
 
 
 runner = CliRunner()
 
 
+@pytest.fixture(autouse=True)
+def enable_logging_after_cli():
+    # NOTE: the CLI disables logging globally, which would leak into other tests.
+    yield
+    logging.disable(logging.NOTSET)
+
+
 def test_companies_list_prints_companies():
     # given
     get_companies_return_value = [
@@ -31,6 +48,19 @@ def test_companies_list_prints_companies():
         assert _get_rich_print_text(get_companies_return_value[1]) in result.stdout
 
 
+def test_companies_list_prints_failure_counts():
+    # given
+    failed = FailedParsingElementModel(page=b"<tr></tr>", start=0, end=9, error="CompanyIdNotFoundException")
+
+    # when
+    with patch.object(WSE, "get_companies", return_value=[failed, failed]):
+        result = runner.invoke(app, ["companies", "list"])
+
+        # then
+        assert "There were 2 companies that failed parsing." in result.stdout
+        assert "CompanyIdNotFoundException: 2" in result.stdout
+
+
 def test_reports_list_prints_reports():
     # given
     get_reports_return_value = [
@@ -64,8 +94,376 @@ def test_reports_list_prints_reports():
         assert _get_rich_print_text(get_reports_return_value[1]) in result.stdout
 
 
+def test_reports_list_with_range_uses_date_range():
+    # when
+    with patch.object(WSE, "get_reports", return_value=[]) as mocked:
+        result = runner.invoke(app, ["reports", "list", "--from", "2022-09-01", "--to", "2022-09-30"])
+
+        # then
+        assert result.exit_code == 0
+        assert mocked.call_args.kwargs["date_from"] == date(2022, 9, 1)
+        assert mocked.call_args.kwargs["date_to"] == date(2022, 9, 30)
+
+
+def test_reports_list_with_to_but_without_from_fails():
+    # when
+    with patch.object(WSE, "get_reports") as mocked:
+        result = runner.invoke(app, ["reports", "list", "--to", "2022-09-30"])
+
+    # then
+    assert result.exit_code != 0
+    assert "--to can't be used without --from" in result.stdout
+    mocked.assert_not_called()
+
+
+@pytest.mark.parametrize(
+    "args, error",
+    [
+        (["--date", "2022-01-03", "--from", "2022-01-01"], "--date can't be used with --from or --to"),
+        (["--date", "2022-01-03", "--to", "2022-01-05"], "--date can't be used with --from or --to"),
+        (["--from", "2022-01-05", "--to", "2022-01-01"], "--from can't be after --to"),
+    ],
+)
+def test_reports_list_with_invalid_dates_fails(args, error):
+    # when
+    with patch.object(WSE, "get_reports") as mocked:
+        result = runner.invoke(app, ["reports", "list", *args])
+
+    # then
+    assert result.exit_code == 2
+    assert error in result.stdout
+    mocked.assert_not_called()
+
+
+def test_companies_list_for_all_markets_fetches_markets_together():
+    # given
+    company = CompanyModel(isin="1", name="11 BIT", ticker="11B", market=MarketEnum.GPW)
+
+    # when
+    with patch.object(WSE, "get_companies_by_market", return_value=[(MarketEnum.GPW, company)]) as mocked:
+        result = runner.invoke(app, ["companies", "list", "--market", "all"])
+
+        # then
+        assert result.exit_code == 0
+        assert mocked.call_args.args[0] == [MarketEnum.GPW, MarketEnum.NEW_CONNECT]
+        assert _get_rich_print_text(company) in result.stdout
+
+
+def test_reports_list_new_uses_state_file(tmp_path):
+    # when
+    with patch.object(WSE, "get_new_reports", return_value=[]) as mocked:
+        result = runner.invoke(app, ["reports", "list", "--new", "--state", str(tmp_path / "state.json")])
+
+        # then
+        assert result.exit_code == 0
+        assert mocked.call_args.kwargs["state"].path == tmp_path / "state.json"
+
+
+def test_reports_watch_prints_new_reports_and_latency():
+    # given
+    report = ReportModel(
+        gpw_id="1",
+        company_isin="PL1",
+        name="report 1",
+        summary="summary 1",
+        datetime=datetime(2022, 9, 23, 17, 1, 26),
+        category=ReportCategory.ESPI,
+        type=ReportType.CURRENT,
+    )
+    latency = DetectionLatencyModel(count=1, last=2.0, mean=2.0, max=2.0, p95=2.0)
+    watcher = MagicMock()
+    watcher.__iter__.return_value = iter([report])
+    watcher.latency.snapshot.return_value = latency
+
+    # when
+    with patch.object(WSE, "watch_reports", return_value=watcher) as mocked:
+        result = runner.invoke(app, ["reports", "watch", "--session-interval", "1"])
+
+        # then
+        assert result.exit_code == 0
+        assert mocked.call_args.kwargs["schedule"].session_interval == 1
+        assert _get_rich_print_text(report) in result.stdout
+        assert _get_rich_print_text(latency) in result.stdout
+
+
+def test_quotes_list_with_range_uses_range_download():
+    # when
+    with patch.object(WSE, "get_stock_quotes_range", return_value=[]) as mocked:
+        result = runner.invoke(app, ["quotes", "list", "--from", "2022-10-01", "--to", "2022-10-05", "--workers", "2"])
+
+        # then
+        assert result.exit_code == 0
+        mocked.assert_called_once_with(date(2022, 10, 1), date(2022, 10, 5), workers=2)
+
+
+def test_quotes_list_without_date_fails():
+    # when
+    result = runner.invoke(app, ["quotes", "list"])
+
+    # then
+    assert result.exit_code != 0
+
+
+@pytest.mark.parametrize(
+    "args, error",
+    [
+        (["--date", "2022-10-04", "--from", "2022-10-01"], "--date can't be used with --from or --to"),
+        (["--date", "2022-10-04", "--to", "2022-10-05"], "--date can't be used with --from or --to"),
+        (["--from", "2022-10-05", "--to", "2022-10-01"], "--from can't be after --to"),
+    ],
+)
+def test_quotes_list_with_invalid_dates_fails(args, error):
+    # when
+    with patch.object(WSE, "get_stock_quotes") as mocked, patch.object(WSE, "get_stock_quotes_range") as mocked_range:
+        result = runner.invoke(app, ["quotes", "list", *args])
+
+    # then
+    assert result.exit_code == 2
+    assert error in result.stdout
+    mocked.assert_not_called()
+    mocked_range.assert_not_called()
+
+
+def test_sync_quotes_prints_summary(tmp_path):
+    # given
+    sync_result = SyncResultModel(fetched_days=5, trading_days=4, stock_quotes=1672)
+
+    # when
+    with patch.object(QuoteStore, "sync", return_value=sync_result) as mocked:
+        result = runner.invoke(
+            app, ["sync", "quotes", "--from", "2022-10-03", "--to", "2022-10-07", "--store", str(tmp_path / "q.db")]
+        )
+
+        # then
+        assert result.exit_code == 0
+        assert mocked.call_args.args[1:] == (date(2022, 10, 3), date(2022, 10, 7))
+        assert "Fetched 5 days, 4 trading days with 1672 quotes." in result.stdout
+
+
+def test_quotes_list_local_reads_store(tmp_path):
+    # when
+    with patch.object(QuoteStore, "get_stock_quotes", return_value=[]) as mocked:
+        with patch.object(WSE, "get_stock_quotes") as mocked_wse:
+            result = runner.invoke(
+                app, ["quotes", "list", "--date", "2022-10-04", "--local", "--store", str(tmp_path / "q.db")]
+            )
+
+            # then
+            assert result.exit_code == 0
+            mocked.assert_called_once_with(date(2022, 10, 4), date(2022, 10, 4))
+            assert mocked_wse.call_count == 0
+
+
+def test_companies_list_local_searches_registry(tmp_path):
+    # given
+    company = CompanyModel(isin="1", name="11 BIT", ticker="11B", market=MarketEnum.GPW)
+
+    # when
+    with patch.object(CompanyRegistry, "refresh_if_stale", return_value=False) as mocked_refresh:
+        with patch.object(CompanyRegistry, "search", return_value=[company]) as mocked_search:
+            with patch.object(WSE, "get_companies") as mocked_wse:
+                result = runner.invoke(
+                    app,
+                    ["companies", "list", "--local", "--search", "bit", "--registry", str(tmp_path / "c.json")],
+                )
+
+                # then
+                assert result.exit_code == 0
+                assert mocked_refresh.call_count == 1
+                mocked_search.assert_called_once_with("bit", [MarketEnum.GPW])
+                assert mocked_wse.call_count == 0
+                assert "11 BIT" in result.stdout
+
+
+def test_companies_list_local_serves_stale_registry_when_refresh_fails(tmp_path):
+    # given
+    companies = [
+        CompanyModel(isin="1", name="11 BIT", ticker="11B", market=MarketEnum.GPW),
+        CompanyModel(isin="2", name="BRAND 24", ticker="B24", market=MarketEnum.NEW_CONNECT),
+    ]
+    registry_path = tmp_path / "c.json"
+    with patch.object(WSE, "get_companies_by_market", return_value=[(c.market, c) for c in companies]):
+        CompanyRegistry(registry_path).refresh(WSE())
+
+    # when
+    with patch.object(CompanyRegistry, "is_stale", return_value=True):
+        with patch.object(WSE, "get_companies_by_market", side_effect=httpx.ConnectError("gpw.pl is down")):
+            result = runner.invoke(app, ["companies", "list", "--local", "--registry", str(registry_path)])
+
+            # then
+            assert result.exit_code == 0
+            assert "company registry not refreshed" in result.stdout
+            assert "11 BIT" in result.stdout
+
+
+def test_companies_list_local_fails_without_registry_when_refresh_fails(tmp_path):
+    # when
+    with patch.object(WSE, "get_companies_by_market", side_effect=httpx.ConnectError("gpw.pl is down")):
+        result = runner.invoke(app, ["companies", "list", "--local", "--registry", str(tmp_path / "c.json")])
+
+        # then
+        assert result.exit_code != 0
+        assert isinstance(result.exception, httpx.ConnectError)
+
+
+def test_sync_companies_prints_summary(tmp_path):
+    # when
+    with patch.object(CompanyRegistry, "refresh", return_value=1234):
+        result = runner.invoke(app, ["sync", "companies", "--registry", str(tmp_path / "c.json")])
+
+        # then
+        assert result.exit_code == 0
+        assert "Fetched 1234 companies." in result.stdout
+
+
+def test_backfill_quotes_prints_quotes_and_progress(tmp_path):
+    # given
+    quote = StockQuotesModel(
+        date=date(2022, 10, 3),
+        company_name="11BIT",
+        company_isin="PLGAMES00015",
+        opening=Decimal("100"),
+        closing=Decimal("101"),
+        max=Decimal("102"),
+        min=Decimal("99"),
+        volume=10,
+    )
+
+    def get_stock_quotes_days(days, workers):
+        for day in days:
+            yield day, [quote]
+
+    # when
+    with patch.object(WSE, "get_stock_quotes_days", side_effect=get_stock_quotes_days) as mocked:
+        result = runner.invoke(
+            app,
+            [
+                "backfill",
+                "quotes",
+                "--from",
+                "2022-10-03",
+                "--to",
+                "2022-10-04",
+                "--checkpoint",
+                str(tmp_path / "quotes.json"),
+            ],
+        )
+
+        # then
+        assert result.exit_code == 0
+        assert mocked.call_args.args[0] == [date(2022, 10, 3), date(2022, 10, 4)]
+        assert _get_rich_print_text(quote) in result.stdout
+        assert "Days done 2, remaining 0; 2 items done" in result.stdout
+
+
 def _get_rich_print_text(to_print: Any) -> str:
     stream = io.StringIO()
     print(to_print, file=stream, flush=True)
     stream.seek(0)
     return stream.read()
+
+
+def test_quotes_list_writes_jsonl_to_output_file(tmp_path):
+    # given
+    quote = StockQuotesModel(
+        date=date(2022, 10, 4),
+        company_name="11BIT",
+        company_isin="PL11BTS00015",
+        opening=Decimal("178.4"),
+        closing=Decimal("180.2"),
+        max=Decimal("181"),
+        min=Decimal("177.6"),
+        volume=10_400,
+    )
+    output = tmp_path / "quotes.jsonl"
+
+    # when
+    with patch.object(WSE, "get_stock_quotes", return_value=[quote, quote]):
+        result = runner.invoke(
+            app, ["quotes", "list", "--date", "2022-10-04", "--format", "jsonl", "--output", str(output)]
+        )
+
+    # then
+    assert result.exit_code == 0
+    assert result.stdout == ""
+    assert [StockQuotesModel.parse_raw(line) for line in output.read_text().splitlines()] == [quote, quote]
+
+
+def test_companies_list_writes_csv_to_stdout():
+    # given
+    companies = [
+        CompanyModel(isin="1", name="11 BIT", ticker="11B", market=MarketEnum.GPW),
+        FailedParsingElementModel(page=b"<tr></tr>", start=0, end=9, error="CompanyIdNotFoundException"),
+    ]
+
+    # when
+    with patch.object(WSE, "get_companies", return_value=companies):
+        result = runner.invoke(app, ["companies", "list", "--format", "csv"])
+
+    # then
+    assert result.stdout.splitlines()[:2] == ["isin,name,ticker,market", "1,11 BIT,11B,GPW"]
+    assert "There were 1 companies that failed parsing." in result.stdout
+
+
+@pytest.mark.parametrize("output_format", ["text", "jsonl", "csv", "parquet"])
+def test_reports_list_skips_failed_rows_in_every_format(tmp_path, output_format):
+    # given
+    if output_format == "parquet":
+        pytest.importorskip("pyarrow")
+    report = ReportModel(
+        gpw_id="1",
+        company_isin="PL1",
+        name="report 1",
+        summary="summary",
+        datetime=datetime(2022, 2, 23, 11, 12, 43),
+        category=ReportCategory.ESPI,
+        type=ReportType.CURRENT,
+    )
+    failed = FailedParsingElementModel(page=b"<html><li>broken</li></html>", start=6, end=21, error="ReportIdNotFound")
+    output = tmp_path / f"reports.{output_format}"
+
+    # when
+    with patch.object(WSE, "get_reports", return_value=[report, failed]):
+        result = runner.invoke(app, ["reports", "list", "--format", output_format, "--output", str(output)])
+
+    # then
+    assert result.exit_code == 0
+    assert "There were 1 reports that failed parsing." in result.stdout
+    if output_format == "parquet":
+        import pyarrow.parquet
+
+        assert pyarrow.parquet.read_table(output).column("gpw_id").to_pylist() == ["1"]
+        return
+    lines = output.read_text().splitlines()
+    assert "broken" not in output.read_text()
+    if output_format == "jsonl":
+        assert [ReportModel.parse_raw(line) for line in lines] == [report]
+    elif output_format == "csv":
+        assert len(lines) == 2
+    else:
+        assert "report 1" in output.read_text()
+
+
+def test_reports_list_parquet_without_output_fails():
+    # when
+    with patch.object(WSE, "get_reports", return_value=[]):
+        result = runner.invoke(app, ["reports", "list", "--format", "parquet"])
+
+    # then
+    assert result.exit_code != 0
+
+
+def test_stats_prints_timing_summary_at_exit():
+    # given
+    def get_reports(self, **kwargs):
+        self._gpw_client._record_request(DataKindEnum.REPORTS, 0.25, 2048)
+        return []
+
+    # when
+    with patch.object(WSE, "get_reports", get_reports):
+        result = runner.invoke(app, ["--stats", "reports", "list"])
+
+    # then
+    assert result.exit_code == 0
+    assert "reports GPW: 1 requests, 0.25s total" in result.stdout
+    assert "2 KiB downloaded" in result.stdout
@@ -0,0 +1,40 @@
+import os
+import subprocess
+import sys
+
+# NOTE: about 0.2s on a developer machine, mostly typer and rich; heavy modules would add another 0.3s.
+IMPORT_TIME_BUDGET_US = 600_000
+LAZY_MODULES = ("pydantic", "httpx", "bs4", "xlrd", "lxml", "numpy", "wse_data.wse")
+
+
+def _import_times(module: str) -> dict[str, int]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+        env={**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)},
+    )
+    cumulative_times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        cumulative_times[name.strip()] = int(cumulative)
+    return cumulative_times
+
+
+def test_cli_import_does_not_load_heavy_modules():
+    # when
+    import_times = _import_times("wse_data.cli")
+
+    # then
+    assert [module for module in LAZY_MODULES if module in import_times] == []
+
+
+def test_cli_import_time_is_within_budget():
+    # when
+    import_time = min(_import_times("wse_data.cli")["wse_data.cli"] for _ in range(3))
+
+    # then
+    assert import_time < IMPORT_TIME_BUDGET_US
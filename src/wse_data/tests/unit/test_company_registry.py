@@ -0,0 +1,171 @@
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import pytest
+
+from wse_data.company_registry import CompanyRegistry, CompanyRegistryException
+from wse_data.data_scrappers.gpw.company_model import CompanyModel, MarketEnum
+from wse_data.data_scrappers.gpw.failed_parsing_element_model import FailedParsingElementModel
+from wse_data.wse import WSE
+
+COMPANIES = [
+    CompanyModel(isin="PLGAMES00015", name="11 BIT STUDIOS", ticker="11B", market=MarketEnum.GPW),
+    CompanyModel(isin="PLAMBRA00013", name="AMBRA", ticker="AMB", market=MarketEnum.GPW),
+    CompanyModel(isin="PLCDPRO00015", name="CD PROJEKT", ticker="CDR", market=MarketEnum.GPW),
+    CompanyModel(isin="PLBRTSP00011", name="BRAND 24", ticker="B24", market=MarketEnum.NEW_CONNECT),
+]
+
+
+@pytest.fixture
+def registry(tmp_path):
+    registry = CompanyRegistry(tmp_path / "companies.json")
+    with patch.object(
+        WSE, "get_companies_by_market", return_value=[(company.market, company) for company in COMPANIES]
+    ):
+        registry.refresh(WSE())
+    return registry
+
+
+def test_new_registry_is_stale(tmp_path):
+    # when
+    registry = CompanyRegistry(tmp_path / "companies.json")
+
+    # then
+    assert registry.is_stale()
+    assert registry.companies() == []
+
+
+def test_refresh_skips_failed_companies(tmp_path):
+    # given
+    registry = CompanyRegistry(tmp_path / "companies.json")
+    failed = FailedParsingElementModel(page=b"<tr></tr>", start=0, end=9, error="CompanyIdNotFoundException")
+
+    # when
+    with patch.object(
+        WSE,
+        "get_companies_by_market",
+        return_value=[(MarketEnum.GPW, COMPANIES[0]), (MarketEnum.GPW, failed), (MarketEnum.NEW_CONNECT, COMPANIES[3])],
+    ):
+        companies_count = registry.refresh(WSE())
+
+    # then
+    assert companies_count == 2
+    assert registry.companies() == [COMPANIES[0], COMPANIES[3]]
+
+
+def test_refresh_keeps_saved_companies_when_nothing_fetched(registry):
+    # when
+    with patch.object(WSE, "get_companies_by_market", return_value=[]):
+        with pytest.raises(CompanyRegistryException):
+            registry.refresh(WSE())
+
+    # then
+    assert CompanyRegistry(registry.path).companies() == COMPANIES
+
+
+def test_refresh_keeps_saved_companies_when_market_fetched_nothing(registry):
+    # when
+    with patch.object(WSE, "get_companies_by_market", return_value=[(MarketEnum.GPW, COMPANIES[0])]):
+        with pytest.raises(CompanyRegistryException, match="NEW-CONNECT"):
+            registry.refresh(WSE())
+
+    # then
+    assert CompanyRegistry(registry.path).companies() == COMPANIES
+
+
+def test_registry_is_loaded_from_file(registry):
+    # when
+    loaded_registry = CompanyRegistry(registry.path)
+
+    # then
+    assert loaded_registry.companies() == COMPANIES
+    assert loaded_registry.refreshed_at == registry.refreshed_at
+    assert not loaded_registry.is_stale()
+
+
+def test_registry_is_stale_after_ttl(registry):
+    # when
+    is_stale = registry.is_stale(now=registry.refreshed_at + timedelta(seconds=registry.ttl))
+
+    # then
+    assert is_stale
+
+
+def test_refresh_if_stale_does_not_scrape_fresh_registry(registry):
+    # when
+    with patch.object(WSE, "get_companies_by_market") as mocked:
+        refreshed = registry.refresh_if_stale(WSE())
+
+    # then
+    assert refreshed is False
+    assert mocked.call_count == 0
+
+
+def test_refresh_if_stale_scrapes_stale_registry(tmp_path):
+    # given
+    registry = CompanyRegistry(tmp_path / "companies.json", ttl=0)
+
+    # when
+    with patch.object(
+        WSE, "get_companies_by_market", return_value=[(company.market, company) for company in COMPANIES]
+    ):
+        refreshed = registry.refresh_if_stale(WSE())
+
+    # then
+    assert refreshed is True
+    assert registry.refreshed_at <= datetime.now()
+
+
+def test_corrupted_registry_file_is_ignored(tmp_path):
+    # given
+    path = tmp_path / "companies.json"
+    path.write_text('{"refreshed_at": "yesterday"}')
+
+    # when
+    registry = CompanyRegistry(path)
+
+    # then
+    assert registry.is_stale()
+    assert registry.companies() == []
+
+
+def test_by_isin_and_by_ticker_ignore_case(registry):
+    # when
+    by_isin = registry.by_isin("plambra00013")
+    by_ticker = registry.by_ticker("cdr")
+
+    # then
+    assert by_isin == COMPANIES[1]
+    assert by_ticker == COMPANIES[2]
+    assert registry.by_ticker("XXX") is None
+
+
+@pytest.mark.parametrize(
+    "query, expected",
+    [
+        ("", COMPANIES),
+        ("b", [COMPANIES[0], COMPANIES[1], COMPANIES[3]]),
+        ("cd", [COMPANIES[2]]),
+        ("projekt", [COMPANIES[2]]),
+        ("Brand 2", [COMPANIES[3]]),
+        ("pl", COMPANIES),
+        ("plgames", [COMPANIES[0]]),
+        ("bit studios", [COMPANIES[0]]),
+        ("bit projekt", []),
+        ("studiosplgames", []),
+    ],
+)
+def test_search_matches_name_ticker_and_isin(registry, query, expected):
+    # when
+    companies = registry.search(query)
+
+    # then
+    assert companies == expected
+
+
+def test_search_filters_markets(registry):
+    # when
+    companies = registry.search("b", markets=[MarketEnum.NEW_CONNECT])
+
+    # then
+    assert companies == [COMPANIES[3]]
@@ -0,0 +1,182 @@
+import asyncio
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from wse_data.concurrency import async_ordered_map, interleave, ordered_map
+
+
+def test_ordered_map_keeps_input_order():
+    # given
+    def slow_for_first(item):
+        time.sleep(0.05 if item == 0 else 0)
+        return item * 2
+
+    # when
+    results = list(ordered_map(slow_for_first, range(5), workers=5))
+
+    # then
+    assert results == [0, 2, 4, 6, 8]
+
+
+def test_ordered_map_bounds_calls_in_flight():
+    # given
+    lock = threading.Lock()
+    in_flight = 0
+    max_in_flight = 0
+
+    def tracked(item):
+        nonlocal in_flight, max_in_flight
+        with lock:
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+        time.sleep(0.01)
+        with lock:
+            in_flight -= 1
+        return item
+
+    # when
+    list(ordered_map(tracked, range(20), workers=3))
+
+    # then
+    assert max_in_flight <= 3
+
+
+def test_ordered_map_does_not_submit_past_window_when_closed_early():
+    # given
+    called = []
+
+    def record(item):
+        called.append(item)
+        return item
+
+    results = ordered_map(record, range(100), workers=2)
+
+    # when
+    next(results)
+    results.close()
+
+    # then
+    assert len(called) <= 2
+
+
+def test_ordered_map_waits_for_running_calls_of_given_executor_when_closed_early():
+    # given
+    finished = []
+
+    def slow_after_first(item):
+        time.sleep(0 if item == 0 else 0.1)
+        finished.append(item)
+        return item
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        results = ordered_map(slow_after_first, range(2), workers=2, executor=executor)
+
+        # when
+        next(results)
+        results.close()
+
+        # then
+        assert finished == [0, 1]
+
+
+def test_ordered_map_rejects_non_positive_workers():
+    with pytest.raises(ValueError):
+        list(ordered_map(str, range(3), workers=0))
+
+
+def test_async_ordered_map_keeps_input_order():
+    # given
+    async def slow_for_first(item):
+        await asyncio.sleep(0.05 if item == 0 else 0)
+        return item * 2
+
+    async def collect():
+        return [result async for result in async_ordered_map(slow_for_first, range(5), concurrency=5)]
+
+    # when
+    results = asyncio.run(collect())
+
+    # then
+    assert results == [0, 2, 4, 6, 8]
+
+
+def test_async_ordered_map_awaits_cancelled_tasks_when_closed_early():
+    # given
+    finished = []
+
+    async def slow_after_first(item):
+        try:
+            await asyncio.sleep(0 if item == 0 else 10)
+        finally:
+            finished.append(item)
+        return item
+
+    async def take_first():
+        results = async_ordered_map(slow_after_first, range(3), concurrency=3)
+        first = await results.__anext__()
+        await results.aclose()
+        return first, sorted(finished)
+
+    # when
+    first, finished_when_closed = asyncio.run(take_first())
+
+    # then
+    assert first == 0
+    assert finished_when_closed == [0, 1, 2]
+
+
+def test_interleave_yields_items_as_they_arrive_tagged_by_source():
+    # given
+    def slow():
+        time.sleep(0.1)
+        yield "slow"
+
+    def fast():
+        yield "fast 1"
+        yield "fast 2"
+
+    # when
+    results = list(interleave([slow, fast]))
+
+    # then
+    assert results == [(1, "fast 1"), (1, "fast 2"), (0, "slow")]
+
+
+def test_interleave_raises_source_exception_after_its_items():
+    # given
+    def failing():
+        yield 1
+        raise RuntimeError("source failed")
+
+    results = interleave([failing])
+
+    # when / then
+    assert next(results) == (0, 1)
+    with pytest.raises(RuntimeError, match="source failed"):
+        next(results)
+
+
+def test_interleave_stops_sources_when_closed_early():
+    # given
+    produced = []
+
+    def endless():
+        for item in itertools.count():
+            produced.append(item)
+            yield item
+
+    results = interleave([endless], queue_size=2)
+
+    # when
+    next(results)
+    results.close()
+    produced_after_close = len(produced)
+    time.sleep(0.05)
+
+    # then
+    assert len(produced) == produced_after_close
+    assert produced_after_close <= 4
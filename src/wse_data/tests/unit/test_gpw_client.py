@@ -1,9 +1,15 @@
+import io
+from datetime import date
+from urllib.parse import parse_qs
+
 import httpx
 import pytest
 from httpx._content import encode_urlencoded_data
 
 from wse_data.data_scrappers.gpw.company_model import MarketEnum
 from wse_data.data_scrappers.gpw.gpw_client import GPWClient
+from wse_data.data_scrappers.gpw.request_scheduler import RequestScheduler, SchedulerPolicy
+from wse_data.data_scrappers.gpw.response_cache import InMemoryResponseCache
 
 from wse_data.tests.data import gpw_responses
 
@@ -172,3 +178,240 @@ def test_reports_list_breaks_loop_when_empty_response(respx_mock, gpw_client):
     # then
     with pytest.raises(StopIteration):
         next(reports_list_generator)
+
+
+def test_companies_list_concurrent_mode_keeps_config_order(gpw_client, respx_mock):
+    # given
+    def response_for_type(request):
+        request_type = parse_qs(request.content.decode(), keep_blank_values=True)["type"][0]
+        return httpx.Response(200, content=request_type.encode())
+
+    respx_mock.post(gpw_client.config.companies_requests[0][0]).mock(side_effect=response_for_type)
+
+    # when
+    responses = list(gpw_client.companies_list(concurrency=3))
+
+    # then
+    assert [response.content for response in responses] == [b"", b"fix1", b"fix2"]
+
+
+def test_companies_list_does_not_modify_config(gpw_client, respx_mock):
+    # given
+    respx_mock.post(gpw_client.config.companies_requests[0][0]).mock(httpx.Response(200, content=b"response"))
+
+    # when
+    list(gpw_client.companies_list(search="test-search", concurrency=3))
+
+    # then
+    assert all(params["filters[search]"] == "" for _, params in gpw_client.config.companies_requests)
+
+
+def test_reports_list_uses_custom_page_size(gpw_client, respx_mock):
+    # given
+    respx_mock.post(gpw_client.config.reports_url).side_effect = [
+        httpx.Response(200, content=b"<li>response" * 50),
+        httpx.Response(200, content=b"<li>response"),
+    ]
+
+    # when
+    responses = list(gpw_client.reports_list(page_size=50))
+
+    # then
+    assert len(responses) == 2
+    assert b"limit=50" in respx_mock.calls.last.request.content
+    assert b"offset=50" in respx_mock.calls.last.request.content
+
+
+def test_reports_list_prefetch_yields_pages_in_offset_order(gpw_client, respx_mock):
+    # given
+    def response_for_offset(request):
+        offset = int(parse_qs(request.content.decode())["offset"][0])
+        if offset >= 60:
+            return httpx.Response(200, content=b"<li>last")
+        return httpx.Response(200, content=f"<li>{offset}".encode() * 20)
+
+    respx_mock.post(gpw_client.config.reports_url).mock(side_effect=response_for_offset)
+
+    # when
+    responses = list(gpw_client.reports_list(prefetch=3))
+
+    # then
+    assert [response.content[:6] for response in responses] == [b"<li>0<", b"<li>20", b"<li>40", b"<li>la"]
+
+
+def test_reports_list_prefetch_stops_after_short_page(gpw_client, respx_mock):
+    # given
+    respx_mock.post(gpw_client.config.reports_url).mock(return_value=httpx.Response(200, content=b"<li>response"))
+
+    # when
+    responses = list(gpw_client.reports_list(prefetch=2))
+
+    # then
+    assert len(responses) == 1
+    assert respx_mock.calls.call_count <= 3
+
+
+@pytest.mark.parametrize("page_size,prefetch", [(0, 0), (20, -1)])
+def test_reports_list_rejects_invalid_paging(gpw_client, respx_mock, page_size, prefetch):
+    with pytest.raises(ValueError):
+        next(gpw_client.reports_list(page_size=page_size, prefetch=prefetch))
+
+    assert respx_mock.calls.call_count == 0
+
+
+@pytest.fixture
+def cached_gpw_client():
+    return GPWClient(market=MarketEnum.GPW, cache=InMemoryResponseCache())
+
+
+def test_companies_list_is_served_from_cache(cached_gpw_client, respx_mock):
+    # given
+    respx_mock.post(cached_gpw_client.config.companies_requests[0][0]).mock(httpx.Response(200, content=b"response"))
+
+    # when
+    list(cached_gpw_client.companies_list())
+    responses = list(cached_gpw_client.companies_list())
+
+    # then
+    assert respx_mock.calls.call_count == len(cached_gpw_client.config.companies_requests)
+    assert [response.content for response in responses] == [b"response"] * 3
+
+
+def test_stale_cache_entry_is_revalidated(cached_gpw_client, respx_mock):
+    # given
+    cached_gpw_client._cache_policy.reports_ttl = 0
+    respx_mock.post(cached_gpw_client.config.reports_url).side_effect = [
+        httpx.Response(200, content=b"<li>response", headers={"etag": '"v1"'}),
+        httpx.Response(304),
+    ]
+
+    # when
+    list(cached_gpw_client.reports_list())
+    responses = list(cached_gpw_client.reports_list())
+
+    # then
+    assert respx_mock.calls.last.request.headers["if-none-match"] == '"v1"'
+    assert responses[0].content == b"<li>response"
+
+
+def test_historical_stock_quotes_never_expire(cached_gpw_client, respx_mock):
+    # given
+    respx_mock.get("https://www.gpw.pl/archiwum-notowan").mock(
+        return_value=httpx.Response(200, content=b"xls", headers={"content-type": "application/vnd.ms-excel"})
+    )
+
+    # when
+    cached_gpw_client.stock_quotes(date(2022, 10, 4))
+    response = cached_gpw_client.stock_quotes(date(2022, 10, 4))
+    entry = cached_gpw_client._cache.get(list(cached_gpw_client._cache._entries)[0])
+
+    # then
+    assert respx_mock.calls.call_count == 1
+    assert response.content == b"xls"
+    assert entry.ttl is None
+
+
+def test_non_trading_day_is_cached_without_body(cached_gpw_client, respx_mock):
+    # given
+    respx_mock.get("https://www.gpw.pl/archiwum-notowan").mock(
+        return_value=httpx.Response(200, content=b"<html></html>", headers={"content-type": "text/html"})
+    )
+
+    # when
+    first_response = cached_gpw_client.stock_quotes(date(2022, 10, 1))
+    second_response = cached_gpw_client.stock_quotes(date(2022, 10, 1))
+
+    # then
+    assert first_response is None
+    assert second_response is None
+    assert respx_mock.calls.call_count == 1
+
+
+def test_past_non_trading_day_is_fetched_again_after_rejected_ttl(cached_gpw_client, respx_mock):
+    # given
+    route = respx_mock.get("https://www.gpw.pl/archiwum-notowan")
+    route.side_effect = [
+        httpx.Response(200, content=b"<html>maintenance</html>", headers={"content-type": "text/html"}),
+        httpx.Response(200, content=b"xls", headers={"content-type": "application/vnd.ms-excel"}),
+    ]
+    cached_gpw_client.stock_quotes(date(2022, 10, 4))
+    key = list(cached_gpw_client._cache._entries)[0]
+    entry = cached_gpw_client._cache.get(key)
+    cached_gpw_client._cache.set(key, entry.copy(update={"stored_at": entry.stored_at - entry.ttl}))
+
+    # when
+    response = cached_gpw_client.stock_quotes(date(2022, 10, 4))
+
+    # then
+    assert entry.ttl == cached_gpw_client._cache_policy.rejected_ttl
+    assert response.content == b"xls"
+    assert cached_gpw_client._cache.get(key).ttl is None
+
+
+def test_stock_quotes_to_file_writes_sheet(gpw_client, respx_mock):
+    # given
+    respx_mock.get("https://www.gpw.pl/archiwum-notowan").mock(
+        return_value=httpx.Response(200, content=b"xls", headers={"content-type": "application/vnd.ms-excel"})
+    )
+    xls_file = io.BytesIO()
+
+    # when
+    is_trading_day = gpw_client.stock_quotes_to_file(date(2022, 10, 4), xls_file)
+
+    # then
+    assert is_trading_day is True
+    assert xls_file.getvalue() == b"xls"
+    assert parse_qs(respx_mock.calls[0].request.url.query.decode())["date"] == ["04-10-2022"]
+
+
+@pytest.mark.parametrize("cached", [False, True])
+def test_stock_quotes_to_file_writes_nothing_for_non_trading_day(gpw_client, cached_gpw_client, respx_mock, cached):
+    # given
+    respx_mock.get("https://www.gpw.pl/archiwum-notowan").mock(
+        return_value=httpx.Response(200, content=b"<html></html>", headers={"content-type": "text/html"})
+    )
+    xls_file = io.BytesIO()
+
+    # when
+    is_trading_day = (cached_gpw_client if cached else gpw_client).stock_quotes_to_file(date(2022, 10, 1), xls_file)
+
+    # then
+    assert is_trading_day is False
+    assert xls_file.getvalue() == b""
+
+
+@pytest.mark.parametrize("cached", [False, True])
+def test_stock_quotes_to_file_raises_for_server_error(respx_mock, cached):
+    # given
+    client = GPWClient(
+        market=MarketEnum.GPW,
+        cache=InMemoryResponseCache() if cached else None,
+        scheduler=RequestScheduler(SchedulerPolicy(rate=None, backoff_base=0)),
+    )
+    respx_mock.get("https://www.gpw.pl/archiwum-notowan").mock(
+        return_value=httpx.Response(503, content=b"<html></html>", headers={"content-type": "text/html"})
+    )
+    xls_file = io.BytesIO()
+
+    # when
+    with pytest.raises(httpx.HTTPStatusError):
+        client.stock_quotes_to_file(date(2022, 10, 4), xls_file)
+
+    # then
+    assert xls_file.getvalue() == b""
+
+
+def test_stock_quotes_to_file_uses_cache(cached_gpw_client, respx_mock):
+    # given
+    respx_mock.get("https://www.gpw.pl/archiwum-notowan").mock(
+        return_value=httpx.Response(200, content=b"xls", headers={"content-type": "application/vnd.ms-excel"})
+    )
+    first_file, second_file = io.BytesIO(), io.BytesIO()
+
+    # when
+    cached_gpw_client.stock_quotes_to_file(date(2022, 10, 4), first_file)
+    cached_gpw_client.stock_quotes_to_file(date(2022, 10, 4), second_file)
+
+    # then
+    assert respx_mock.calls.call_count == 1
+    assert first_file.getvalue() == second_file.getvalue() == b"xls"
@@ -0,0 +1,62 @@
+from decimal import Decimal
+
+import pytest
+
+from wse_data.data_scrappers.gpw.company_model import MarketEnum
+from wse_data.data_scrappers.gpw.gpw_parser import GPWParser
+
+from wse_data.tests.data import gpw_responses
+
+numpy = pytest.importorskip("numpy")
+
+
+@pytest.fixture
+def gpw_parser():
+    return GPWParser(market=MarketEnum.GPW)
+
+
+def test_parse_stock_quotes_columns_same_data_as_models(gpw_parser):
+    # given
+    models = list(gpw_parser.parse_stock_quotes_xls(gpw_responses.GPW_STOCK_QUOTATIONS_XLS))
+
+    # when
+    records = gpw_parser.parse_stock_quotes_columns(gpw_responses.GPW_STOCK_QUOTATIONS_XLS)
+
+    # then
+    assert len(records) == len(models) == 418
+    for record, model in zip(records, models):
+        assert record["date"].astype(object) == model.date_
+        assert record["company_name"] == model.company_name
+        assert record["company_isin"] == model.company_isin
+        assert Decimal("%0.15g" % record["opening"]) == model.opening
+        assert Decimal("%0.15g" % record["closing"]) == model.closing
+        assert Decimal("%0.15g" % record["max"]) == model.max
+        assert Decimal("%0.15g" % record["min"]) == model.min
+        assert record["volume"] == model.volume
+
+
+def test_parse_stock_quotes_columns_typed_arrays(gpw_parser):
+    # when
+    records = gpw_parser.parse_stock_quotes_columns(gpw_responses.GPW_STOCK_QUOTATIONS_XLS)
+
+    # then
+    assert records["date"].dtype == numpy.dtype("datetime64[D]")
+    assert records["closing"].dtype == numpy.float64
+    assert records["volume"].dtype == numpy.int64
+
+
+def test_stock_quotes_arrow_table():
+    # given
+    pyarrow = pytest.importorskip("pyarrow")
+    from wse_data.data_scrappers.gpw.gpw_columnar_parser import parse_stock_quotes_columns, stock_quotes_arrow_table
+
+    records = parse_stock_quotes_columns(gpw_responses.GPW_STOCK_QUOTATIONS_XLS)
+
+    # when
+    table = stock_quotes_arrow_table(records)
+
+    # then
+    assert table.num_rows == 418
+    assert table.schema.field("date").type == pyarrow.date32()
+    assert table.column("company_isin")[0].as_py() == "PLNFI0600010"
+    assert table.column("volume").to_pylist() == records["volume"].tolist()
@@ -0,0 +1,70 @@
+import pytest
+
+from wse_data.data_scrappers.gpw.company_model import MarketEnum
+from wse_data.data_scrappers.gpw.gpw_parser import EmptyPageException, GPWParser, ParserBackend
+
+from wse_data.tests.data import gpw_responses
+
+pytest.importorskip("lxml")
+
+
+@pytest.mark.parametrize(
+    "market, page",
+    [
+        (MarketEnum.GPW, gpw_responses.GPW_COMPANIES_LIST_PAGE),
+        (MarketEnum.GPW, gpw_responses.GPW_COMPANIES_LIST_PAGE_MALFORMED),
+        (MarketEnum.GPW, gpw_responses.COMPANIES_LIST_EMPTY_PAGE),
+        (MarketEnum.NEW_CONNECT, gpw_responses.NEW_CONNECT_COMPANIES_LIST_PAGE),
+        (MarketEnum.NEW_CONNECT, gpw_responses.NEW_CONNECT_COMPANIES_LIST_PAGE_MALFORMED),
+    ],
+    ids=["gpw", "gpw-malformed", "empty", "new-connect", "new-connect-malformed"],
+)
+def test_parse_companies_page_output_same_as_bs4_backend(market, page):
+    # given
+    bs4_parser = GPWParser(market=market)
+    lxml_parser = GPWParser(market=market, backend=ParserBackend.LXML)
+
+    # when
+    lxml_companies = list(lxml_parser.parse_companies_page(page))
+
+    # then
+    assert lxml_companies == list(bs4_parser.parse_companies_page(page))
+
+
+@pytest.mark.parametrize(
+    "page", [gpw_responses.REPORTS_PAGE, gpw_responses.REPORTS_PAGE_MALFORMED], ids=["reports", "reports-malformed"]
+)
+def test_parse_reports_page_output_same_as_bs4_backend(page):
+    # given
+    bs4_parser = GPWParser(market=MarketEnum.GPW)
+    lxml_parser = GPWParser(market=MarketEnum.GPW, backend=ParserBackend.LXML)
+
+    # when
+    lxml_reports = list(lxml_parser.parse_reports_page(page))
+
+    # then
+    assert lxml_reports == list(bs4_parser.parse_reports_page(page))
+
+
+def test_parse_reports_page_raises_exception_for_empty_page():
+    # given
+    lxml_parser = GPWParser(market=MarketEnum.GPW, backend=ParserBackend.LXML)
+
+    # then
+    with pytest.raises(EmptyPageException):
+        list(lxml_parser.parse_reports_page(gpw_responses.REPORTS_EMPTY_PAGE))
+
+
+@pytest.mark.parametrize(
+    "page", [gpw_responses.REPORTS_PAGE, gpw_responses.REPORTS_PAGE_MALFORMED], ids=["reports", "reports-malformed"]
+)
+def test_trusted_parse_reports_page_output_same_as_validated(page):
+    # given
+    validated_parser = GPWParser(market=MarketEnum.GPW, backend=ParserBackend.LXML)
+    trusted_parser = GPWParser(market=MarketEnum.GPW, backend=ParserBackend.LXML, trusted=True)
+
+    # when
+    reports = list(trusted_parser.parse_reports_page(page))
+
+    # then
+    assert reports == list(validated_parser.parse_reports_page(page))
@@ -1,3 +1,5 @@
+import json
+import tracemalloc
 from datetime import datetime
 from unittest.mock import patch
 
@@ -8,6 +10,7 @@ from wse_data.data_scrappers.gpw.company_model import CompanyModel, MarketEnum
 from wse_data.data_scrappers.gpw.failed_parsing_element_model import FailedParsingElementModel
 from wse_data.data_scrappers.gpw.gpw_parser import (
     GPWParser,
+    ParserBackend,
     CompanyIdNotFoundException,
     CompanyNameNotFoundException,
     CompanySymbolNotFoundException,
@@ -15,6 +18,7 @@ from wse_data.data_scrappers.gpw.gpw_parser import (
     FailedToParseReportDataException,
     ReportIdNotFoundException,
     ReportSummaryNotFoundException,
+    find_report_id_href,
 )
 from wse_data.data_scrappers.gpw.report_model import ReportModel, ReportCategory, ReportType
 
@@ -121,6 +125,73 @@ def test_parse_companies_page_returns_proper_model_on_failed_parsing(gpw_parser)
     assert isinstance(failed_model, FailedParsingElementModel)
 
 
+def test_parse_reports_page_failed_rows_reference_only_their_span_of_the_page(gpw_parser):
+    # given
+    page = gpw_responses.REPORTS_PAGE.replace(b"geru_id=", b"unknown=")
+
+    # when
+    failed_models = list(gpw_parser.parse_reports_page(page))
+
+    # then
+    assert len(failed_models) == 20
+    assert all(failed_model.page is failed_models[0].page for failed_model in failed_models)
+    assert bytes(failed_models[1].raw_data).startswith(b"<li")
+    assert bytes(failed_models[1].raw_data).endswith(b"</li>")
+    assert b"402563" not in bytes(failed_models[0].raw_data)
+    assert b"402563" in bytes(failed_models[1].raw_data)
+    assert {failed_model.error for failed_model in failed_models} == {"ReportIdNotFoundException"}
+    assert len(repr(failed_models[0])) < len(page) / 10
+
+
+def test_parse_reports_page_failed_row_span_skips_tags_starting_like_row_tag(gpw_parser):
+    # given
+    page = b'<link rel="stylesheet"><lime-list></lime-list>' + gpw_responses.REPORTS_PAGE.replace(
+        b"geru_id=", b"unknown=", 2
+    )
+
+    # when
+    failed_model = next(gpw_parser.parse_reports_page(page))
+
+    # then
+    assert isinstance(failed_model, FailedParsingElementModel)
+    assert failed_model.raw_data.startswith(b"<li ")
+    assert b"unknown=" in failed_model.raw_data
+
+
+def test_failed_parsing_element_exports_row_instead_of_page():
+    # given
+    failed_model = FailedParsingElementModel(page=b"<ul><li>row</li></ul>", start=4, end=16, error="Exception")
+
+    # when
+    values = failed_model.dict()
+    json_values = json.loads(failed_model.json())
+
+    # then
+    assert values == {"start": 4, "end": 16, "error": "Exception", "raw_data": b"<li>row</li>"}
+    assert json_values == {"start": 4, "end": 16, "error": "Exception", "raw_data": "<li>row</li>"}
+
+
+def test_failed_parsing_element_accepts_raw_data():
+    # when
+    failed_model = FailedParsingElementModel(raw_data=b"<li>row</li>", error="Exception")
+
+    # then
+    assert failed_model.raw_data == b"<li>row</li>"
+    assert (failed_model.start, failed_model.end) == (0, 12)
+
+
+def test_parse_reports_page_logs_single_failure_summary_per_page(gpw_parser, caplog):
+    # given
+    page = gpw_responses.REPORTS_PAGE.replace(b"geru_id=", b"unknown=")
+
+    # when
+    list(gpw_parser.parse_reports_page(page))
+
+    # then
+    warnings = [record.getMessage() for record in caplog.records if record.levelname == "WARNING"]
+    assert warnings == ["Failed to parse 20 report rows of a page (ReportIdNotFoundException: 20)."]
+
+
 def test_parse_company_id_properly_parses_data(gpw_parser, company_row):
     # given
     proper_company_id = "PLNFI0600010"
@@ -502,3 +573,120 @@ def test_parse_reports_page_parses_page_properly(gpw_parser):
             type=ReportType.CURRENT,
         ),
     ]
+
+
+@pytest.mark.parametrize(
+    "market, method, page",
+    [
+        (MarketEnum.GPW, "parse_companies_page", gpw_responses.GPW_COMPANIES_LIST_PAGE),
+        (MarketEnum.GPW, "parse_companies_page", gpw_responses.GPW_COMPANIES_LIST_PAGE_MALFORMED),
+        (MarketEnum.NEW_CONNECT, "parse_companies_page", gpw_responses.NEW_CONNECT_COMPANIES_LIST_PAGE),
+        (MarketEnum.GPW, "parse_reports_page", gpw_responses.REPORTS_PAGE),
+        (MarketEnum.GPW, "parse_reports_page", gpw_responses.REPORTS_PAGE_MALFORMED),
+        (MarketEnum.GPW, "parse_stock_quotes_xls", gpw_responses.GPW_STOCK_QUOTATIONS_XLS),
+    ],
+)
+def test_trusted_parser_output_same_as_validated(market, method, page):
+    # given
+    validated_parser = GPWParser(market=market)
+    trusted_parser = GPWParser(market=market, trusted=True)
+
+    # when
+    models = list(getattr(trusted_parser, method)(page))
+
+    # then
+    assert models == list(getattr(validated_parser, method)(page))
+    assert [type(model) for model in models] == [type(model) for model in getattr(validated_parser, method)(page)]
+
+
+def test_trusted_parser_reports_unknown_report_type_as_failed_row():
+    # given
+    page = gpw_responses.REPORTS_PAGE.replace("Bieżący".encode(), b"Nieznany", 1)
+
+    # when
+    reports = list(GPWParser(market=MarketEnum.GPW, trusted=True).parse_reports_page(page))
+
+    # then
+    assert isinstance(reports[0], FailedParsingElementModel)
+    assert reports[0].error == "FailedToParseReportDataException"
+    assert all(isinstance(report, ReportModel) for report in reports[1:])
+
+
+@pytest.mark.parametrize(
+    "page",
+    [
+        gpw_responses.REPORTS_PAGE,
+        gpw_responses.REPORTS_PAGE_MALFORMED,
+        gpw_responses.REPORTS_PAGE.replace(b'class="date"', b'class="when"', 1),
+        gpw_responses.REPORTS_PAGE.replace(b"geru_id=", b"geru=", 1),
+        gpw_responses.REPORTS_PAGE.replace(b"<p>", b"<div>", 1),
+    ],
+)
+@pytest.mark.parametrize("trusted", [False, True])
+def test_single_pass_parser_reports_same_as_bs4(page, trusted):
+    # given
+    bs4_parser = GPWParser(market=MarketEnum.GPW, trusted=trusted)
+    single_pass_parser = GPWParser(market=MarketEnum.GPW, backend=ParserBackend.BS4_SINGLE_PASS, trusted=trusted)
+
+    # when
+    reports = list(single_pass_parser.parse_reports_page(page))
+
+    # then
+    assert reports == list(bs4_parser.parse_reports_page(page))
+
+
+@pytest.mark.parametrize(
+    "href, expected",
+    [
+        ("/espi-ebi-report?geru_id=378511&title=Raport", "378511"),
+        ("espi-ebi-report?title=Raport&geru_id=378511", "378511"),
+        ("?geru_id=37%2B85+11#top", "37+85 11"),
+    ],
+)
+def test_find_report_id_href_parses_properly(href, expected):
+    # when
+    gpw_id = find_report_id_href(href)
+
+    # then
+    assert gpw_id == expected
+
+
+@pytest.fixture
+def stock_quotes_xls_path(tmp_path):
+    path = tmp_path / "stock_quotes.xls"
+    path.write_bytes(gpw_responses.GPW_STOCK_QUOTATIONS_XLS)
+    return path
+
+
+@pytest.mark.parametrize("trusted", [False, True])
+def test_parse_stock_quotes_xls_file_same_as_from_content(stock_quotes_xls_path, trusted):
+    # given
+    gpw_parser = GPWParser(market=MarketEnum.GPW, trusted=trusted)
+
+    # when
+    quotes = list(gpw_parser.parse_stock_quotes_xls_file(stock_quotes_xls_path))
+
+    # then
+    assert len(quotes) == 418
+    assert quotes == list(gpw_parser.parse_stock_quotes_xls(gpw_responses.GPW_STOCK_QUOTATIONS_XLS))
+
+
+def test_parse_stock_quotes_xls_file_memory_stays_under_ceiling(gpw_parser, stock_quotes_xls_path):
+    # given
+    # NOTE: about 320 KiB, nearly all of it decoded cells of the sheet; one-off allocations of the first call
+    # (pydantic, xlrd) are left out by a warm up call.
+    memory_ceiling = 512 * 1024
+    for _ in gpw_parser.parse_stock_quotes_xls_file(stock_quotes_xls_path):
+        pass
+
+    # when
+    tracemalloc.start()
+    try:
+        for _ in gpw_parser.parse_stock_quotes_xls_file(stock_quotes_xls_path):
+            pass
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    # then
+    assert peak < memory_ceiling
@@ -0,0 +1,93 @@
+import pytest
+
+from wse_data.data_scrappers.gpw.company_model import MarketEnum
+from wse_data.data_scrappers.gpw.failed_parsing_element_model import FailedParsingElementModel
+from wse_data.data_scrappers.gpw.gpw_parser import GPWParser
+from wse_data.data_scrappers.gpw.gpw_stream_parser import ReportsStreamParser
+
+from wse_data.tests.data import gpw_responses
+
+
+def _chunks(content, size):
+    return [content[start:][:size] for start in range(0, len(content), size)]
+
+
+@pytest.fixture
+def gpw_parser():
+    return GPWParser(market=MarketEnum.GPW)
+
+
+@pytest.mark.parametrize("chunk_size", [7, 1024, 1_000_000])
+def test_parse_reports_stream_output_same_as_parse_reports_page(gpw_parser, chunk_size):
+    # when
+    reports = list(gpw_parser.parse_reports_stream(_chunks(gpw_responses.REPORTS_PAGE, chunk_size)))
+
+    # then
+    assert reports == list(gpw_parser.parse_reports_page(gpw_responses.REPORTS_PAGE))
+
+
+def test_parse_reports_stream_continues_after_known_parsing_exception(gpw_parser):
+    # given
+    page = gpw_responses.REPORTS_PAGE_MALFORMED.encode()
+
+    # when
+    reports = list(gpw_parser.parse_reports_stream(_chunks(page, 100)))
+    expected_reports = list(gpw_parser.parse_reports_page(page))
+
+    # then
+    assert len(reports) == len(expected_reports)
+    assert isinstance(reports[0], FailedParsingElementModel)
+    assert reports[1:] == expected_reports[1:]
+
+
+def test_parse_reports_stream_returns_entries_count(gpw_parser):
+    # given
+    entries_counts = []
+
+    def consume():
+        entries_counts.append((yield from gpw_parser.parse_reports_stream([gpw_responses.REPORTS_PAGE])))
+
+    # when
+    reports = list(consume())
+
+    # then
+    assert entries_counts == [20]
+    assert len(reports) == 20
+
+
+def test_stream_parser_yields_report_as_soon_as_row_is_closed():
+    # given
+    stream_parser = ReportsStreamParser()
+    last_row_byte = gpw_responses.REPORTS_PAGE.index(b"</li>") + len(b"</li>") - 1
+
+    # when
+    before_row_end = stream_parser.feed_chunk(gpw_responses.REPORTS_PAGE[:last_row_byte])
+    at_row_end = stream_parser.feed_chunk(gpw_responses.REPORTS_PAGE[last_row_byte:][:1])
+
+    # then
+    assert before_row_end == []
+    assert len(at_row_end) == 1
+
+
+def test_stream_parser_counts_no_entries_for_empty_page():
+    # given
+    stream_parser = ReportsStreamParser()
+
+    # when
+    reports = stream_parser.feed_chunk(gpw_responses.REPORTS_EMPTY_PAGE) + stream_parser.finish()
+
+    # then
+    assert reports == []
+    assert stream_parser.entries_count == 0
+
+
+def test_trusted_parse_reports_stream_output_same_as_validated(gpw_parser):
+    # given
+    page = gpw_responses.REPORTS_PAGE_MALFORMED.encode()
+    trusted_parser = GPWParser(market=MarketEnum.GPW, trusted=True)
+
+    # when
+    reports = list(trusted_parser.parse_reports_stream(_chunks(page, 100)))
+
+    # then
+    assert reports == list(gpw_parser.parse_reports_stream(_chunks(page, 100)))
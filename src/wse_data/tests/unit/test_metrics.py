@@ -0,0 +1,132 @@
+from unittest.mock import MagicMock
+
+from wse_data.data_scrappers.gpw.failed_parsing_element_model import FailedParsingElementModel
+from wse_data.metrics import (
+    FAILED_ROWS,
+    PAGE_PARSE_SECONDS,
+    PARSED_ROWS,
+    REQUEST_SECONDS,
+    DataKindEnum,
+    InMemoryMetricsSink,
+    OpenTelemetryMetricsSink,
+    metered_page,
+    prometheus_text,
+    timing_summary,
+)
+
+FAILED_ROW = FailedParsingElementModel(page=b"<li></li>", start=0, end=9, error="ReportDataTagNotFound")
+
+
+def test_in_memory_sink_merges_label_sets_matching_query():
+    # given
+    metrics = InMemoryMetricsSink()
+
+    # when
+    metrics.observe(REQUEST_SECONDS, 0.5, endpoint="reports", market="GPW")
+    metrics.observe(REQUEST_SECONDS, 1.5, endpoint="reports", market="NEW-CONNECT")
+    metrics.observe(REQUEST_SECONDS, 0.25, endpoint="companies", market="GPW")
+
+    # then
+    assert metrics.timing(REQUEST_SECONDS, endpoint="reports").dict() == {"count": 2, "total": 2.0, "max": 1.5}
+    assert metrics.timing(REQUEST_SECONDS).count == 3
+    assert metrics.timing(REQUEST_SECONDS, market="GPW").mean == 0.375
+
+
+def test_prometheus_text_renders_counters_and_summaries():
+    # given
+    metrics = InMemoryMetricsSink()
+    metrics.increment(FAILED_ROWS, 2, kind="reports", market="GPW", error='Bad "row"')
+    metrics.observe(PAGE_PARSE_SECONDS, 0.5, kind="reports", market="GPW")
+    metrics.observe(PAGE_PARSE_SECONDS, 0.25, kind="reports", market="GPW")
+
+    # when
+    text = prometheus_text(metrics)
+
+    # then
+    assert text == (
+        "# TYPE wse_failed_rows_total counter\n"
+        'wse_failed_rows_total{error="Bad \\"row\\"",kind="reports",market="GPW"} 2\n'
+        "# TYPE wse_page_parse_seconds summary\n"
+        'wse_page_parse_seconds_count{kind="reports",market="GPW"} 2\n'
+        'wse_page_parse_seconds_sum{kind="reports",market="GPW"} 0.75\n'
+    )
+
+
+def test_metered_page_counts_rows_and_failures_and_returns_generator_value():
+    # given
+    metrics = InMemoryMetricsSink()
+
+    def page():
+        yield "report"
+        yield FAILED_ROW
+        yield "report"
+        return 3
+
+    # when
+    def consume():
+        return (yield from metered_page(metrics, page(), DataKindEnum.REPORTS, "GPW"))
+
+    consumer = consume()
+    items = []
+    try:
+        while True:
+            items.append(next(consumer))
+    except StopIteration as stop:
+        entries_count = stop.value
+
+    # then
+    assert entries_count == 3
+    assert len(items) == 3
+    assert metrics.counter(PARSED_ROWS, kind="reports", market="GPW") == 2
+    assert metrics.counter(FAILED_ROWS, error="ReportDataTagNotFound") == 1
+    assert metrics.timing(PAGE_PARSE_SECONDS).count == 1
+
+
+def test_metered_page_records_nothing_for_empty_page():
+    # given
+    metrics = InMemoryMetricsSink()
+
+    # when
+    list(metered_page(metrics, [], DataKindEnum.REPORTS, "GPW"))
+
+    # then
+    assert metrics.counters() == {}
+    assert metrics.timings() == {}
+
+
+def test_open_telemetry_sink_ends_span_per_timing_and_passes_metrics_on():
+    # given
+    tracer = MagicMock()
+    inner = InMemoryMetricsSink()
+    metrics = OpenTelemetryMetricsSink(tracer=tracer, sink=inner)
+
+    # when
+    metrics.observe(REQUEST_SECONDS, 0.5, endpoint="reports", market="GPW")
+    metrics.increment(PARSED_ROWS, 20, kind="reports", market="GPW")
+
+    # then
+    name = tracer.start_span.call_args.args[0]
+    kwargs = tracer.start_span.call_args.kwargs
+    end_time = tracer.start_span.return_value.end.call_args.kwargs["end_time"]
+    assert name == REQUEST_SECONDS
+    assert kwargs["attributes"] == {"endpoint": "reports", "market": "GPW"}
+    assert end_time - kwargs["start_time"] == 500_000_000
+    assert inner.timing(REQUEST_SECONDS).count == 1
+    assert inner.counter(PARSED_ROWS) == 20
+
+
+def test_timing_summary_lists_requests_parsing_and_failures():
+    # given
+    metrics = InMemoryMetricsSink()
+    metrics.observe(REQUEST_SECONDS, 0.5, endpoint="reports", market="GPW")
+    metrics.observe(PAGE_PARSE_SECONDS, 0.1, kind="reports", market="GPW")
+    metrics.increment(PARSED_ROWS, 20, kind="reports", market="GPW")
+    metrics.increment(FAILED_ROWS, 1, kind="reports", market="GPW", error="ReportDataTagNotFound")
+
+    # when
+    summary = timing_summary(metrics)
+
+    # then
+    assert "reports GPW: 1 requests, 0.50s total" in summary
+    assert "reports GPW: parsed 20 rows in 1 pages, 0.10s, 200 rows/s." in summary
+    assert "reports GPW: 1 rows failed with ReportDataTagNotFound." in summary
@@ -0,0 +1,119 @@
+import csv
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from unittest.mock import patch
+
+import pytest
+
+from wse_data.data_scrappers.gpw.report_model import ReportCategory, ReportModel, ReportType
+from wse_data.data_scrappers.gpw.stock_quotes_model import StockQuotesModel
+from wse_data.output import OutputException, OutputFormatEnum, open_rows_writer
+
+QUOTES = [
+    StockQuotesModel(
+        date=date(2022, 10, 4),
+        company_name="11BIT",
+        company_isin="PL11BTS00015",
+        opening=Decimal("178.4"),
+        closing=Decimal("180.2"),
+        max=Decimal("181"),
+        min=Decimal("177.6"),
+        volume=10_400,
+    ),
+    StockQuotesModel(
+        date=date(2022, 10, 4),
+        company_name="AMBRA",
+        company_isin="PLAMBRA00013",
+        opening=Decimal("19.9"),
+        closing=Decimal("20.1"),
+        max=Decimal("20.2"),
+        min=Decimal("19.8"),
+        volume=2_150,
+    ),
+]
+REPORT = ReportModel(
+    gpw_id="1",
+    company_isin="PL1",
+    name="report 1",
+    summary="summary, with a comma",
+    datetime=datetime(2022, 2, 23, 11, 12, 43),
+    category=ReportCategory.ESPI,
+    type=ReportType.CURRENT,
+)
+
+
+def test_jsonl_writer_writes_line_per_model(tmp_path):
+    # given
+    path = tmp_path / "quotes.jsonl"
+
+    # when
+    with open_rows_writer(OutputFormatEnum.JSONL, StockQuotesModel, path) as writer:
+        for quote in QUOTES:
+            writer.write(quote)
+
+    # then
+    rows = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [StockQuotesModel.parse_obj(row) for row in rows] == QUOTES
+
+
+def test_csv_writer_writes_header_and_extra_columns(tmp_path):
+    # given
+    path = tmp_path / "reports.csv"
+
+    # when
+    with open_rows_writer(OutputFormatEnum.CSV, ReportModel, path, extra_columns=("market",)) as writer:
+        writer.write(REPORT, "GPW")
+
+    # then
+    with path.open(newline="") as file:
+        rows = list(csv.DictReader(file))
+    assert rows == [
+        {
+            "market": "GPW",
+            "gpw_id": "1",
+            "company_isin": "PL1",
+            "name": "report 1",
+            "summary": "summary, with a comma",
+            "datetime": "2022-02-23T11:12:43",
+            "category": "ESPI",
+            "type": "Bieżący",
+        }
+    ]
+
+
+def test_parquet_writer_writes_rows_in_batches(tmp_path):
+    # given
+    pyarrow_parquet = pytest.importorskip("pyarrow.parquet")
+    path = tmp_path / "quotes.parquet"
+
+    # when
+    with patch("wse_data.output.PARQUET_BATCH_ROWS", 2):
+        with open_rows_writer(OutputFormatEnum.PARQUET, StockQuotesModel, path) as writer:
+            for quote in QUOTES * 3:
+                writer.write(quote)
+
+    # then
+    parquet_file = pyarrow_parquet.ParquetFile(path)
+    assert parquet_file.metadata.num_row_groups == 3
+    table = parquet_file.read()
+    assert table.column_names == ["date", "company_name", "company_isin", "opening", "closing", "max", "min", "volume"]
+    assert table.column("closing").to_pylist() == [180.2, 20.1] * 3
+    assert table.column("date").to_pylist() == [date(2022, 10, 4)] * 6
+
+
+@pytest.mark.parametrize("output_format", [OutputFormatEnum.TEXT, OutputFormatEnum.JSONL, OutputFormatEnum.CSV])
+def test_writer_rejects_models_of_other_type(tmp_path, output_format):
+    # given
+    path = tmp_path / "reports"
+
+    # when, then
+    with open_rows_writer(output_format, ReportModel, path) as writer:
+        with pytest.raises(OutputException):
+            writer.write(QUOTES[0])
+
+
+def test_parquet_writer_without_path_raises():
+    # when / then
+    with pytest.raises(OutputException):
+        open_rows_writer(OutputFormatEnum.PARQUET, StockQuotesModel)
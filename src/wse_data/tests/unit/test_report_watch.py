@@ -0,0 +1,206 @@
+import asyncio
+from datetime import datetime, time
+from urllib.parse import parse_qs
+
+import httpx
+import pytest
+
+from wse_data.data_scrappers.gpw.async_gpw_client import AsyncGPWClient
+from wse_data.data_scrappers.gpw.company_model import MarketEnum
+from wse_data.data_scrappers.gpw.gpw_client import GPWClient
+from wse_data.data_scrappers.gpw.gpw_parser import GPWParser
+from wse_data.report_watch import (
+    WARSAW_TZ,
+    AsyncReportWatcher,
+    BoundedIdSet,
+    DetectionLatencyStats,
+    PollScheduleModel,
+    ReportWatcher,
+)
+
+from wse_data.tests.data.gpw_responses import REPORTS_EMPTY_PAGE, REPORTS_PAGE
+
+FIRST_ENTRY = REPORTS_PAGE[: REPORTS_PAGE.index(b"</li>") + len(b"</li>")]
+NO_WAIT_SCHEDULE = PollScheduleModel(session_interval=0, off_session_interval=0, weekend_interval=0)
+
+
+def _report_entry(gpw_id, published_at):
+    return FIRST_ENTRY.replace(b"404679", gpw_id.encode()).replace(
+        b"23-09-2022 17:01:26", published_at.strftime("%d-%m-%Y %H:%M:%S").encode()
+    )
+
+
+def _single_entry_pages_response(polls):
+    """Every poll starts at offset 0 and sees its list of entries, one entry per page."""
+    current_entries = []
+
+    def response(request):
+        offset = int(parse_qs(request.content.decode())["offset"][0])
+        if offset == 0:
+            current_entries[:] = polls.pop(0)
+        page = current_entries[offset] if offset < len(current_entries) else REPORTS_EMPTY_PAGE
+        return httpx.Response(200, content=page)
+
+    return response
+
+
+@pytest.fixture
+def parser():
+    return GPWParser(market=MarketEnum.GPW)
+
+
+@pytest.mark.parametrize(
+    "now, interval",
+    [
+        (datetime(2022, 10, 4, 10, 0, tzinfo=WARSAW_TZ), 5),
+        (datetime(2022, 10, 4, 23, 0, tzinfo=WARSAW_TZ), 60),
+        (datetime(2022, 10, 8, 10, 0, tzinfo=WARSAW_TZ), 600),
+    ],
+    ids=["session", "night", "weekend"],
+)
+def test_poll_schedule_interval(now, interval):
+    assert PollScheduleModel().interval(now) == interval
+
+
+def test_poll_schedule_uses_warsaw_time():
+    # given
+    schedule = PollScheduleModel(session_start=time(9, 0), session_end=time(17, 0))
+
+    # when, then
+    assert schedule.interval(datetime.fromisoformat("2022-10-04T07:30:00+00:00")) == schedule.session_interval
+
+
+def test_bounded_id_set_forgets_oldest_ids():
+    # given
+    ids = BoundedIdSet(max_size=2)
+
+    # when
+    added = [ids.add("1"), ids.add("2"), ids.add("1"), ids.add("3")]
+
+    # then
+    assert added == [True, True, False, True]
+    assert "1" not in ids
+    assert len(ids) == 2
+
+
+def test_detection_latency_stats_snapshot():
+    # given
+    stats = DetectionLatencyStats()
+
+    # when
+    for latency in [3.0, 1.0, 2.0]:
+        stats.record(latency)
+
+    # then
+    snapshot = stats.snapshot()
+    assert (snapshot.count, snapshot.last, snapshot.mean, snapshot.max, snapshot.p95) == (3, 2.0, 2.0, 3.0, 3.0)
+
+
+def test_watcher_first_poll_only_primes_seen_reports(parser, respx_mock):
+    # given
+    client = GPWClient(market=MarketEnum.GPW)
+    respx_mock.post(client.config.reports_url).mock(httpx.Response(200, content=REPORTS_PAGE))
+    watcher = ReportWatcher(client, parser)
+
+    # when
+    first_poll = watcher.poll()
+    second_poll = watcher.poll()
+
+    # then
+    assert first_poll == second_poll == []
+    assert respx_mock.calls.call_count == 2
+
+
+def test_watcher_yields_new_reports_oldest_first_and_records_latency(parser, respx_mock):
+    # given
+    client = GPWClient(market=MarketEnum.GPW)
+    now = datetime.now(WARSAW_TZ).replace(tzinfo=None, microsecond=0)
+    old_entry = _report_entry("1", datetime(2022, 9, 23, 17, 1, 26))
+    new_entry = _report_entry("2", now)
+    newest_entry = _report_entry("3", now)
+    respx_mock.post(client.config.reports_url).mock(
+        side_effect=_single_entry_pages_response([[old_entry], [newest_entry, new_entry, old_entry]])
+    )
+    watcher = ReportWatcher(client, parser, page_size=1)
+
+    # when
+    watcher.poll()
+    new_reports = watcher.poll()
+
+    # then
+    assert [report.gpw_id for report in new_reports] == ["2", "3"]
+    latency = watcher.latency.snapshot()
+    assert latency.count == 2
+    assert 0 <= latency.max < 60
+
+
+def test_watcher_checks_next_page_when_full_page_has_failed_row(parser, respx_mock):
+    # given
+    client = GPWClient(market=MarketEnum.GPW)
+    now = datetime.now(WARSAW_TZ).replace(tzinfo=None, microsecond=0)
+    old_entry = _report_entry("1", datetime(2022, 9, 23, 17, 1, 26))
+    failed_entry = _report_entry("2", now).replace(b"geru_id=", b"unknown=")
+    new_entry = _report_entry("3", now)
+    newest_entry = _report_entry("4", now)
+    respx_mock.post(client.config.reports_url).mock(
+        side_effect=[
+            httpx.Response(200, content=old_entry),
+            httpx.Response(200, content=newest_entry + failed_entry),
+            httpx.Response(200, content=new_entry + old_entry),
+        ]
+    )
+    watcher = ReportWatcher(client, parser, page_size=2)
+
+    # when
+    watcher.poll()
+    new_reports = watcher.poll()
+
+    # then
+    assert [report.gpw_id for report in new_reports] == ["3", "4"]
+
+
+def test_watcher_run_passes_reports_to_callback_until_stopped(parser, respx_mock):
+    # given
+    client = GPWClient(market=MarketEnum.GPW)
+    respx_mock.post(client.config.reports_url).mock(
+        side_effect=[
+            httpx.Response(200, content=REPORTS_PAGE),
+            httpx.Response(200, content=_report_entry("1", datetime(2022, 9, 24)) + REPORTS_PAGE),
+        ]
+    )
+    watcher = ReportWatcher(client, parser, schedule=NO_WAIT_SCHEDULE)
+    received = []
+
+    def callback(report):
+        received.append(report.gpw_id)
+        watcher.stop()
+
+    # when
+    watcher.run(callback)
+
+    # then
+    assert received == ["1"]
+
+
+def test_async_watcher_yields_new_reports(parser, respx_mock):
+    # given
+    client = AsyncGPWClient(market=MarketEnum.GPW)
+    respx_mock.post(client.config.reports_url).mock(
+        side_effect=[
+            httpx.Response(200, content=REPORTS_PAGE),
+            httpx.Response(200, content=REPORTS_PAGE),
+            httpx.Response(200, content=_report_entry("1", datetime(2022, 9, 24)) + REPORTS_PAGE),
+        ]
+    )
+    watcher = AsyncReportWatcher(client, parser, schedule=NO_WAIT_SCHEDULE)
+
+    async def first_new_report():
+        async for report in watcher:
+            watcher.stop()
+            return report
+
+    # when
+    report = asyncio.run(first_new_report())
+
+    # then
+    assert report.gpw_id == "1"
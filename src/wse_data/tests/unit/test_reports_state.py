@@ -0,0 +1,73 @@
+from datetime import datetime
+
+import pytest
+
+from wse_data.data_scrappers.gpw.report_model import ReportCategory, ReportModel, ReportType
+from wse_data.reports_state import ReportsHighWaterMarkModel, ReportsState
+
+
+def _report(gpw_id, report_datetime):
+    return ReportModel(
+        gpw_id=gpw_id,
+        company_isin="PL11BTS00015",
+        name="11 BIT STUDIOS SPÓŁKA AKCYJNA (PL11BTS00015)",
+        summary="summary",
+        datetime=report_datetime,
+        category=ReportCategory.ESPI,
+        type=ReportType.CURRENT,
+    )
+
+
+@pytest.fixture
+def mark():
+    return ReportsHighWaterMarkModel(datetime=datetime(2022, 9, 23, 17, 1, 26), gpw_ids={"2"})
+
+
+def test_is_seen_compares_ids_within_overlap_and_datetime_before_it(mark):
+    assert mark.is_seen(_report("1", datetime(2022, 9, 23, 16, 0, 0)), overlap=3600)
+    assert mark.is_seen(_report("2", datetime(2022, 9, 23, 17, 1, 26)), overlap=3600)
+    assert not mark.is_seen(_report("3", datetime(2022, 9, 23, 17, 0, 0)), overlap=3600)
+    assert not mark.is_seen(_report("4", datetime(2022, 9, 23, 17, 2, 0)), overlap=3600)
+    assert mark.is_seen(_report("3", datetime(2022, 9, 23, 17, 0, 0)), overlap=0)
+
+
+def test_advance_keeps_ids_within_overlap_of_newest_datetime(mark):
+    # when
+    late_mark = mark.advance(_report("3", datetime(2022, 9, 23, 17, 0, 0)), overlap=3600)
+    newer_mark = late_mark.advance(_report("4", datetime(2022, 9, 23, 18, 0, 30)), overlap=3600)
+
+    # then
+    assert late_mark.datetime == mark.datetime
+    assert set(late_mark.gpw_ids) == {"2", "3"}
+    assert newer_mark == ReportsHighWaterMarkModel(
+        datetime=datetime(2022, 9, 23, 18, 0, 30),
+        gpw_ids={"2": datetime(2022, 9, 23, 17, 1, 26), "4": datetime(2022, 9, 23, 18, 0, 30)},
+    )
+    assert newer_mark.advance(_report("1", datetime(2022, 9, 1)), overlap=3600) == newer_mark
+
+
+def test_mark_saved_with_ids_at_mark_datetime_is_loaded(tmp_path):
+    # given
+    path = tmp_path / "reports.json"
+    path.write_text('{"GPW:": {"datetime": "2022-09-23T17:01:26", "gpw_ids": ["2"]}}')
+
+    # when
+    mark = ReportsState(path).load("GPW:")
+
+    # then
+    assert mark.gpw_ids == {"2": datetime(2022, 9, 23, 17, 1, 26)}
+
+
+def test_state_saves_marks_per_key(tmp_path, mark):
+    # given
+    state = ReportsState(tmp_path / "state" / "reports.json")
+
+    # when
+    state.save("GPW:", mark)
+    state.save("NEW_CONNECT:11 bit", mark.advance(_report("3", datetime(2022, 9, 24))))
+
+    # then
+    assert ReportsState(tmp_path / "state" / "reports.json").load("GPW:") == mark
+    assert set(state.load("NEW_CONNECT:11 bit").gpw_ids) == {"3"}
+    assert state.load("GPW:other") is None
+    assert list((tmp_path / "state").iterdir()) == [tmp_path / "state" / "reports.json"]
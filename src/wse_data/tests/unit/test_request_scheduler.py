@@ -0,0 +1,244 @@
+import asyncio
+
+import httpx
+import pytest
+
+from wse_data.data_scrappers.gpw import request_scheduler
+from wse_data.data_scrappers.gpw.company_model import MarketEnum
+from wse_data.data_scrappers.gpw.gpw_client import GPWClient
+from wse_data.data_scrappers.gpw.request_scheduler import (
+    CircuitBreaker,
+    CircuitOpenException,
+    RequestScheduler,
+    SchedulerPolicy,
+    TokenBucket,
+)
+
+URL = "https://www.gpw.pl/ajaxindex.php"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(request_scheduler.time, "sleep", sleeps.append)
+    return sleeps
+
+
+@pytest.fixture
+def scheduler():
+    return RequestScheduler(SchedulerPolicy(rate=None, backoff_base=0, max_attempts=3))
+
+
+def test_token_bucket_allows_burst_then_spaces_requests():
+    # given
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2, burst=2, clock=clock)
+
+    # when
+    delays = [bucket.reserve() for _ in range(4)]
+    clock.now = 10
+    delay_after_refill = bucket.reserve()
+
+    # then
+    assert delays == [0, 0, 0.5, 1.0]
+    assert delay_after_refill == 0
+
+
+def test_circuit_breaker_opens_and_lets_single_trial_after_timeout():
+    # given
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30, clock=clock)
+    breaker.record_failure()
+    breaker.record_failure()
+
+    # when, then
+    with pytest.raises(CircuitOpenException):
+        breaker.before_request()
+    clock.now = 31
+    breaker.before_request()
+    with pytest.raises(CircuitOpenException):
+        breaker.before_request()
+    breaker.record_success()
+    breaker.before_request()
+    assert not breaker.is_open
+
+
+def test_circuit_breaker_reopens_after_failed_trial():
+    # given
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=5, reset_timeout=30, clock=clock)
+    for _ in range(5):
+        breaker.record_failure()
+    clock.now = 31
+    breaker.before_request()
+
+    # when
+    breaker.record_failure()
+
+    # then
+    with pytest.raises(CircuitOpenException):
+        breaker.before_request()
+
+
+def test_run_retries_transient_status(scheduler, sleeps, respx_mock):
+    # given
+    route = respx_mock.get(URL)
+    route.side_effect = [httpx.Response(503), httpx.Response(200, content=b"page")]
+
+    # when
+    response = scheduler.run(URL, lambda: httpx.get(URL))
+
+    # then
+    assert response.content == b"page"
+    assert route.call_count == 2
+
+
+def test_run_returns_last_transient_response_when_attempts_run_out(scheduler, sleeps, respx_mock):
+    # given
+    route = respx_mock.get(URL).mock(httpx.Response(500))
+
+    # when
+    response = scheduler.run(URL, lambda: httpx.get(URL))
+
+    # then
+    assert response.status_code == 500
+    assert route.call_count == 3
+
+
+def test_run_raises_last_transport_error(scheduler, sleeps, respx_mock):
+    # given
+    route = respx_mock.get(URL).mock(side_effect=httpx.ConnectTimeout)
+
+    # when, then
+    with pytest.raises(httpx.ConnectTimeout):
+        scheduler.run(URL, lambda: httpx.get(URL))
+    assert route.call_count == 3
+
+
+def test_run_honours_retry_after(scheduler, sleeps, respx_mock):
+    # given
+    respx_mock.get(URL).side_effect = [httpx.Response(429, headers={"Retry-After": "7"}), httpx.Response(200)]
+
+    # when
+    scheduler.run(URL, lambda: httpx.get(URL))
+
+    # then
+    assert 7 in sleeps
+
+
+def test_run_does_not_retry_client_errors(scheduler, sleeps, respx_mock):
+    # given
+    route = respx_mock.get(URL).mock(httpx.Response(404))
+
+    # when
+    response = scheduler.run(URL, lambda: httpx.get(URL))
+
+    # then
+    assert response.status_code == 404
+    assert route.call_count == 1
+
+
+def test_run_stops_requests_to_host_when_circuit_is_open(sleeps, respx_mock):
+    # given
+    scheduler = RequestScheduler(SchedulerPolicy(rate=None, backoff_base=0, max_attempts=2, failure_threshold=2))
+    route = respx_mock.get(URL).mock(httpx.Response(502))
+    scheduler.run(URL, lambda: httpx.get(URL))
+
+    # when, then
+    with pytest.raises(CircuitOpenException):
+        scheduler.run(URL, lambda: httpx.get(URL))
+    assert route.call_count == 2
+
+
+def _scheduler_with_half_open_circuit(respx_mock):
+    # NOTE: a single failure opens the circuit and the next request is its trial right away.
+    scheduler = RequestScheduler(
+        SchedulerPolicy(rate=None, backoff_base=0, max_attempts=1, failure_threshold=1, reset_timeout=0)
+    )
+    respx_mock.get(URL).side_effect = [httpx.ConnectError("refused"), httpx.Response(200, content=b"page")]
+    with pytest.raises(httpx.ConnectError):
+        scheduler.run(URL, lambda: httpx.get(URL))
+    return scheduler
+
+
+def _failing_attempt():
+    raise KeyError("content-type")
+
+
+def test_run_lets_new_trial_after_trial_raised_unexpected_error(sleeps, respx_mock):
+    # given
+    scheduler = _scheduler_with_half_open_circuit(respx_mock)
+    with pytest.raises(KeyError):
+        scheduler.run(URL, _failing_attempt)
+
+    # when
+    response = scheduler.run(URL, lambda: httpx.get(URL))
+
+    # then
+    assert response.content == b"page"
+    assert not scheduler.breaker("www.gpw.pl").is_open
+
+
+def test_arun_lets_new_trial_after_trial_was_cancelled(sleeps, respx_mock):
+    # given
+    scheduler = _scheduler_with_half_open_circuit(respx_mock)
+
+    async def cancelled_trial_then_request():
+        async with httpx.AsyncClient() as client:
+            never_done = asyncio.get_running_loop().create_future()
+
+            async def pending_attempt():
+                await never_done
+
+            trial = asyncio.create_task(scheduler.arun(URL, pending_attempt))
+            await asyncio.sleep(0)
+            trial.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await trial
+            return await scheduler.arun(URL, lambda: client.get(URL))
+
+    # when
+    response = asyncio.run(cancelled_trial_then_request())
+
+    # then
+    assert response.content == b"page"
+    assert not scheduler.breaker("www.gpw.pl").is_open
+
+
+def test_arun_retries_transport_errors(scheduler, respx_mock):
+    # given
+    route = respx_mock.get(URL)
+    route.side_effect = [httpx.ReadTimeout("timeout"), httpx.Response(200, content=b"page")]
+
+    async def send():
+        async with httpx.AsyncClient() as client:
+            return await scheduler.arun(URL, lambda: client.get(URL))
+
+    # when
+    response = asyncio.run(send())
+
+    # then
+    assert response.content == b"page"
+    assert route.call_count == 2
+
+
+def test_client_retries_through_scheduler(scheduler, sleeps, respx_mock):
+    # given
+    client = GPWClient(market=MarketEnum.GPW, scheduler=scheduler)
+    route = respx_mock.post(client.config.reports_url)
+    route.side_effect = [httpx.Response(500), httpx.Response(200, content=b"<li>")]
+
+    # when
+    response = client.reports_page()
+
+    # then
+    assert response.content == b"<li>"
+    assert route.call_count == 2
@@ -0,0 +1,132 @@
+import os
+import time
+from pathlib import Path
+
+import httpx
+import pytest
+
+from wse_data.data_scrappers.gpw.response_cache import (
+    CacheEntry,
+    DiskResponseCache,
+    InMemoryResponseCache,
+    cache_key,
+)
+
+
+def _entry(content=b"content", ttl=60.0, stored_at=None, headers=None):
+    return CacheEntry(
+        url="https://www.gpw.pl/ajaxindex.php",
+        status_code=200,
+        headers=headers or {"content-type": "text/html"},
+        stored_at=stored_at if stored_at is not None else time.time(),
+        ttl=ttl,
+        content=content,
+    )
+
+
+@pytest.fixture
+def disk_cache(tmp_path):
+    return DiskResponseCache(directory=tmp_path, max_size=1000)
+
+
+def test_cache_key_does_not_depend_on_params_order():
+    assert cache_key("POST", "https://a", {"a": "1", "b": "2"}) == cache_key("post", "https://a", {"b": "2", "a": "1"})
+    assert cache_key("POST", "https://a", {"a": "1"}) != cache_key("POST", "https://a", {"a": "2"})
+
+
+def test_cache_entry_freshness():
+    assert _entry(ttl=60.0).is_fresh()
+    assert not _entry(ttl=60.0, stored_at=time.time() - 61).is_fresh()
+    assert _entry(ttl=None, stored_at=0).is_fresh()
+
+
+def test_cache_entry_from_response_skips_encoding_headers():
+    # given
+    response = httpx.Response(
+        200,
+        headers={"content-encoding": "gzip", "etag": '"abc"'},
+        request=httpx.Request("GET", "https://www.gpw.pl"),
+    )
+
+    # when
+    entry = CacheEntry.from_response(response, ttl=None, content=b"decoded")
+
+    # then
+    assert "content-encoding" not in entry.headers
+    assert entry.conditional_headers() == {"If-None-Match": '"abc"'}
+    assert entry.to_response(response.request).content == b"decoded"
+
+
+def test_disk_cache_returns_stored_entry(disk_cache):
+    # given
+    entry = _entry(content=b"\x00binary\ncontent")
+
+    # when
+    disk_cache.set("key", entry)
+
+    # then
+    assert disk_cache.get("key") == entry
+    assert disk_cache.get("missing") is None
+
+
+def test_disk_cache_evicts_least_recently_used_entries(disk_cache):
+    # given
+    disk_cache.set("first", _entry(content=b"x" * 300))
+    disk_cache.set("second", _entry(content=b"x" * 300))
+    os.utime(disk_cache._path("first"), (0, 0))
+    os.utime(disk_cache._path("second"), (1, 1))
+    disk_cache.get("first")
+
+    # when
+    disk_cache.set("third", _entry(content=b"x" * 300))
+
+    # then
+    assert disk_cache.get("second") is None
+    assert disk_cache.get("first") is not None
+    assert disk_cache.get("third") is not None
+
+
+def test_disk_cache_reopened_evicts_by_access_time_without_scanning_directory(tmp_path, monkeypatch):
+    # given
+    disk_cache = DiskResponseCache(directory=tmp_path, max_size=1000)
+    disk_cache.set("first", _entry(content=b"x" * 300))
+    disk_cache.set("second", _entry(content=b"x" * 300))
+    os.utime(disk_cache._path("first"), (1, 1))
+    os.utime(disk_cache._path("second"), (0, 0))
+    reopened_cache = DiskResponseCache(directory=tmp_path, max_size=1000)
+    monkeypatch.setattr(Path, "glob", lambda *args: pytest.fail("cache directory scanned"))
+
+    # when
+    reopened_cache.set("third", _entry(content=b"x" * 300))
+
+    # then
+    assert not reopened_cache._path("second").exists()
+    assert reopened_cache.get("first") is not None
+    assert reopened_cache.get("third") is not None
+
+
+def test_disk_cache_drops_corrupted_entry(disk_cache):
+    # given
+    disk_cache._path("key").write_bytes(b"not json\ncontent")
+
+    # when
+    entry = disk_cache.get("key")
+
+    # then
+    assert entry is None
+    assert not disk_cache._path("key").exists()
+
+
+def test_in_memory_cache_evicts_least_recently_used_entries():
+    # given
+    cache = InMemoryResponseCache(max_entries=2)
+    cache.set("first", _entry())
+    cache.set("second", _entry())
+    cache.get("first")
+
+    # when
+    cache.set("third", _entry())
+
+    # then
+    assert cache.get("second") is None
+    assert cache.get("first") is not None
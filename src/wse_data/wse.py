@@ -1,18 +1,43 @@
+import functools
 import logging
-from datetime import date
-from typing import Iterator, Optional, Union
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import closing
+from datetime import date, timedelta
+from enum import Enum
+from pathlib import Path
+from typing import Any, Callable, Generator, Iterable, Iterator, Optional, TypeVar, Union
 
+import httpx
+
+from wse_data.concurrency import interleave, ordered_map
 from wse_data.data_scrappers.gpw.company_model import CompanyModel, MarketEnum
 from wse_data.data_scrappers.gpw.failed_parsing_element_model import (
     FailedParsingElementModel,
 )
-from wse_data.data_scrappers.gpw.gpw_client import GPWClient
-from wse_data.data_scrappers.gpw.gpw_parser import GPWParser, EmptyPageException
+from wse_data.data_scrappers.gpw.gpw_client import GPWClient, REPORTS_PAGE_SIZE
+from wse_data.data_scrappers.gpw.gpw_parser import GPWParser, EmptyPageException, ParserBackend
 from wse_data.data_scrappers.gpw.report_model import ReportModel
+from wse_data.data_scrappers.gpw.request_scheduler import RequestScheduler
+from wse_data.data_scrappers.gpw.response_cache import CachePolicy, ResponseCache
 from wse_data.data_scrappers.gpw.stock_quotes_model import StockQuotesModel
+from wse_data.defaults import NEW_REPORTS_OVERLAP, REPORTS_DAYS_WORKERS, STOCK_QUOTES_WORKERS
+from wse_data.metrics import DataKindEnum, MetricsSink, count_parsed_rows, metered_page, record_parsed_page
+from wse_data.report_watch import PollScheduleModel, ReportWatcher
+from wse_data.reports_state import ReportsHighWaterMarkModel, ReportsState
 
 logger = logging.getLogger(__name__)
 
+STOCK_QUOTES_TEMP_PREFIX = "wse-data-stock-quotes-"
+# Downloaded pages waiting for a parsing process, per process.
+PARSE_QUEUE_PAGES = 2
+
+T = TypeVar("T")
+# Items of a page parsed in a process and seconds it took, None for an empty page.
+ParsedPage = Optional[tuple[list[T], float]]
+
 
 class WSEException(Exception):
     pass
@@ -26,62 +51,475 @@ class UnknownMarketException(Exception):
     pass
 
 
+class StockQuotesFrameFormat(str, Enum):
+    NUMPY = "numpy"
+    ARROW = "arrow"
+
+
 class WSE:
     _gpw_client: GPWClient
     _new_connect_client: GPWClient
     _gpw_parser: GPWParser
     _new_connect_parser: GPWParser
+    _metrics: Optional[MetricsSink]
 
-    def __init__(self) -> None:
-        self._gpw_client = GPWClient(market=MarketEnum.GPW)
-        self._new_connect_client = GPWClient(market=MarketEnum.NEW_CONNECT)
-        self._gpw_parser = GPWParser(market=MarketEnum.GPW)
-        self._new_connect_parser = GPWParser(market=MarketEnum.NEW_CONNECT)
+    def __init__(
+        self,
+        cache: Optional[ResponseCache] = None,
+        cache_policy: Optional[CachePolicy] = None,
+        parser_backend: ParserBackend = ParserBackend.BS4,
+        scheduler: Optional[RequestScheduler] = None,
+        metrics: Optional[MetricsSink] = None,
+        trusted: bool = False,
+    ) -> None:
+        """
+        With `metrics` requests, downloaded bytes, fetched pages, page parse times and parsed and failed rows are
+        reported to that sink, see `wse_data.metrics`. With `trusted` parsed rows are turned into models without
+        pydantic validation, which makes bulk loads cheaper, see `GPWParser`.
+        """
+        self._gpw_client = GPWClient(
+            market=MarketEnum.GPW, cache=cache, cache_policy=cache_policy, scheduler=scheduler, metrics=metrics
+        )
+        self._new_connect_client = GPWClient(
+            market=MarketEnum.NEW_CONNECT, cache=cache, cache_policy=cache_policy, scheduler=scheduler, metrics=metrics
+        )
+        self._metrics = metrics
+        self._gpw_parser = GPWParser(market=MarketEnum.GPW, backend=parser_backend, trusted=trusted)
+        self._new_connect_parser = GPWParser(market=MarketEnum.NEW_CONNECT, backend=parser_backend, trusted=trusted)
 
     def get_companies(
-        self, market: MarketEnum, search: str = ""
+        self, market: MarketEnum, search: str = "", concurrency: int = 1, parse_workers: int = 0
     ) -> Iterator[Union[CompanyModel, FailedParsingElementModel]]:
-        if market == MarketEnum.GPW:
-            client = self._gpw_client
-            parser = self._gpw_parser
-        elif market == MarketEnum.NEW_CONNECT:
-            client = self._new_connect_client
-            parser = self._new_connect_parser
-        else:
-            raise UnknownMarketException(f"Unknown market: {market}.")
-
-        for response_page in client.companies_list(search=search):
+        """With `parse_workers` > 0 pages are parsed in that many processes while next pages are downloaded."""
+        client, parser = self._get_client_and_parser(market)
+        if parse_workers > 0:
+            yield from self._parse_pages_in_processes(
+                lambda: client.companies_list(search=search, concurrency=concurrency),
+                functools.partial(_parse_companies_page, market, parser.backend, parser.trusted),
+                parse_workers,
+                DataKindEnum.COMPANIES,
+                market,
+            )
+            return
+        for response_page in client.companies_list(search=search, concurrency=concurrency):
             try:
-                yield from parser.parse_companies_page(response_page.content)
+                yield from self._metered_page(
+                    parser.parse_companies_page(response_page.content), DataKindEnum.COMPANIES, market
+                )
             except EmptyPageException:
                 break
 
+    def get_companies_by_market(
+        self, markets: Iterable[MarketEnum] = tuple(MarketEnum), search: str = "", concurrency: int = 1
+    ) -> Generator[tuple[MarketEnum, Union[CompanyModel, FailedParsingElementModel]], None, None]:
+        """Companies of all `markets`, fetched in parallel and yielded as they arrive, tagged by market."""
+        markets = list(markets)
+        companies = interleave(
+            [
+                functools.partial(self.get_companies, market=market, search=search, concurrency=concurrency)
+                for market in markets
+            ]
+        )
+        with closing(companies):
+            for index, company in companies:
+                yield markets[index], company
+
     # TODO: separate markets?
     def get_reports(
         self,
         market: MarketEnum,
         search: str = "",
         date_: Optional[date] = None,
-    ) -> Iterator[Union[ReportModel, FailedParsingElementModel]]:
-        if market == MarketEnum.GPW:
-            client = self._gpw_client
-            parser = self._gpw_parser
-        elif market == MarketEnum.NEW_CONNECT:
-            client = self._new_connect_client
-            parser = self._new_connect_parser
-        else:
-            raise UnknownMarketException(f"Unknown market: {market}.")
+        page_size: int = REPORTS_PAGE_SIZE,
+        prefetch: int = 0,
+        stream: bool = False,
+        offset: int = 0,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+        workers: int = REPORTS_DAYS_WORKERS,
+        parse_workers: int = 0,
+    ) -> Generator[Union[ReportModel, FailedParsingElementModel], None, None]:
+        """
+        With `stream` pages are parsed while being downloaded and every report is yielded as soon as its entry is
+        complete. Streaming fetches pages one by one, so `prefetch` is ignored. `offset` skips that many reports.
+        With `parse_workers` > 0 pages are parsed in that many processes while next pages are downloaded.
 
-        for report_page in client.reports_list(search=search, for_date=date_):
+        With `date_from` (and optionally `date_to`, default today) reports of every day in the range are fetched
+        separately, `workers` days at once, and yielded newest first without duplicates; `parse_workers` isn't
+        supported then.
+        """
+        client, parser = self._get_client_and_parser(market)
+        if date_from is not None or date_to is not None:
+            if date_from is None:
+                raise DateRangeException("date_to requires date_from.")
+            if date_ is not None or stream or offset or parse_workers:
+                raise DateRangeException("Date range can't be used with date_, stream, offset or parse_workers.")
+            days = calendar_days(date_from, date_to or date.today())
+            yield from self._get_reports_days(market, search, days[::-1], page_size, prefetch, workers)
+            return
+        if stream:
+            yield from self._stream_reports(market, search, date_, page_size, offset)
+            return
+        if parse_workers > 0:
+            yield from self._parse_pages_in_processes(
+                lambda: client.reports_list(
+                    search=search, for_date=date_, page_size=page_size, prefetch=prefetch, offset=offset
+                ),
+                functools.partial(_parse_reports_page, market, parser.backend, parser.trusted),
+                parse_workers,
+                DataKindEnum.REPORTS,
+                market,
+            )
+            return
+        report_pages = client.reports_list(
+            search=search, for_date=date_, page_size=page_size, prefetch=prefetch, offset=offset
+        )
+        for report_page in report_pages:
             try:
-                yield from parser.parse_reports_page(report_page.content)
+                yield from self._metered_page(
+                    parser.parse_reports_page(report_page.content), DataKindEnum.REPORTS, market
+                )
             except EmptyPageException:
                 break
 
+    def get_reports_by_market(
+        self,
+        markets: Iterable[MarketEnum] = tuple(MarketEnum),
+        search: str = "",
+        date_: Optional[date] = None,
+        page_size: int = REPORTS_PAGE_SIZE,
+        prefetch: int = 0,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+    ) -> Generator[tuple[MarketEnum, Union[ReportModel, FailedParsingElementModel]], None, None]:
+        """Reports of all `markets`, fetched in parallel and yielded as they arrive, tagged by market."""
+        markets = list(markets)
+        reports = interleave(
+            [
+                functools.partial(
+                    self.get_reports,
+                    market=market,
+                    search=search,
+                    date_=date_,
+                    page_size=page_size,
+                    prefetch=prefetch,
+                    date_from=date_from,
+                    date_to=date_to,
+                )
+                for market in markets
+            ]
+        )
+        with closing(reports):
+            for index, report in reports:
+                yield markets[index], report
+
+    def get_new_reports(
+        self,
+        market: MarketEnum,
+        search: str = "",
+        state: Optional[ReportsState] = None,
+        page_size: int = REPORTS_PAGE_SIZE,
+        overlap: float = NEW_REPORTS_OVERLAP,
+    ) -> Iterator[Union[ReportModel, FailedParsingElementModel]]:
+        """
+        Reports published since the previous fully consumed call, newest first. Reports up to `overlap` seconds
+        older than the newest seen one are checked by id, so a report published late with an older datetime is
+        still yielded. Pagination stops at the first report before the overlap, so polling costs one page when
+        nothing is new. The high-water mark is saved in `state` only once iteration completes; the first call
+        yields all reports.
+        """
+        state = state or ReportsState()
+        key = f"{market.value}:{search}"
+        mark = state.load(key)
+        new_mark = mark
+        yielded_ids: set[str] = set()
+        reports = self.get_reports(market=market, search=search, page_size=page_size)
+        with closing(reports):
+            for report in reports:
+                if isinstance(report, FailedParsingElementModel):
+                    yield report
+                    continue
+                if mark is not None and mark.is_before_overlap(report, overlap):
+                    break
+                if mark is not None and mark.is_seen(report, overlap):
+                    continue
+                # NOTE: reports published during pagination shift older ones to the next page.
+                if report.gpw_id in yielded_ids:
+                    continue
+                yielded_ids.add(report.gpw_id)
+                new_mark = (
+                    new_mark.advance(report, overlap) if new_mark else ReportsHighWaterMarkModel.from_report(report)
+                )
+                yield report
+        if new_mark is not None and new_mark != mark:
+            state.save(key, new_mark)
+
+    def watch_reports(
+        self,
+        market: MarketEnum,
+        search: str = "",
+        schedule: Optional[PollScheduleModel] = None,
+        page_size: int = REPORTS_PAGE_SIZE,
+    ) -> ReportWatcher:
+        """
+        Watcher of newly published reports: iterate over it or pass a callback to its `run`. Detection latency is
+        exposed as `watcher.latency.snapshot()`.
+        """
+        client, parser = self._get_client_and_parser(market)
+        return ReportWatcher(client, parser, search=search, schedule=schedule, page_size=page_size)
+
+    def _get_reports_days(
+        self,
+        market: MarketEnum,
+        search: str,
+        days: list[date],
+        page_size: int,
+        prefetch: int,
+        workers: int,
+    ) -> Generator[Union[ReportModel, FailedParsingElementModel], None, None]:
+        client, parser = self._get_client_and_parser(market)
+
+        def get_day_reports(day: date) -> list[Union[ReportModel, FailedParsingElementModel]]:
+            day_reports: list[Union[ReportModel, FailedParsingElementModel]] = []
+            for report_page in client.reports_list(search=search, for_date=day, page_size=page_size, prefetch=prefetch):
+                try:
+                    day_reports.extend(
+                        self._metered_page(parser.parse_reports_page(report_page.content), DataKindEnum.REPORTS, market)
+                    )
+                except EmptyPageException:
+                    break
+            return day_reports
+
+        yielded_ids: set[str] = set()
+        days_reports = ordered_map(get_day_reports, days, workers=workers)
+        with closing(days_reports):
+            for day_reports in days_reports:
+                for report in day_reports:
+                    if isinstance(report, ReportModel):
+                        # NOTE: reports published during pagination shift older ones to the next page.
+                        if report.gpw_id in yielded_ids:
+                            continue
+                        yielded_ids.add(report.gpw_id)
+                    yield report
+
+    def _parse_pages_in_processes(
+        self,
+        download_pages: Callable[[], Iterable[httpx.Response]],
+        parse_page: Callable[[bytes], ParsedPage[T]],
+        parse_workers: int,
+        kind: DataKindEnum,
+        market: MarketEnum,
+    ) -> Generator[T, None, None]:
+        """
+        Pages are downloaded in a thread into a bounded queue and parsed in a process pool; items are yielded in
+        page order. `parse_page` returns None for an empty page, which ends iteration.
+        """
+        downloads = interleave(
+            [lambda: (response.content for response in download_pages())],
+            queue_size=parse_workers * PARSE_QUEUE_PAGES,
+        )
+        contents = (content for _, content in downloads)
+        with closing(downloads), ProcessPoolExecutor(max_workers=parse_workers) as parse_executor:
+            pages_items = ordered_map(parse_page, contents, workers=parse_workers, executor=parse_executor)
+            with closing(pages_items):
+                for parsed_page in pages_items:
+                    if parsed_page is None:
+                        break
+                    page_items, seconds = parsed_page
+                    self._record_parsed_page(kind, market, page_items, seconds)
+                    yield from page_items
+
+    def _stream_reports(
+        self, market: MarketEnum, search: str, date_: Optional[date], page_size: int, offset: int
+    ) -> Iterator[Union[ReportModel, FailedParsingElementModel]]:
+        client, parser = self._get_client_and_parser(market)
+        while True:
+            page_chunks = client.reports_page_chunks(offset=offset, limit=page_size, search=search, for_date=date_)
+            # NOTE: parsing overlaps the download, so only rows are counted, not parse time.
+            entries_count = yield from self._metered_page(
+                parser.parse_reports_stream(page_chunks), DataKindEnum.REPORTS, market, timed=False
+            )
+            # Empty or last page.
+            if entries_count < page_size:
+                break
+            offset += page_size
+
     def get_stock_quotes(self, date_: date) -> Iterator[StockQuotesModel]:
+        """Stock quotes of `date_`. The sheet is downloaded to a temporary file and read from there."""
         # TODO: new connect
-        gpw_response = self._gpw_client.stock_quotes(date_)
-        if not gpw_response:
-            return
-        for company_quotes in self._gpw_parser.parse_stock_quotes_xls(gpw_response.content):
-            yield company_quotes
+        with tempfile.TemporaryDirectory(prefix=STOCK_QUOTES_TEMP_PREFIX) as directory:
+            _, path = self._download_stock_quotes_file(Path(directory), date_)
+            if path is None:
+                return
+            yield from self._metered_page(
+                self._gpw_parser.parse_stock_quotes_xls_file(path), DataKindEnum.STOCK_QUOTES, MarketEnum.GPW
+            )
+
+    def get_stock_quotes_range(
+        self, start: date, end: date, workers: int = STOCK_QUOTES_WORKERS, parse_workers: Optional[int] = None
+    ) -> Iterator[StockQuotesModel]:
+        """
+        Stock quotes for every trading day from `start` to `end` inclusive, in date order. Days are downloaded by
+        `workers` threads and parsed by `parse_workers` processes (0 parses in the calling process).
+        """
+        for _, day_quotes in self._get_stock_quotes_days(start, end, workers, parse_workers):
+            if day_quotes:
+                yield from day_quotes
+
+    def get_stock_quotes_frame(
+        self,
+        start: date,
+        end: date,
+        frame_format: StockQuotesFrameFormat = StockQuotesFrameFormat.NUMPY,
+        workers: int = STOCK_QUOTES_WORKERS,
+    ) -> Any:
+        """
+        Stock quotes from `start` to `end` inclusive as one numpy structured array or Arrow table, in date order. Sheets
+        are read column by column into typed arrays, so no StockQuotesModel is created. Needs optional numpy
+        (and pyarrow for Arrow) packages.
+        """
+        from wse_data.data_scrappers.gpw.gpw_columnar_parser import (
+            concatenate_stock_quotes_columns,
+            stock_quotes_arrow_table,
+        )
+
+        downloads = self._download_stock_quotes_days(weekdays(start, end), workers)
+        with closing(downloads):
+            records = concatenate_stock_quotes_columns(
+                self._gpw_parser.parse_stock_quotes_columns(xls_content)
+                for _, xls_content in downloads
+                if xls_content is not None
+            )
+        if frame_format == StockQuotesFrameFormat.ARROW:
+            return stock_quotes_arrow_table(records)
+        return records
+
+    def get_stock_quotes_days(
+        self, days: Iterable[date], workers: int = STOCK_QUOTES_WORKERS, parse_workers: Optional[int] = None
+    ) -> Generator[tuple[date, Optional[list[StockQuotesModel]]], None, None]:
+        """
+        Yields `(day, quotes)` in order of `days`, `quotes` being None for days without a quotes sheet. Sheets
+        waiting for parsing are kept in temporary files rather than in memory.
+        """
+        if parse_workers is None:
+            parse_workers = min(workers, os.cpu_count() or 1)
+        with tempfile.TemporaryDirectory(prefix=STOCK_QUOTES_TEMP_PREFIX) as directory:
+            yield from self._get_stock_quotes_days_files(Path(directory), days, workers, parse_workers)
+
+    def _get_stock_quotes_days_files(
+        self, directory: Path, days: Iterable[date], workers: int, parse_workers: int
+    ) -> Generator[tuple[date, Optional[list[StockQuotesModel]]], None, None]:
+        download_day = functools.partial(self._download_stock_quotes_file, directory)
+        downloads = ordered_map(download_day, days, workers=workers)
+        parse_day = functools.partial(_parse_stock_quotes_day_file, self._gpw_parser.trusted)
+        with closing(downloads):
+            if parse_workers == 0:
+                yield from map(self._recorded_stock_quotes_day, map(parse_day, downloads))
+                return
+            with ProcessPoolExecutor(max_workers=parse_workers) as parse_executor:
+                days_quotes = ordered_map(parse_day, downloads, workers=parse_workers, executor=parse_executor)
+                with closing(days_quotes):
+                    yield from map(self._recorded_stock_quotes_day, days_quotes)
+
+    def _recorded_stock_quotes_day(
+        self, day_quotes: tuple[date, Optional[list[StockQuotesModel]], float]
+    ) -> tuple[date, Optional[list[StockQuotesModel]]]:
+        day, quotes, seconds = day_quotes
+        if quotes:
+            self._record_parsed_page(DataKindEnum.STOCK_QUOTES, MarketEnum.GPW, quotes, seconds)
+        return day, quotes
+
+    def _get_stock_quotes_days(
+        self, start: date, end: date, workers: int, parse_workers: Optional[int]
+    ) -> Iterator[tuple[date, Optional[list[StockQuotesModel]]]]:
+        yield from self.get_stock_quotes_days(weekdays(start, end), workers, parse_workers)
+
+    def _download_stock_quotes_days(
+        self, days: Iterable[date], workers: int
+    ) -> Generator[tuple[date, Optional[bytes]], None, None]:
+        yield from ordered_map(self._download_stock_quotes_day, days, workers=workers)
+
+    def _download_stock_quotes_day(self, day: date) -> tuple[date, Optional[bytes]]:
+        response = self._gpw_client.stock_quotes(day)
+        return day, response.content if response else None
+
+    def _download_stock_quotes_file(self, directory: Path, day: date) -> tuple[date, Optional[Path]]:
+        path = directory / f"{day.isoformat()}.xls"
+        with path.open("wb") as xls_file:
+            is_trading_day = self._gpw_client.stock_quotes_to_file(day, xls_file)
+        if not is_trading_day:
+            path.unlink()
+            return day, None
+        return day, path
+
+    def _metered_page(
+        self, items: Iterable[T], kind: DataKindEnum, market: MarketEnum, timed: bool = True
+    ) -> Generator[T, None, Any]:
+        if self._metrics is None:
+            return (yield from items)
+        return (yield from metered_page(self._metrics, items, kind, market.value, timed=timed))
+
+    def _record_parsed_page(self, kind: DataKindEnum, market: MarketEnum, items: Iterable[Any], seconds: float) -> None:
+        if self._metrics is not None:
+            rows, failures = count_parsed_rows(items)
+            record_parsed_page(self._metrics, kind, market.value, rows, failures, seconds)
+
+    def _get_client_and_parser(self, market: MarketEnum) -> tuple[GPWClient, GPWParser]:
+        if market == MarketEnum.GPW:
+            return self._gpw_client, self._gpw_parser
+        elif market == MarketEnum.NEW_CONNECT:
+            return self._new_connect_client, self._new_connect_parser
+        raise UnknownMarketException(f"Unknown market: {market}.")
+
+
+def calendar_days(start: date, end: date) -> list[date]:
+    """Days from `start` to `end` inclusive."""
+    if start > end:
+        raise DateRangeException(f"Start date {start} is after end date {end}.")
+    return [start + timedelta(days=i) for i in range((end - start).days + 1)]
+
+
+def weekdays(start: date, end: date) -> list[date]:
+    """
+    Days from `start` to `end` inclusive which may be trading days. Weekends are never trading days, other holidays
+    are detected by the stock quotes response content type.
+    """
+    return [day for day in calendar_days(start, end) if day.weekday() < 5]
+
+
+def _parse_companies_page(
+    market: MarketEnum, backend: ParserBackend, trusted: bool, content: bytes
+) -> ParsedPage[Union[CompanyModel, FailedParsingElementModel]]:
+    # NOTE: module level function, so it can be pickled for the parsing process pool.
+    started_at = time.perf_counter()
+    try:
+        companies = list(GPWParser(market=market, backend=backend, trusted=trusted).parse_companies_page(content))
+    except EmptyPageException:
+        return None
+    return companies, time.perf_counter() - started_at
+
+
+def _parse_reports_page(
+    market: MarketEnum, backend: ParserBackend, trusted: bool, content: bytes
+) -> ParsedPage[Union[ReportModel, FailedParsingElementModel]]:
+    started_at = time.perf_counter()
+    try:
+        reports = list(GPWParser(market=market, backend=backend, trusted=trusted).parse_reports_page(content))
+    except EmptyPageException:
+        return None
+    return reports, time.perf_counter() - started_at
+
+
+def _parse_stock_quotes_day_file(
+    trusted: bool, day_path: tuple[date, Optional[Path]]
+) -> tuple[date, Optional[list[StockQuotesModel]], float]:
+    # NOTE: module level function, so it can be pickled for the parsing process pool.
+    day, path = day_path
+    if path is None:
+        return day, None, 0.0
+    started_at = time.perf_counter()
+    quotes = list(GPWParser(market=MarketEnum.GPW, trusted=trusted).parse_stock_quotes_xls_file(path))
+    seconds = time.perf_counter() - started_at
+    # NOTE: parsed sheets are removed right away, so a long range does not pile up on disk.
+    path.unlink()
+    return day, quotes, seconds